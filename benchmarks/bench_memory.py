@@ -0,0 +1,60 @@
+"""Benchmark the memory taken by notebooks read with nbformat.reads
+
+Reports the memory allocated per cell by ``nbformat.reads``, and by the same
+notebook built from plain ``Struct`` nodes, as ``NotebookNode`` was before it
+stopped giving every node its own ``__dict__``.  The JSON text is freed
+before measuring; strings are counted in both.
+
+Usage::
+
+    python benchmarks/bench_memory.py [n_cells ...]
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ipython_genutils.ipstruct import Struct
+
+import nbformat
+from nbformat.v4.rwbase import rejoin_lines
+from notebooks import make_notebook
+
+
+def struct_from_dict(d):
+    if isinstance(d, dict):
+        return Struct({k: struct_from_dict(v) for k, v in d.items()})
+    elif isinstance(d, list):
+        return [struct_from_dict(i) for i in d]
+    return d
+
+
+def measure(func, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def main(sizes):
+    print("%8s %14s %14s %8s" % ('cells', 'Struct B/cell', 'reads B/cell', 'ratio'))
+    for n_cells in sizes:
+        s = nbformat.writes(make_notebook(n_cells))
+        struct_size, _ = measure(lambda: rejoin_lines(struct_from_dict(json.loads(s))))
+        size, _ = measure(nbformat.reads, s, 4)
+        print("%8i %14.0f %14.0f %7.2fx" % (
+            n_cells, struct_size / n_cells, size / n_cells, struct_size / size))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100000])
@@ -0,0 +1,77 @@
+"""Microbenchmarks for NotebookNode
+
+Times attribute and item access, ``update`` and construction on
+``NotebookNode``, on the plain ``Struct`` it is based on, and on ``dict``
+for reference, then the passes over whole notebooks that are dominated by
+attribute access, such as ``rejoin_lines`` and ``yield_code_cells``, on a
+notebook of ``NotebookNode`` and of ``Struct`` objects.
+
+Usage::
+
+    python benchmarks/bench_node.py [n_cells]
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ipython_genutils.ipstruct import Struct
+
+import nbformat
+from nbformat.notebooknode import NotebookNode
+from nbformat.sign import yield_code_cells
+from nbformat.v4.rwbase import rejoin_lines, split_lines, strip_transient
+from bench_memory import struct_from_dict
+from bench_read import best_time
+from notebooks import make_notebook
+
+CELL = {'cell_type': 'code', 'source': 'x = 1', 'metadata': {}, 'outputs': [], 'execution_count': 1}
+
+STATEMENTS = [
+    ('read field attribute', 'node.source'),
+    ('read other attribute', 'node.other'),
+    ('read missing attribute', 'getattr(node, "missing", None)'),
+    ('read item', 'node["source"]'),
+    ('set attribute', 'node.source = "y = 2"'),
+    ('set item', 'node["source"] = "y = 2"'),
+    ('update', 'node.update(CELL)'),
+    ('construct', 'cls(CELL)'),
+]
+
+
+def time_statement(stmt, cls, number=200000):
+    node = cls(CELL, other=1)
+    namespace = {'node': node, 'cls': cls, 'CELL': CELL}
+    if cls is dict:
+        stmt = stmt.replace('node.source =', 'node["source"] =')
+        if '.' in stmt.replace('node.update', '') or 'getattr' in stmt:
+            return None
+    return min(timeit.repeat(stmt, globals=namespace, number=number, repeat=5)) / number
+
+
+def main(n_cells):
+    print("%-24s %10s %10s %10s" % ('ns per operation', 'dict', 'Struct', 'Node'))
+    for label, stmt in STATEMENTS:
+        times = [time_statement(stmt, cls) for cls in (dict, Struct, NotebookNode)]
+        print("%-24s %s" % (label, ' '.join(
+            '%10s' % ('-' if t is None else '%.0f' % (t * 1e9)) for t in times)))
+
+    print()
+    print("%-24s %10s %10s" % ('%i cells' % n_cells, 'Struct', 'Node'))
+    nb = nbformat.reads(nbformat.writes(make_notebook(n_cells)), 4)
+    struct_nb = struct_from_dict(nb)
+    for label, func in [
+        ('split/rejoin_lines', lambda nb: rejoin_lines(split_lines(nb))),
+        ('strip_transient', strip_transient),
+        ('yield_code_cells', lambda nb: list(yield_code_cells(nb))),
+    ]:
+        print("%-24s %9.3fs %9.3fs" % (label, best_time(func, struct_nb)[0], best_time(func, nb)[0]))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if sys.argv[1:] else 10000)
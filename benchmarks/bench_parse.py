@@ -0,0 +1,63 @@
+"""Benchmark building NotebookNodes while parsing notebook JSON
+
+Compares parsing to dicts and converting them with ``notebook_from_dict``,
+which copies the whole tree, with parsing straight to NotebookNodes with
+``parse_json(s, nodes=True)`` and giving the cells and outputs their
+classes in place, as ``nbformat.reads`` does.  Validation, which is the
+same for both, is left out.  Reports the time and the peak memory of each.
+
+Usage::
+
+    python benchmarks/bench_parse.py [n_cells ...]
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nbformat
+from nbformat.reader import parse_json
+from nbformat.v4.nodes import notebook_from_dict, type_cell
+from bench_read import best_time
+from notebooks import make_notebook
+
+
+def copied(s):
+    return notebook_from_dict(parse_json(s))
+
+
+def parsed_nodes(s):
+    nb = parse_json(s, nodes=True)
+    for cell in nb.cells:
+        type_cell(cell)
+    return nb
+
+
+def peak(func, *args):
+    tracemalloc.start()
+    func(*args)
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+def main(sizes):
+    print("%8s %10s %10s %10s %8s %10s %10s" % (
+        'cells', 'MB', 'copied', 'nodes', 'speedup', 'copied MB', 'nodes MB'))
+    for n_cells in sizes:
+        s = nbformat.writes(make_notebook(n_cells))
+        copied_time, expected = best_time(copied, s)
+        nodes_time, nb = best_time(parsed_nodes, s)
+        assert nb == expected
+        print("%8i %10.1f %9.2fs %9.2fs %7.1fx %10.1f %10.1f" % (
+            n_cells, len(s) / 1e6, copied_time, nodes_time, copied_time / nodes_time,
+            peak(copied, s) / 1e6, peak(parsed_nodes, s) / 1e6))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
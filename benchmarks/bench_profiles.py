@@ -0,0 +1,58 @@
+"""Benchmark writing and reading notebooks with each serialization profile
+
+For each profile, reports the size of the serialized notebook and the
+throughput, in MB of JSON per second, of serializing and parsing it with
+``nbformat.v4.writes`` and ``nbformat.v4.reads``, and of ``nbformat.writes``
+and ``nbformat.reads``, which also validate the notebook.  The profile is
+passed when reading, so compact input skips rejoining lines.
+
+Usage::
+
+    python benchmarks/bench_profiles.py [n_cells ...]
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nbformat
+from nbformat import v4
+from nbformat.v4.nbjson import PROFILES
+from notebooks import make_notebook
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(sizes):
+    print("throughput in MB/s")
+    print("%8s %10s %8s %10s %10s %10s %10s" % (
+        'cells', 'profile', 'MB', 'serialize', 'parse', 'writes', 'reads'))
+    for n_cells in sizes:
+        nb = make_notebook(n_cells)
+        repeat = 3 if n_cells <= 10000 else 1
+        for profile in sorted(PROFILES):
+            serialize, s = best_time(v4.writes, nb, profile=profile, repeat=repeat)
+            parse, _ = best_time(v4.reads, s, profile=profile, repeat=repeat)
+            writes, _ = best_time(nbformat.writes, nb, profile=profile, repeat=repeat)
+            reads, read_nb = best_time(nbformat.reads, s, 4, profile=profile, repeat=repeat)
+            assert read_nb == nb
+            mb = len(s.encode('utf-8')) / 1e6
+            print("%8i %10s %8.1f %10.1f %10.1f %10.1f %10.1f" % (
+                n_cells, profile, mb, mb / serialize, mb / parse, mb / writes, mb / reads))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
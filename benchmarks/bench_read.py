@@ -0,0 +1,60 @@
+"""Benchmark reading notebooks with nbformat.reads
+
+Compares the fused read pipeline used by ``nbformat.reads`` with the chain
+of separate passes it replaces: ``json.loads``, ``from_dict``,
+``rejoin_lines``, ``strip_transient``, ``convert`` and ``validate``.
+
+Usage::
+
+    python benchmarks/bench_read.py [n_cells ...]
+
+Set ``NBFORMAT_VALIDATOR=fastjsonschema`` to benchmark with fastjsonschema.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nbformat
+from nbformat import reader, convert, validate
+from notebooks import make_notebook
+
+
+def chained_reads(s, as_version):
+    """nbformat.reads as a chain of separate passes over the notebook"""
+    nb = reader.reads(s)
+    nb = convert(nb, as_version)
+    validate(nb)
+    return nb
+
+
+def best_time(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(sizes):
+    print("validator: %s" % os.environ.get('NBFORMAT_VALIDATOR', 'jsonschema'))
+    print("%8s %10s %10s %10s %8s" % ('cells', 'MB', 'chained', 'fused', 'speedup'))
+    for n_cells in sizes:
+        s = nbformat.writes(make_notebook(n_cells))
+        repeat = 3 if n_cells <= 10000 else 1
+        chained, expected = best_time(chained_reads, s, 4, repeat=repeat)
+        fused, nb = best_time(nbformat.reads, s, 4, repeat=repeat)
+        assert nb == expected
+        print("%8i %10.1f %9.2fs %9.2fs %7.1fx" % (
+            n_cells, len(s) / 1e6, chained, fused, chained / fused))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,43 @@
+"""Benchmark notebook snapshots
+
+Compares ``copy.deepcopy`` with ``nbformat.snapshot``, for a first snapshot
+of a notebook and for one taken after changing one cell, when everything
+but that cell is shared with the first.
+
+Usage::
+
+    python benchmarks/bench_snapshot.py [n_cells ...]
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nbformat
+from bench_read import best_time
+from notebooks import make_notebook
+
+
+def snapshot_after_change(nb):
+    nb.cells[len(nb.cells) // 2].source += '\n# changed'
+    return nbformat.snapshot(nb)
+
+
+def main(sizes):
+    print("%8s %10s %10s %10s" % ('cells', 'deepcopy', 'first', 'changed'))
+    for n_cells in sizes:
+        nb = nbformat.reads(nbformat.writes(make_notebook(n_cells)), 4)
+        deepcopy_time = best_time(copy.deepcopy, nb)[0]
+        first_time = best_time(lambda: nbformat.snapshot(nb, base=nbformat.snapshots.FrozenNode()))[0]
+        nbformat.snapshot(nb)
+        changed_time = best_time(snapshot_after_change, nb)[0]
+        print("%8i %9.3fs %9.3fs %9.3fs" % (n_cells, deepcopy_time, first_time, changed_time))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
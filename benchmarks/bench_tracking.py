@@ -0,0 +1,55 @@
+"""Benchmark work done after changing one cell, with and without tracking
+
+Times ``IncrementalWriter.writes`` and ``nbformat.snapshot`` after one cell
+of a notebook is changed, on a notebook whose changes are tracked with
+``nbformat.track_changes`` and on one whose changes are not, and
+``changed_cells`` on the tracked one.
+
+Usage::
+
+    python benchmarks/bench_tracking.py [n_cells ...]
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nbformat
+from nbformat.incremental import IncrementalWriter
+from bench_read import best_time
+from notebooks import make_notebook
+
+
+def change(nb):
+    nb.cells[len(nb.cells) // 2].source += '\n# changed'
+
+
+def main(sizes):
+    print("%8s %9s %12s %12s %12s %12s %14s" % (
+        'cells', 'track', 'writes', 'writes (t)', 'snapshot', 'snapshot (t)', 'changed_cells'))
+    for n_cells in sizes:
+        s = nbformat.writes(make_notebook(n_cells))
+        nb = nbformat.reads(s, 4)
+        tracked = nbformat.reads(s, 4)
+        track_time = best_time(nbformat.track_changes, tracked, repeat=1)[0]
+
+        times = []
+        for notebook in (nb, tracked):
+            writer = IncrementalWriter()
+            writer.writes(notebook)
+            times.append(best_time(lambda: change(notebook) or writer.writes(notebook))[0])
+        for notebook in (nb, tracked):
+            nbformat.snapshot(notebook)
+            times.append(best_time(lambda: change(notebook) or nbformat.snapshot(notebook))[0])
+        token = tracked.change_token()
+        change(tracked)
+        times.append(best_time(tracked.changed_cells, token)[0])
+        print("%8i %8.3fs %11.3fs %11.3fs %11.3fs %11.3fs %13.4fs" % ((n_cells, track_time) + tuple(times)))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
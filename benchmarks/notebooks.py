@@ -0,0 +1,47 @@
+"""Synthetic notebooks for the benchmarks"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import base64
+import random
+
+from nbformat.v4 import (
+    new_code_cell, new_markdown_cell, new_notebook, new_output,
+)
+
+
+def make_notebook(n_cells, seed=0):
+    """Make a v4 notebook with `n_cells` cells of typical content
+
+    A third of the cells are markdown; code cells have stream output, and
+    some have rich outputs with small images or execution results.
+    """
+    rng = random.Random(seed)
+    png = base64.b64encode(bytes(rng.getrandbits(8) for _ in range(2048))).decode('ascii')
+    cells = []
+    for i in range(n_cells):
+        if i % 3 == 0:
+            cells.append(new_markdown_cell(
+                source='## Section %i\n\nSome *explanatory* text about step %i.\n' % (i, i),
+            ))
+            continue
+        cell = new_code_cell(
+            source='x = compute(%i)\nfor i in range(3):\n    print(x, i)\n' % i,
+            execution_count=i,
+        )
+        cell.outputs.append(new_output(
+            'stream', name='stdout', text=''.join('%i %i\n' % (i, j) for j in range(3)),
+        ))
+        if i % 10 == 1:
+            cell.outputs.append(new_output(
+                'display_data', data={'image/png': png, 'text/plain': '<Figure>'},
+            ))
+        elif i % 5 == 2:
+            cell.outputs.append(new_output(
+                'execute_result', data={'text/plain': repr(rng.random())}, execution_count=i,
+            ))
+        cells.append(cell)
+    return new_notebook(cells=cells, metadata={
+        'kernelspec': {'display_name': 'Python 3', 'language': 'python', 'name': 'python3'},
+    })
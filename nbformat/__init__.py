@@ -5,7 +5,7 @@ Use this module to read or write notebook files as particular nbformat versions.
 
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
-import io
+import mmap
 
 from traitlets.log import get_logger
 from ._version import version_info, __version__
@@ -19,6 +19,8 @@ from .sentinel import Sentinel
 __all__ = ['versions', 'validate', 'ValidationError', 'convert', 'from_dict',
            'NotebookNode', 'current_nbformat', 'current_nbformat_minor',
            'NBFormatError', 'NO_CONVERT', 'reads', 'read', 'writes', 'write',
+           'peek', 'cached_read', 'read_many', 'write_many', 'snapshot',
+           'track_changes',
            'version_info', '__version__',
 ]
 
@@ -32,7 +34,15 @@ versions = {
 from .validator import validate, ValidationError
 from .converter import convert
 from . import reader
+from . import blobs
+from .compression import decompress_buffer, open_for_reading, open_for_writing
+from . import streaming
+from .bulk import read_many, write_many
+from .cache import cached_read, default_hash_cache, hash_text
 from .notebooknode import from_dict, NotebookNode
+from .snapshots import snapshot
+from .tracking import track_changes
+from .v4.rwbase import LazyCellList, filter_outputs
 
 from .v4 import (
     nbformat as current_nbformat,
@@ -48,7 +58,7 @@ NO_CONVERT = Sentinel('NO_CONVERT', __name__,
     """)
 
 
-def reads(s, as_version, **kwargs):
+def reads(s, as_version, lazy=False, outputs=True, profile=None, **kwargs):
     """Read a notebook from a string and return the NotebookNode object as the given version.
 
     The string can contain a notebook of any version.
@@ -58,28 +68,115 @@ def reads(s, as_version, **kwargs):
 
     Parameters
     ----------
-    s : unicode
-        The raw unicode string to read the notebook from.
+    s : unicode | bytes | buffer
+        The raw unicode string, or the encoded bytes (including an ``mmap``
+        object or other buffer) to read the notebook from.  Bytes compressed
+        with gzip, xz or bzip2 are decompressed.
     as_version : int
         The version of the notebook format to return.
         The notebook will be converted, if necessary.
         Pass nbformat.NO_CONVERT to prevent conversion.
+    lazy : bool, optional
+        If True, the cells of a v4 notebook are kept as parsed and each one is
+        converted to a NotebookNode only when it is first accessed.
+        Validation does not count as an access.
+    outputs : bool or collection of str, optional
+        If False, cell outputs are skipped while parsing and the notebook has
+        empty outputs.  If a collection of mime types, only those entries of
+        the ``data`` of each output are kept.  When outputs are filtered,
+        `lazy` is ignored.
+    profile : str, optional
+        The serialization profile the notebook was written with, if known
+        (see :data:`nbformat.v4.nbjson.PROFILES`).  With ``'compact'``,
+        multiline text is known not to be split into lines, so the pass that
+        rejoins lines is skipped.
+    json_backend : str, optional
+        The JSON backend to parse with (see
+        :func:`nbformat.json_backend.get_json_backend`).  Ignored when
+        outputs are filtered, as the notebook is then parsed a piece at a
+        time with the standard library.
+    blob_store : BlobStore or str, optional
+        The :class:`~nbformat.blobs.BlobStore`, or its directory, holding
+        output data that was externalized when the notebook was written.
+        Values are loaded from it when they are first accessed.
 
     Returns
     -------
     nb : NotebookNode
         The notebook that was read.
     """
-    nb = reader.reads(s, **kwargs)
+    blob_store = kwargs.pop('blob_store', None)
+    if blob_store is not None:
+        nb = reads(s, as_version, lazy=lazy, outputs=outputs, profile=profile, **kwargs)
+        return blobs.resolve_lazily(nb, blob_store)
+
+    s = decompress_buffer(s)
+    if outputs is not True:
+        # the streaming parser only uses the standard library
+        kwargs.pop('json_backend', None)
+        nb = streaming.reads(s, outputs=outputs, **kwargs)
+    elif lazy:
+        nb = reader.reads(s, lazy=lazy, **kwargs)
+    else:
+        # objects are parsed as NotebookNodes where the backend can, so
+        # they need not be copied
+        nb_dict = reader.parse_json(s, nodes=True, **kwargs)
+        if reader.get_version(nb_dict)[0] == 4 and as_version in (NO_CONVERT, 4):
+            # convert and validate in a single pass over the cells
+            nb, error = v4.to_validated_notebook(nb_dict, profile=profile, copy=False)
+            if error is not None:
+                get_logger().error("Notebook JSON is invalid: %s", error)
+            return nb
+        nb = reader.to_notebook(nb_dict)
+    return _convert_and_validate(nb, as_version, outputs)
+
+
+def _convert_and_validate(nb, as_version, outputs=True):
+    """Convert a freshly read notebook to `as_version` and log format errors
+
+    Outputs are filtered as for :func:`reads`, in case they could not be
+    skipped while parsing.
+    """
     if as_version is not NO_CONVERT:
         nb = convert(nb, as_version)
+    if outputs is not True and reader.get_version(nb)[0] == 4:
+        filter_outputs(nb, outputs)
+    to_validate = nb
+    if isinstance(nb.get('cells'), LazyCellList):
+        # validate unaccessed cells as parsed, without materializing them
+        to_validate = dict(nb, cells=nb.cells.as_parsed())
     try:
-        validate(nb)
+        validate(to_validate)
     except ValidationError as e:
         get_logger().error("Notebook JSON is invalid: %s", e)
     return nb
 
 
+def peek(fp, **kwargs):
+    """Read the format version, metadata and cell count of a notebook file.
+
+    Only as much of the file as needed is parsed: cells and their outputs are
+    skipped over without being built, which makes this much faster than
+    :func:`read` for large notebooks.  The notebook is not validated.
+
+    Parameters
+    ----------
+    fp : file or str
+        A file-like object with a read method, in text or binary mode, an
+        ``mmap`` object, or a path to a file.
+
+    Returns
+    -------
+    header : NotebookHeader
+        A named tuple of ``version``, the ``(major, minor)`` version tuple,
+        ``metadata``, the top-level notebook metadata, and ``cell_count``.
+    """
+    if not hasattr(fp, 'read'):
+        with open_for_reading(fp) as f:
+            return streaming.peek(f, **kwargs)
+    return streaming.peek(fp, **kwargs)
+
+
 def writes(nb, version=NO_CONVERT, **kwargs):
     """Write a notebook to a string in a given format in the given nbformat version.
 
@@ -93,24 +190,70 @@ def writes(nb, version=NO_CONVERT, **kwargs):
         The nbformat version to write.
         If unspecified, or specified as nbformat.NO_CONVERT,
         the notebook's own version will be used and no conversion performed.
+    profile : str, optional
+        The serialization profile of v4 notebooks: ``'canonical'`` (the
+        default), the format of notebook files; ``'diff'``, an alias of it
+        for notebooks under version control; or ``'compact'``, with no
+        whitespace and no split lines, which serializes several times
+        faster.  See :data:`nbformat.v4.nbjson.PROFILES`.
+    budget : OutputBudget, optional
+        An :class:`~nbformat.budget.OutputBudget` limiting the size of the
+        text of outputs in v4 notebooks.  Text over budget is cut short and
+        marked, and the budget records what was dropped.
+    externalize_over : int, optional
+        If given, values of output data and attachments larger than this many
+        bytes are stored in `blob_store` instead of the notebook, which holds
+        references to them.  See :mod:`nbformat.blobs`.
+    blob_store : BlobStore or str, optional
+        The :class:`~nbformat.blobs.BlobStore`, or its directory, to store
+        externalized values in.
 
     Returns
     -------
     s : unicode
         The notebook as a JSON string.
     """
+    nb, version = _convert_for_write(nb, version, kwargs)
+    return versions[version].writes_json(nb, **kwargs)
+
+
+def _convert_for_write(nb, version, kwargs):
+    """Convert a notebook to the version to write, and log if it is invalid
+
+    Output data is externalized and outputs are cut to an output budget if
+    asked for in `kwargs`, from which the arguments for them are removed.
+    Both are done before validating, so only what is written is validated.
+    """
+    externalize_over = kwargs.pop('externalize_over', None)
+    blob_store = kwargs.pop('blob_store', None)
+    budget = kwargs.pop('budget', None)
+    target = reader.get_version(nb)[0] if version is NO_CONVERT else version
+    if externalize_over is not None:
+        if blob_store is None:
+            raise TypeError("externalize_over requires a blob_store")
+        if target != 4:
+            raise ValueError("Only v4 notebooks can have externalized outputs, not v%s" % target)
+    if kwargs.get('profile') is not None and target != 4:
+        raise ValueError("Serialization profiles are only for v4 notebooks, not v%s" % target)
+    if budget is not None and target != 4:
+        raise ValueError("Output budgets are only for v4 notebooks, not v%s" % target)
+
     if version is not NO_CONVERT:
         nb = convert(nb, version)
     else:
         version, _ = reader.get_version(nb)
+    if externalize_over is not None:
+        nb = blobs.externalize(nb, blob_store, externalize_over)
+    if budget is not None:
+        nb = budget.notebook(nb)
     try:
         validate(nb)
     except ValidationError as e:
         get_logger().error("Notebook JSON is invalid: %s", e)
-    return versions[version].writes_json(nb, **kwargs)
+    return nb, version
 
 
-def read(fp, as_version, **kwargs):
+def read(fp, as_version, stream=False, outputs=True, lazy=False, **kwargs):
     """Read a notebook from a file as a NotebookNode of the given version.
 
     The string can contain a notebook of any version.
@@ -121,29 +264,71 @@ def read(fp, as_version, **kwargs):
     Parameters
     ----------
     fp : file or str
-        A file-like object with a read method that returns unicode (use
-        ``io.open()`` in Python 2), or a path to a file.
+        A file-like object with a read method, in text or binary mode, an
+        ``mmap`` object, or a path to a file.  Files compressed with gzip,
+        xz or bzip2 are recognized and decompressed as they are read.
     as_version: int
         The version of the notebook format to return.
         The notebook will be converted, if necessary.
         Pass nbformat.NO_CONVERT to prevent conversion.
+    stream : bool, optional
+        If True, parse the file a chunk at a time with
+        :func:`nbformat.streaming.read`, building cells one by one instead of
+        reading the whole file into a string first.
+    outputs : bool or collection of str, optional
+        If False, cell outputs are skipped while parsing and the notebook has
+        empty outputs.  If a collection of mime types, only those entries of
+        the ``data`` of each output are kept.  Filtering outputs implies
+        `stream`.
+    lazy : bool, optional
+        Convert the cells of a v4 notebook only when they are first
+        accessed, as for :func:`reads`.  Ignored with `stream`, and when
+        outputs are filtered.
+    profile : str, optional
+        The serialization profile the notebook was written with, as for
+        :func:`reads`.
+    json_backend : str, optional
+        The JSON backend to parse with, as for :func:`reads`.  Ignored with
+        `stream`, and when outputs are filtered.
+    blob_store : BlobStore or str, optional
+        Where to load externalized output data from, as for :func:`reads`.
 
     Returns
     -------
     nb : NotebookNode
         The notebook that was read.
     """
+    blob_store = kwargs.pop('blob_store', None)
+    if blob_store is not None:
+        nb = read(fp, as_version, stream=stream, outputs=outputs, lazy=lazy, **kwargs)
+        return blobs.resolve_lazily(nb, blob_store)
+
+    if stream or outputs is not True:
+        # only used by the non-streaming reader
+        kwargs.pop('profile', None)
+        kwargs.pop('json_backend', None)
+        if not hasattr(fp, 'read'):
+            with open_for_reading(fp) as f:
+                nb = streaming.read(f, outputs=outputs, **kwargs)
+        else:
+            nb = streaming.read(fp, outputs=outputs, **kwargs)
+        return _convert_and_validate(nb, as_version, outputs)
+
+    if isinstance(fp, mmap.mmap):
+        # parse the mapping in place rather than reading it into a copy
+        return reads(fp, as_version, lazy=lazy, **kwargs)
 
     try:
         buf = fp.read()
     except AttributeError:
-        with io.open(fp, encoding='utf-8') as f:
-            return reads(f.read(), as_version, **kwargs)
+        with open_for_reading(fp) as f:
+            return reads(f.read(), as_version, lazy=lazy, **kwargs)
 
-    return reads(buf, as_version, **kwargs)
+    return reads(buf, as_version, lazy=lazy, **kwargs)
 
 
-def write(nb, fp, version=NO_CONVERT, **kwargs):
+def write(nb, fp, version=NO_CONVERT, stream=False, compression='infer', compresslevel=None,
+          if_changed=False, **kwargs):
     """Write a notebook to a file in a given nbformat version.
 
     The file-like object must accept unicode input.
@@ -160,7 +345,39 @@ def write(nb, fp, version=NO_CONVERT, **kwargs):
         If nb is not this version, it will be converted.
         If unspecified, or specified as nbformat.NO_CONVERT,
         the notebook's own version will be used and no conversion performed.
+    stream : bool, optional
+        If True, write the notebook a cell at a time with
+        :func:`nbformat.streaming.write`, instead of serializing all of it
+        to a string first.
+    compression : str or None, optional
+        How to compress a file written to a path: ``'gzip'``, ``'xz'``,
+        ``'bz2'`` or None.  The default, ``'infer'``, compresses according
+        to the suffix of the path (``.gz``, ``.xz`` or ``.bz2``).  File
+        objects are written to as they are.
+    compresslevel : int, optional
+        The compression level, from 0 to 9.
+    if_changed : bool, optional
+        If True and `fp` is a path, leave the file untouched if it already
+        holds the text that would be written, so that its modification time
+        does not change.  The file is compared by hash, and the hash of a
+        file is cached while its inode, modification time and size are
+        unchanged, so a file that was last written or compared by this
+        process is not read again.
+    externalize_over, blob_store : optional
+        Store large output data outside the notebook, as for :func:`writes`.
+
+    Returns
+    -------
+    written : bool or None
+        With `if_changed`, whether the file was written; otherwise None.
     """
+    if if_changed and not hasattr(fp, 'write'):
+        return _write_if_changed(nb, fp, version, stream, compression, compresslevel, kwargs)
+
+    if stream:
+        return streaming.write(nb, fp, version, compression=compression,
+                               compresslevel=compresslevel, **kwargs)
+
     s = writes(nb, version, **kwargs)
     if isinstance(s, bytes):
         s = s.decode('utf8')
@@ -170,7 +387,34 @@ def write(nb, fp, version=NO_CONVERT, **kwargs):
         if not s.endswith(u'\n'):
             fp.write(u'\n')
     except AttributeError:
-        with io.open(fp, 'w', encoding='utf-8') as f:
+        with open_for_writing(fp, compression, compresslevel) as f:
             f.write(s)
             if not s.endswith(u'\n'):
                 f.write(u'\n')
+
+
+def _write_if_changed(nb, path, version, stream, compression, compresslevel, kwargs):
+    """Write a notebook to a path unless the file already holds its text"""
+    if not isinstance(path, (str, bytes)):
+        path = str(path)
+    if stream:
+        # convert and validate once, and serialize twice: to hash, then to write
+        nb, version = _convert_for_write(nb, version, kwargs)
+
+        def chunks():
+            return streaming._iter_text(nb, version, kwargs)
+    else:
+        s = writes(nb, version, **kwargs)
+        if isinstance(s, bytes):
+            s = s.decode('utf8')
+
+        def chunks():
+            return [s] if s.endswith(u'\n') else [s, u'\n']
+
+    digest = hash_text(chunks())
+    if default_hash_cache.get(path) == digest:
+        return False
+    with open_for_writing(path, compression, compresslevel) as f:
+        streaming._write_chunks(chunks(), f)
+    default_hash_cache.store(path, digest)
+    return True
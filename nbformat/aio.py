@@ -0,0 +1,241 @@
+"""Coroutine versions of the nbformat API, for use with asyncio
+
+Reading, writing, validating and signing notebooks are run in an executor,
+so that parsing, validation and hashing large notebooks do not block the
+event loop::
+
+    nb = await nbformat.aio.read(path, as_version=4)
+    await nbformat.aio.validate(nb)
+    await nbformat.aio.write(nb, path)
+
+By default a thread pool is used; :func:`set_executor` (or the `executor`
+argument of each function) selects another, such as a
+:class:`concurrent.futures.ProcessPoolExecutor`, which also moves the work
+off the GIL at the cost of pickling notebooks to and from the workers.
+
+The number of jobs submitted to the executor at once is bounded by
+:data:`limiter`; callers wait for a free slot, so a burst of requests does
+not pile up unbounded work (and memory) behind the executor.
+
+Cancelling a call that is still waiting for a slot or for a worker means
+its job never runs.  A job that has already started cannot be interrupted:
+it runs to completion, its result is discarded, and its slot is only freed
+once it has finished.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import nbformat
+
+# jobs on notebooks at least this large, in bytes, count as large
+LARGE_SIZE = 10 * 1024 * 1024
+
+
+class JobLimiter(object):
+    """Bound the number of jobs running at once
+
+    At most `max_jobs` jobs may run at once, of which at most
+    `max_large_jobs` may be large.  Slots are handed out in the order they
+    were asked for, except that small jobs are not held up behind large
+    jobs waiting for a large slot.
+
+    A limiter may be shared between event loops, but only used from one at a
+    time.
+    """
+
+    def __init__(self, max_jobs=8, max_large_jobs=2, large_size=LARGE_SIZE):
+        self.max_jobs = max_jobs
+        self.max_large_jobs = max_large_jobs
+        self.large_size = large_size
+        self.jobs = 0
+        self.large_jobs = 0
+        self._waiters = deque()
+
+    def is_large(self, size):
+        return size >= self.large_size
+
+    def _available(self, large):
+        if self.jobs >= self.max_jobs:
+            return False
+        return not large or self.large_jobs < self.max_large_jobs
+
+    def _reserve(self, large):
+        self.jobs += 1
+        if large:
+            self.large_jobs += 1
+
+    def _wake(self):
+        for waiter in list(self._waiters):
+            future, large = waiter
+            if future.done():
+                self._waiters.remove(waiter)
+            elif self._available(large):
+                self._reserve(large)
+                self._waiters.remove(waiter)
+                future.set_result(None)
+
+    async def acquire(self, large=False):
+        """Wait for a slot for a job"""
+        if not self._waiters and self._available(large):
+            self._reserve(large)
+            return
+        future = asyncio.get_event_loop().create_future()
+        waiter = (future, large)
+        self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                # others may have been waiting behind this one
+                self._wake()
+            else:
+                # a slot was reserved just before cancellation
+                self.release(large)
+            raise
+
+    def release(self, large=False):
+        """Free the slot of a finished job"""
+        self.jobs -= 1
+        if large:
+            self.large_jobs -= 1
+        self._wake()
+
+
+limiter = JobLimiter()
+
+_executor = None
+
+
+def set_executor(executor):
+    """Set the executor for jobs, or None to use the default thread pool"""
+    global _executor
+    _executor = executor
+
+
+def get_executor():
+    """Get the executor for jobs"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=limiter.max_jobs)
+    return _executor
+
+
+async def _run(size, executor, func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` in an executor once a slot is free"""
+    if executor is None:
+        executor = get_executor()
+    large = limiter.is_large(size)
+    await limiter.acquire(large)
+    loop = asyncio.get_event_loop()
+    try:
+        job = executor.submit(func, *args, **kwargs)
+    except BaseException:
+        limiter.release(large)
+        raise
+    def done(job):
+        # free the slot when the job has actually finished, even if the
+        # caller has stopped waiting for it
+        try:
+            loop.call_soon_threadsafe(limiter.release, large)
+        except RuntimeError:
+            # the loop has been closed
+            limiter.release(large)
+
+    job.add_done_callback(done)
+    return await asyncio.wrap_future(job, loop=loop)
+
+
+def _text_size(value):
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, list):
+        return sum(len(line) for line in value if isinstance(line, str))
+    return 0
+
+
+def _notebook_size(nb, limit):
+    """Estimate the size of a notebook, counting up to `limit`
+
+    Counts the characters of cell sources and outputs, and stops as soon as
+    `limit` is reached, so that large notebooks are cheap to size up.
+    """
+    if 'worksheets' in nb:
+        cells = [cell for ws in nb.worksheets for cell in ws.get('cells', [])]
+    else:
+        cells = nb.get('cells', [])
+    size = 0
+    for cell in cells:
+        size += _text_size(cell.get('source', cell.get('input')))
+        for output in cell.get('outputs', []):
+            for value in output.values():
+                if isinstance(value, dict):
+                    size += sum(_text_size(v) for v in value.values())
+                else:
+                    size += _text_size(value)
+        if size >= limit:
+            break
+    return size
+
+
+async def read(fp, as_version, executor=None, **kwargs):
+    """Read a notebook from a path, as :func:`nbformat.read`
+
+    `fp` must be a path, since the file is opened by the executor.
+    """
+    if not isinstance(fp, (str, bytes)):
+        fp = str(fp)
+    size = os.stat(fp).st_size
+    return await _run(size, executor, nbformat.read, fp, as_version, **kwargs)
+
+
+async def write(nb, fp, version=nbformat.NO_CONVERT, executor=None, **kwargs):
+    """Write a notebook to a path, as :func:`nbformat.write`
+
+    `fp` must be a path, since the file is opened by the executor.
+    """
+    if not isinstance(fp, (str, bytes)):
+        fp = str(fp)
+    size = _notebook_size(nb, limiter.large_size)
+    return await _run(size, executor, nbformat.write, nb, fp, version, **kwargs)
+
+
+async def validate(nb, executor=None, **kwargs):
+    """Validate a notebook, as :func:`nbformat.validate`
+
+    Raises ValidationError if not valid.
+    """
+    size = _notebook_size(nb, limiter.large_size)
+    return await _run(size, executor, nbformat.validate, nb, **kwargs)
+
+
+_notary = None
+
+
+async def sign(nb, notary=None, executor=None):
+    """Sign a notebook, as :meth:`nbformat.sign.NotebookNotary.sign`
+
+    The signature is computed in the executor, and stored by `notary` (by
+    default a :class:`~nbformat.sign.NotebookNotary` created on first use)
+    in the calling thread, as signature stores may not be shared between
+    threads.
+    """
+    from .sign import NotebookNotary, compute_signature
+    global _notary
+
+    if notary is None:
+        if _notary is None:
+            _notary = NotebookNotary()
+        notary = _notary
+    if nb.nbformat < 3:
+        return
+    size = _notebook_size(nb, limiter.large_size)
+    signature = await _run(size, executor, compute_signature, nb, notary.secret, notary.algorithm)
+    notary.store.store_signature(signature, notary.algorithm)
@@ -0,0 +1,261 @@
+"""Storing large output data outside of notebook files
+
+Writing a notebook with ``nbformat.write(nb, fp, externalize_over=n,
+blob_store=store)`` moves every value of a mime bundle (output data or cell
+attachments) larger than `n` bytes into a :class:`BlobStore`, a directory of
+files named by the hash of their content, and leaves a reference to it in
+the notebook::
+
+    "image/png": "nbformat-blob:sha256:9f86d081884c7d65..."
+
+Identical payloads, in the same notebook or across notebooks and
+checkpoints, are stored once.
+
+Reading with ``nbformat.read(fp, as_version, blob_store=store)`` returns
+mime bundles that load referenced values from the store when they are
+first accessed.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import os
+import re
+import tempfile
+
+from .notebooknode import NotebookNode
+from .v4.rwbase import _is_json_mime
+
+BLOB_PREFIX = 'nbformat-blob:'
+
+# a whole reference, so that other text starting with the prefix is data
+_reference = re.compile(re.escape(BLOB_PREFIX) + r'sha256:[0-9a-f]{64}\Z')
+
+
+class BlobStore(object):
+    """A content-addressed store of blobs in a local directory
+
+    Blobs are stored under their sha256 hash, in files named
+    ``<root>/<first two hex digits>/<remaining hex digits>``, and are
+    written atomically, so a store can be shared between processes.
+    """
+
+    def __init__(self, root):
+        if not isinstance(root, (str, bytes)):
+            root = str(root)
+        self.root = root
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.root)
+
+    def path(self, key):
+        """The path of the file for a key"""
+        algorithm, _, digest = key.partition(':')
+        if algorithm != 'sha256' or len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            raise ValueError('Not a blob key: %r' % key)
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def __contains__(self, key):
+        try:
+            return os.path.exists(self.path(key))
+        except ValueError:
+            return False
+
+    def put(self, data):
+        """Store bytes, and return their key"""
+        key = 'sha256:' + hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        if os.path.exists(path):
+            return key
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return key
+
+    def get(self, key):
+        """Return the bytes stored under a key
+
+        Raises KeyError if there is no such blob.
+        """
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(key)
+
+
+def _get_store(blob_store):
+    if isinstance(blob_store, BlobStore):
+        return blob_store
+    return BlobStore(blob_store)
+
+
+def is_reference(value):
+    """Is a value of a mime bundle a reference to a blob?
+
+    Only a whole reference is: other strings that start with
+    :data:`BLOB_PREFIX` are data.
+    """
+    return isinstance(value, str) and _reference.match(value) is not None
+
+
+def _externalize_bundle(data, store, threshold):
+    """Return a copy of a mime bundle with large values stored in `store`
+
+    Returns None if nothing changes, except for a :class:`LazyBundle`, which
+    is always copied with its values as they are, so that nothing is loaded
+    by serializing or validating the copy.
+    """
+    changed = {}
+    # look at the raw values, so that references are not loaded
+    for mime_type, value in dict.items(data):
+        if _is_json_mime(mime_type):
+            continue
+        if is_reference(value):
+            if value[len(BLOB_PREFIX):] in store:
+                continue
+            # a reference to another store
+            value = data[mime_type]
+        if isinstance(value, list) and all(isinstance(line, str) for line in value):
+            value = ''.join(value)
+        if not isinstance(value, str) or len(value) <= threshold // 4 or is_reference(value):
+            # a character is at most four bytes of UTF-8, so this is small
+            continue
+        blob = value.encode('utf-8', 'surrogatepass')
+        if len(blob) > threshold:
+            changed[mime_type] = BLOB_PREFIX + store.put(blob)
+    if changed or isinstance(data, LazyBundle):
+        return dict(dict.items(data), **changed)
+
+
+def externalize(nb, blob_store, threshold):
+    """Return a v4 notebook with large mime bundle values moved to a blob store
+
+    Values of output data and cell attachments that are larger than
+    `threshold` bytes in UTF-8 are stored in `blob_store`, and replaced by
+    references.  JSON values are left in place.  `nb` is not modified: only
+    the containers that change are copied, shallowly.
+    """
+    store = _get_store(blob_store)
+    cells = []
+    for cell in nb.cells:
+        new_cell = cell
+        attachments = cell.get('attachments')
+        if isinstance(attachments, dict):
+            new_attachments = {}
+            for name, bundle in attachments.items():
+                new_bundle = _externalize_bundle(bundle, store, threshold) if isinstance(bundle, dict) else None
+                new_attachments[name] = bundle if new_bundle is None else new_bundle
+            if any(new_attachments[name] is not attachments[name] for name in attachments):
+                new_cell = dict(new_cell, attachments=new_attachments)
+        outputs = cell.get('outputs')
+        if isinstance(outputs, list):
+            new_outputs = []
+            for output in outputs:
+                data = output.get('data') if isinstance(output, dict) else None
+                new_data = _externalize_bundle(data, store, threshold) if isinstance(data, dict) else None
+                new_outputs.append(output if new_data is None else NotebookNode(output, data=new_data))
+            if any(new is not old for new, old in zip(new_outputs, outputs)):
+                new_cell = dict(new_cell, outputs=new_outputs)
+        cells.append(new_cell if new_cell is cell else NotebookNode(new_cell))
+    return NotebookNode(nb, cells=cells)
+
+
+class LazyBundle(NotebookNode):
+    """A mime bundle that loads values stored in a blob store on first access
+
+    Values that are references to blobs are replaced by the blob's content
+    when they are retrieved.  Anything that needs every value (comparison,
+    copying, iterating over values or items, serializing) loads them all.
+    """
+
+    def __init__(self, data, blob_store):
+        super(LazyBundle, self).__init__(data)
+        object.__setattr__(self, '_blob_store', blob_store)
+
+    def _resolve(self, key, value):
+        if is_reference(value):
+            blob = self._blob_store.get(value[len(BLOB_PREFIX):])
+            value = blob.decode('utf-8', 'surrogatepass')
+            dict.__setitem__(self, key, value)
+        return value
+
+    def _resolve_all(self):
+        for key, value in dict.items(self):
+            self._resolve(key, value)
+        return self
+
+    def __getitem__(self, key):
+        return self._resolve(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def items(self):
+        return dict.items(self._resolve_all())
+
+    def values(self):
+        return dict.values(self._resolve_all())
+
+    def copy(self):
+        return NotebookNode(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyBundle):
+            other._resolve_all()
+        return dict.__eq__(self._resolve_all(), other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return dict.__repr__(self._resolve_all())
+
+    def __reduce_ex__(self, protocol):
+        # copies and pickles are plain NotebookNodes with every value loaded
+        return (NotebookNode, (dict(self.items()),))
+
+
+def _lazy_bundle(data, store):
+    if isinstance(data, dict) and not isinstance(data, LazyBundle) and any(map(is_reference, dict.values(data))):
+        return LazyBundle(data, store)
+    return data
+
+
+def resolve_lazily(nb, blob_store):
+    """Make the references to blobs in a v4 notebook load on first access (in-place)
+
+    The output data and attachments of cells that refer to blobs are
+    replaced by :class:`LazyBundle` objects.
+    """
+    store = _get_store(blob_store)
+    for cell in nb.get('cells', []):
+        attachments = cell.get('attachments')
+        if isinstance(attachments, dict):
+            for name, bundle in list(attachments.items()):
+                dict.__setitem__(attachments, name, _lazy_bundle(bundle, store))
+        outputs = cell.get('outputs')
+        if isinstance(outputs, list):
+            for output in outputs:
+                if isinstance(output, dict) and 'data' in output:
+                    dict.__setitem__(output, 'data', _lazy_bundle(output['data'], store))
+    return nb
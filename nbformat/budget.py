@@ -0,0 +1,184 @@
+"""Limiting the size of outputs written to notebook files
+
+Writing a notebook with ``nbformat.write(nb, fp, budget=OutputBudget(...))``
+caps the size of the text of stream outputs and of the ``text/plain`` data
+of other outputs, per output and for the notebook as a whole.  Text over
+budget is cut short, and a marker saying how much was dropped is put in its
+place.  The notebook itself is not modified: outputs are cut on shallow
+copies before the notebook is validated and serialized, so a runaway output
+is never validated, encoded or copied in full, and with ``stream=True`` the
+notebook is never held in memory as one string.  What was dropped is
+recorded in :attr:`OutputBudget.truncated`.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from collections import namedtuple
+
+from traitlets.log import get_logger
+
+from .notebooknode import NotebookNode
+
+MARKER = u'\n[... %(dropped)i bytes of output truncated ...]\n'
+
+#: A record of a value cut short: the index of the cell and of the output,
+#: the key of the value (``'text'`` or ``'text/plain'``), and its size and
+#: the size kept, in bytes of UTF-8.
+Truncation = namedtuple('Truncation', ['cell', 'output', 'key', 'size', 'kept'])
+
+# text is measured and cut in pieces of this many characters
+_PIECE = 1024 * 1024
+
+
+def _utf8_size(text):
+    """The size of text in UTF-8, without encoding all of it at once"""
+    try:
+        if text.isascii():
+            return len(text)
+    except AttributeError:  # Python < 3.7
+        pass
+    return sum(
+        len(text[start:start + _PIECE].encode('utf-8', 'surrogatepass'))
+        for start in range(0, len(text), _PIECE)
+    )
+
+
+def _head(text, size):
+    """The longest start of text that is at most `size` bytes of UTF-8"""
+    # a character is at least one byte
+    return text[:size].encode('utf-8', 'surrogatepass')[:size].decode('utf-8', 'ignore')
+
+
+def _tail(text, size):
+    """The longest end of text that is at most `size` bytes of UTF-8"""
+    if size <= 0:
+        return u''
+    return text[-size:].encode('utf-8', 'surrogatepass')[-size:].decode('utf-8', 'ignore')
+
+
+class OutputBudget(object):
+    """Byte budgets for the text of outputs, applied as a notebook is written
+
+    The text of stream outputs and the ``text/plain`` data of other outputs
+    are measured in bytes of UTF-8.  Other values, such as images, are
+    written as they are and do not count against the budgets.
+
+    A budget can be used for any number of writes; each write starts afresh,
+    and :attr:`truncated` records what the last one dropped.
+
+    Parameters
+    ----------
+    max_output_bytes : int, optional
+        The most bytes of text kept from any one output.
+    max_notebook_bytes : int, optional
+        The most bytes of text kept from all the outputs of the notebook.
+        Once it is spent, the text of later outputs is replaced by the marker.
+    elide : bool, optional
+        If True, keep the start and the end of text over budget, half of the
+        budget each, and put the marker in the middle, which keeps the last
+        lines, such as the end of a traceback.  By default the end is dropped.
+    marker : str, optional
+        The text put in place of what was dropped, formatted with the number
+        of bytes dropped as ``%(dropped)i``.  It does not count against the
+        budgets.
+    """
+
+    def __init__(self, max_output_bytes=None, max_notebook_bytes=None, elide=False, marker=MARKER):
+        self.max_output_bytes = max_output_bytes
+        self.max_notebook_bytes = max_notebook_bytes
+        self.elide = elide
+        self.marker = marker
+        self.reset()
+
+    def reset(self):
+        """Start a new notebook, with the whole notebook budget available"""
+        #: The :class:`Truncation` of each value cut short so far.
+        self.truncated = []
+        self.used = 0
+
+    @property
+    def dropped(self):
+        """The total bytes dropped so far"""
+        return sum(t.size - t.kept for t in self.truncated)
+
+    def _limit(self):
+        limits = [self.max_output_bytes]
+        if self.max_notebook_bytes is not None:
+            limits.append(max(self.max_notebook_bytes - self.used, 0))
+        limits = [limit for limit in limits if limit is not None]
+        return min(limits) if limits else None
+
+    def _cut(self, text, cell_index, output_index, key):
+        """Return text cut to the budget left, recording what was dropped"""
+        if isinstance(text, list) and all(isinstance(line, str) for line in text):
+            text = u''.join(text)
+        limit = self._limit()
+        if limit is None or not isinstance(text, str):
+            return text, False
+        if self.max_notebook_bytes is None and len(text) <= limit // 4:
+            # it fits whatever the characters, and the total does not matter
+            return text, False
+        size = _utf8_size(text)
+        if size <= limit:
+            self.used += size
+            return text, False
+        if self.elide:
+            head = _head(text, limit - limit // 2)
+            tail = _tail(text, limit // 2)
+        else:
+            head, tail = _head(text, limit), u''
+        kept = _utf8_size(head) + _utf8_size(tail)
+        self.used += kept
+        self.truncated.append(Truncation(cell_index, output_index, key, size, kept))
+        return head + self.marker % {'dropped': size - kept} + tail, True
+
+    def output(self, output, cell_index, output_index):
+        """Return an output with its text cut to the budget left
+
+        The output is returned as it is if nothing is cut, otherwise a
+        shallow copy is.
+        """
+        if not isinstance(output, dict):
+            return output
+        if output.get('output_type') == 'stream' and 'text' in output:
+            text, cut = self._cut(output['text'], cell_index, output_index, 'text')
+            if cut:
+                return NotebookNode(output, text=text)
+        elif isinstance(output.get('data'), dict) and 'text/plain' in output['data']:
+            data = output['data']
+            text, cut = self._cut(data['text/plain'], cell_index, output_index, 'text/plain')
+            if cut:
+                return NotebookNode(output, data=dict(data, **{'text/plain': text}))
+        return output
+
+    def cell(self, cell, cell_index):
+        """Return a cell with the text of its outputs cut to the budget left
+
+        The cell is returned as it is if nothing is cut, otherwise a shallow
+        copy is, with a new list of outputs.
+        """
+        outputs = cell.get('outputs') if isinstance(cell, dict) else None
+        if not isinstance(outputs, list):
+            return cell
+        new_outputs = [self.output(output, cell_index, index) for index, output in enumerate(outputs)]
+        if any(new is not old for new, old in zip(new_outputs, outputs)):
+            return NotebookNode(cell, outputs=new_outputs)
+        return cell
+
+    def notebook(self, nb):
+        """Return a v4 notebook with the text of its outputs cut to the budget
+
+        Starts a new notebook with :meth:`reset`, and logs a warning if
+        anything is cut.
+        """
+        self.reset()
+        cells = [self.cell(cell, index) for index, cell in enumerate(nb.get('cells', []))]
+        self.log()
+        return NotebookNode(nb, cells=cells)
+
+    def log(self):
+        """Log a warning about what was dropped, if anything"""
+        if self.truncated:
+            get_logger().warning("Truncated %i outputs to fit the output budget, dropping %i bytes",
+                                 len(self.truncated), self.dropped)
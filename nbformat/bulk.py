@@ -0,0 +1,225 @@
+"""Reading and writing many notebooks at once
+
+:func:`read_many` and :func:`write_many` read and write notebooks in a pool
+of worker processes or threads, keeping only a bounded number of them in
+flight at a time.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import stat
+import uuid
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+)
+
+_warmed = False
+
+
+def _warm_validators():
+    """Load and compile the validators for current notebooks
+
+    Validators are cached per process, so a worker pays the cost of loading
+    and compiling the schema once, for its first notebook, rather than for
+    every notebook.
+    """
+    global _warmed
+    if _warmed:
+        return
+    from .validator import get_validator, get_ref_validator, _cell_refs, _output_refs
+    from .v4 import nbformat, nbformat_minor
+
+    get_validator(nbformat, nbformat_minor)
+    for ref in ['cell', 'output'] + sorted(_cell_refs.values()) + sorted(_output_refs.values()):
+        get_ref_validator(ref, nbformat, nbformat_minor)
+    _warmed = True
+
+
+def _read_one(path, as_version, kwargs):
+    from . import read
+
+    _warm_validators()
+    return read(path, as_version, **kwargs)
+
+
+def _copy_owner_and_mode(st, path):
+    """Give `path` the owner, where allowed, and permissions in `st`"""
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(path, st.st_uid, st.st_gid)
+        except OSError:
+            # only the superuser can give files away
+            pass
+    # after chown, which can clear the setuid and setgid bits
+    os.chmod(path, stat.S_IMODE(st.st_mode))
+
+
+def atomic_write(nb, path, version=None, compression='infer', **kwargs):
+    """Write a notebook to a path, atomically
+
+    The notebook is written to a temporary file in the same directory, which
+    is then renamed over `path`, so readers see either the old file or the
+    complete new one, never part of it.  The data is not synced to disk.
+    A file replaced keeps its permissions and, where allowed, its owner.
+    Arguments are as for :func:`nbformat.write`.
+    """
+    from . import write, NO_CONVERT
+    from .compression import infer_compression
+
+    if not isinstance(path, (str, bytes)):
+        path = str(path)
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    if compression == 'infer':
+        compression = infer_compression(path)
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, '.%s.%s.tmp' % (name, uuid.uuid4().hex))
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        st = None
+    # created with the same permissions as a new file at path would have, or
+    # private until given those of the file it replaces
+    os.close(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666 if st is None else 0o600))
+    try:
+        if st is not None:
+            _copy_owner_and_mode(st, tmp_path)
+        write(nb, tmp_path, NO_CONVERT if version is None else version,
+              compression=compression, **kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_one(nb, path, version, kwargs):
+    _warm_validators()
+    atomic_write(nb, path, version, **kwargs)
+
+
+def _make_executor(executor, workers):
+    if executor == 'process':
+        return ProcessPoolExecutor(workers)
+    elif executor == 'thread':
+        return ThreadPoolExecutor(workers or (os.cpu_count() or 1) * 5)
+    raise ValueError("executor must be 'process', 'thread' or an Executor, not %r" % (executor,))
+
+
+def read_many(paths, as_version, workers=None, executor='process', ordered=False,
+              max_in_flight=None, **kwargs):
+    """Read many notebooks in parallel
+
+    Parameters
+    ----------
+    paths : iterable of str
+        The paths of the notebooks to read.  The iterable is consumed lazily,
+        so it can be a generator over a large tree of files.
+    as_version : int
+        The version of the notebook format to return, as for
+        :func:`nbformat.read`.
+    workers : int, optional
+        The number of worker processes or threads.  Defaults to the default of
+        the executor.
+    executor : 'process', 'thread' or Executor, optional
+        Whether to read notebooks in worker processes (the default) or
+        threads, or an existing :class:`concurrent.futures.Executor` to use.
+        An executor passed in is not shut down.
+    ordered : bool, optional
+        If True, yield notebooks in the order of `paths`; otherwise (the
+        default), as soon as they have been read.
+    max_in_flight : int, optional
+        The most notebooks being read or waiting to be yielded at a time,
+        which bounds memory use.  Defaults to twice the number of workers.
+    **kwargs
+        Passed to :func:`nbformat.read`.
+
+    Yields
+    ------
+    (path, nb_or_exception)
+        Each path, with the notebook read from it, or the exception raised
+        while reading it.
+    """
+    return _map(_read_one, ((path, (path, as_version, kwargs)) for path in paths),
+                workers, executor, ordered, max_in_flight)
+
+
+def _map(func, items, workers, executor, ordered, max_in_flight):
+    """Call ``func(*args)`` in a pool for each ``(key, args)`` in `items`
+
+    Yields each key with the result of its call, or the exception it raised,
+    keeping at most `max_in_flight` calls submitted or waiting to be yielded.
+    """
+    if isinstance(executor, Executor):
+        pool, own_pool = executor, False
+    else:
+        pool, own_pool = _make_executor(executor, workers), True
+    if max_in_flight is None:
+        max_in_flight = 2 * (workers or getattr(pool, '_max_workers', None) or os.cpu_count() or 1)
+
+    items = iter(items)
+    pending = deque() if ordered else set()
+    try:
+        while True:
+            for key, args in items:
+                future = pool.submit(func, *args)
+                future.key = key
+                if ordered:
+                    pending.append(future)
+                else:
+                    pending.add(future)
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                return
+
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                yield future.key, result
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_pool:
+            pool.shutdown(wait=True)
+
+
+def write_many(items, version=None, workers=None, executor='process', ordered=False,
+               max_in_flight=None, **kwargs):
+    """Write many notebooks in parallel
+
+    Each notebook is written with :func:`atomic_write`, so a file is either
+    left as it was or completely replaced.
+
+    Parameters
+    ----------
+    items : iterable of (path, NotebookNode)
+        The paths to write to, with the notebooks to write.  The iterable is
+        consumed lazily, as for :func:`read_many`.
+    version : int, optional
+        The nbformat version to write, as for :func:`nbformat.write`.
+    workers, executor, ordered, max_in_flight : optional
+        As for :func:`read_many`, with `ordered` for the order of the
+        results.  With worker processes, notebooks are pickled to send them
+        to the workers.
+    **kwargs
+        Passed to :func:`nbformat.write`.
+
+    Returns
+    -------
+    results : list of (path, None_or_exception)
+        Each path, with None if the notebook was written, or the exception
+        raised while writing it.  Every notebook has been written, or failed
+        to, by the time this returns.
+    """
+    return list(_map(_write_one, ((path, (nb, path, version, kwargs)) for path, nb in items),
+                     workers, executor, ordered, max_in_flight))
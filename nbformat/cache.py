@@ -0,0 +1,212 @@
+"""Caches of notebooks read from files, and of the hashes of files
+
+:func:`cached_read` returns notebooks from an in-memory LRU cache as long as
+the file they were read from is unchanged, as judged by its inode,
+modification time and size.  :class:`FileHashCache` keeps the hashes of the
+contents of files on the same terms, for ``nbformat.write(...,
+if_changed=True)``.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from .compression import open_for_reading
+from .v4.nodes import notebook_from_dict
+
+# the default limit on the total size of cached notebooks, in bytes
+MAX_BYTES = 256 * 1024 * 1024
+
+# the default limit on the number of files whose hashes are kept
+MAX_HASHES = 4096
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'max_bytes', 'current_bytes', 'entries'])
+
+
+def _file_key(path):
+    """The identity of the current contents of a file, as far as os.stat can tell"""
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class NotebookCache(object):
+    """An LRU cache of notebooks read from files
+
+    Entries are keyed on the absolute path of the file and the version the
+    notebook was read as, and are only used while the inode, modification
+    time and size of the file are unchanged.
+
+    The size of each entry is taken to be the size of the file.  When the
+    total exceeds `max_bytes`, the least recently used entries are evicted;
+    files larger than `max_bytes` are never cached.
+
+    The cache is safe to use from multiple threads.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self._hits = self._misses = self._evictions = 0
+
+    def read(self, path, as_version, copy=True):
+        """Read a notebook from a path, using the cache if the file is unchanged
+
+        Parameters
+        ----------
+        path : str
+            The path of the notebook file.
+        as_version : int
+            The version of the notebook format to return, as for
+            :func:`nbformat.read`.
+        copy : bool, optional
+            If True (the default), return a copy of the cached notebook that
+            can be freely modified.  If False, return the cached notebook
+            itself, which is faster; it must be treated as read-only, since
+            changing it would change what later calls return.
+
+        Returns
+        -------
+        nb : NotebookNode
+            The notebook that was read.
+        """
+        from . import read
+
+        if not isinstance(path, (str, bytes)):
+            path = str(path)
+        path = os.path.abspath(path)
+        key = (path, as_version)
+        file_key = _file_key(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == file_key:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                nb = entry[1]
+            else:
+                self._misses += 1
+                nb = None
+
+        if nb is None:
+            nb = read(path, as_version)
+            self._store(key, file_key, nb)
+        # cells and outputs of v4 notebooks keep their node classes, as when read
+        return notebook_from_dict(nb) if copy else nb
+
+    def _store(self, key, file_key, nb):
+        size = file_key[2]
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._current_bytes -= old[0][2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (file_key, nb)
+            self._current_bytes += size
+            while self._current_bytes > self.max_bytes:
+                _, (evicted_file_key, _) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_file_key[2]
+                self._evictions += 1
+
+    def cache_info(self):
+        """Return the hit, miss and eviction counts and the size of the cache"""
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions,
+                self.max_bytes, self._current_bytes, len(self._entries),
+            )
+
+    def cache_clear(self):
+        """Empty the cache and reset its statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+
+default_cache = NotebookCache()
+
+
+def cached_read(path, as_version, copy=True):
+    """Read a notebook from a path, using :data:`default_cache`
+
+    See :meth:`NotebookCache.read`.
+    """
+    return default_cache.read(path, as_version, copy=copy)
+
+
+def hash_text(chunks):
+    """The sha256 hex digest of pieces of text, encoded as UTF-8"""
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk.encode('utf-8'))
+    return h.hexdigest()
+
+
+class FileHashCache(object):
+    """An LRU cache of the hashes of the contents of files
+
+    The hash of a file is the sha256 hex digest of its text, decompressed if
+    the file is compressed, so it can be compared with :func:`hash_text` of
+    the text that would be written to it.  Entries are keyed on the absolute
+    path of the file, and are only used while the inode, modification time
+    and size of the file are unchanged.
+
+    The cache is safe to use from multiple threads.
+    """
+
+    def __init__(self, max_entries=MAX_HASHES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Return the hash of a file's contents, or None if it does not exist
+
+        The file is only read if it changed since its hash was last computed
+        or stored.
+        """
+        path = os.path.abspath(path)
+        try:
+            file_key = _file_key(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == file_key:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        h = hashlib.sha256()
+        with open_for_reading(path) as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self._store(path, file_key, digest)
+        return digest
+
+    def store(self, path, digest):
+        """Record the hash of what was just written to a file"""
+        path = os.path.abspath(path)
+        self._store(path, _file_key(path), digest)
+
+    def _store(self, path, file_key, digest):
+        with self._lock:
+            self._entries.pop(path, None)
+            self._entries[path] = (file_key, digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def cache_clear(self):
+        """Empty the cache"""
+        with self._lock:
+            self._entries.clear()
+
+
+default_hash_cache = FileHashCache()
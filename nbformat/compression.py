@@ -0,0 +1,170 @@
+"""Reading and writing compressed notebook files
+
+Notebooks compressed with gzip, xz or bzip2 are recognized when reading by
+their leading magic bytes, whatever their name, and are decompressed as they
+are read.  When writing to a path, the compression is inferred from its
+suffix (``.ipynb.gz``, ``.ipynb.xz``, ``.ipynb.bz2``), or can be given
+explicitly with a compression level.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import gzip
+import io
+import os
+
+try:
+    import bz2
+except ImportError:  # Python built without bz2
+    bz2 = None
+
+try:
+    import lzma
+except ImportError:  # Python built without lzma
+    lzma = None
+
+COMPRESSIONS = ('gzip', 'xz', 'bz2')
+
+_suffixes = {
+    '.gz': 'gzip',
+    '.xz': 'xz',
+    '.bz2': 'bz2',
+}
+
+_magic = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+]
+
+# enough bytes to recognize any of the magic numbers
+MAGIC_SIZE = 6
+
+
+def infer_compression(path):
+    """The compression implied by the suffix of a path, or None"""
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    return _suffixes.get(os.path.splitext(str(path))[1].lower())
+
+
+def detect_compression(head):
+    """The compression of data starting with the bytes `head`, or None"""
+    for magic, compression in _magic:
+        if head[:len(magic)] == magic:
+            return compression
+    return None
+
+
+def _module(compression):
+    if compression not in COMPRESSIONS:
+        raise ValueError("compression must be one of %s, not %r" % (', '.join(COMPRESSIONS), compression))
+    module = {'gzip': gzip, 'xz': lzma, 'bz2': bz2}[compression]
+    if module is None:
+        raise ImportError("%s compression is not available in this Python" % compression)
+    return module
+
+
+def decompress(data, compression):
+    """Decompress a whole buffer"""
+    return _module(compression).decompress(data)
+
+
+def decompress_buffer(data):
+    """Decompress bytes or another buffer, if compressed
+
+    Anything else, including a str, is returned as it is.
+    """
+    if isinstance(data, str):
+        return data
+    with memoryview(data) as view:
+        head = bytes(view[:MAGIC_SIZE])
+    compression = detect_compression(head)
+    if compression is None:
+        return data
+    return decompress(data, compression)
+
+
+def _open(target, mode, compression, compresslevel=None):
+    """Open a path or wrap a binary file object with a compression module
+
+    A file opened from a path is closed with the result; a file object
+    passed in is not.
+    """
+    module = _module(compression)
+    kwargs = {}
+    if 'w' in mode and compresslevel is not None:
+        kwargs['preset' if compression == 'xz' else 'compresslevel'] = compresslevel
+    if 't' in mode:
+        kwargs['encoding'] = 'utf-8'
+    return module.open(target, mode, **kwargs)
+
+
+class _Prepend(io.RawIOBase):
+    """A readable binary stream of some bytes followed by the rest of a file"""
+
+    def __init__(self, head, fp):
+        self._head = head
+        self._fp = fp
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._fp.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def open_for_reading(fp):
+    """Return a binary file object for a path or file, decompressing if needed
+
+    If `fp` is a path, the file is opened; the caller must close the result.
+    A file object that does not read bytes is returned as it is.
+    """
+    if not hasattr(fp, 'read'):
+        with io.open(fp, 'rb') as f:
+            compression = detect_compression(f.read(MAGIC_SIZE))
+        if compression is None:
+            return io.open(fp, 'rb')
+        return _open(fp, 'rb', compression)
+
+    if hasattr(fp, 'peek') and not isinstance(fp, io.TextIOBase):
+        head = fp.peek(MAGIC_SIZE)[:MAGIC_SIZE]
+        if isinstance(head, bytes):
+            compression = detect_compression(head)
+            if compression is not None:
+                return _open(fp, 'rb', compression)
+    return fp
+
+
+def wrap_reader(head, fp):
+    """Decompress a binary file whose first bytes, `head`, have already been read
+
+    Returns None if the file is not compressed.
+    """
+    compression = detect_compression(head)
+    if compression is None:
+        return None
+    return _open(io.BufferedReader(_Prepend(head, fp)), 'rb', compression)
+
+
+def open_for_writing(path, compression='infer', compresslevel=None):
+    """Open a path to write a notebook to as text, compressing if asked
+
+    `compression` is one of ``'gzip'``, ``'xz'`` or ``'bz2'``, None for no
+    compression, or ``'infer'`` (the default) to go by the suffix of the
+    path.  `compresslevel` is the compression level, from 0 to 9, or the
+    default of the compression.
+    """
+    if compression == 'infer':
+        compression = infer_compression(path)
+    if compression is None:
+        return io.open(path, 'w', encoding='utf-8')
+    return _open(path, 'wt', compression, compresslevel)
@@ -0,0 +1,159 @@
+"""Saving a notebook repeatedly, re-serializing only what changed
+
+An :class:`IncrementalWriter` keeps the serialized text of each cell it has
+written, keyed on a hash of the cell's content.  When the same notebook is
+saved again, only cells whose content changed are serialized and validated;
+the text of the others is reused.  This suits autosave, where one cell of a
+large notebook is edited between saves.
+
+If the changes of the notebook are tracked (see
+:func:`nbformat.track_changes`), cells that did not change are not even
+hashed.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import json
+
+from traitlets.log import get_logger
+
+from .compression import open_for_writing
+from .reader import get_version
+from .tracking import cell_changes
+from .v4.nbjson import _dumps_kwargs, _encoder, _iter_dict
+from .v4.rwbase import cell_for_writing, notebook_for_writing
+from .validator import iter_validate, iter_validate_cell
+
+
+def _cell_key(cell):
+    """A hash of the content of a cell
+
+    The repr of a cell is computed in C and much cheaper than serializing
+    it, and changes whenever the serialized cell would.
+    """
+    return hashlib.sha256(repr(cell).encode('utf-8', 'surrogatepass')).digest()
+
+
+class IncrementalWriter(object):
+    """Write a notebook repeatedly, re-serializing only the cells that changed
+
+    Writes the same text as :func:`nbformat.writes` and :func:`nbformat.write`
+    for v4 notebooks, which are not converted.  Other versions are written in
+    full every time.
+
+    Only the cells changed since the last write are serialized and validated,
+    and the notebook as a whole is validated without its cells.  Cells are
+    compared by content, so it does not matter whether they were changed in
+    place or replaced.  The serialized text of the cells of the last notebook
+    written is kept, so use one writer per notebook.
+
+    Parameters
+    ----------
+    **kwargs
+        Passed to :func:`nbformat.writes`: ``profile``, ``split_lines`` and
+        the arguments of ``json.dumps`` that profiles do not set, such as
+        ``ensure_ascii``.  Output budgets (``budget``) and externalized
+        output data (``externalize_over`` and ``blob_store``) are not
+        supported, and raise ValueError.
+    """
+
+    def __init__(self, **kwargs):
+        if kwargs.get('budget') is not None:
+            # how a cell is cut depends on the cells before it
+            raise ValueError("IncrementalWriter does not support output budgets")
+        if kwargs.get('externalize_over') is not None or kwargs.get('blob_store') is not None:
+            raise ValueError("IncrementalWriter does not support externalizing output data")
+        self.kwargs = kwargs
+        self._fragments = {}
+        # id of the Changes of a tracked cell -> (Changes, version, key)
+        self._tracked_keys = {}
+        self._version = None
+        # how many cells the last write encoded, and how many it reused
+        self.encoded = self.reused = 0
+
+    def clear(self):
+        """Forget the serialized cells, so the next write encodes every cell"""
+        self._fragments = {}
+        self._tracked_keys = {}
+
+    def writes(self, nb):
+        """Serialize a notebook to a string, reusing unchanged cells
+
+        Any notebook format errors will be logged.
+        """
+        from . import writes
+
+        version, version_minor = get_version(nb)
+        if version != 4 or not isinstance(nb.get('cells'), list):
+            return writes(nb, **self.kwargs)
+
+        profile, kwargs = _dumps_kwargs(dict(self.kwargs))
+        split = kwargs.pop('split_lines')
+        encode = _encoder(json.dumps, profile, kwargs)
+        # cells are two levels deep, in the notebook's list of cells
+        cell_level = 2 * (profile.indent or 0)
+
+        if (version, version_minor) != self._version:
+            # whether cells are valid depends on the version
+            self.clear()
+            self._version = (version, version_minor)
+
+        top = notebook_for_writing(nb, split, cells=False)
+        error = next(iter_validate(dict(nb, cells=[])), None)
+
+        fragments = {}
+        tracked_keys = {}
+        cells = []
+        self.encoded = self.reused = 0
+        for index, cell in enumerate(nb['cells']):
+            changes = cell_changes(cell)
+            if changes is None:
+                key = _cell_key(cell)
+            else:
+                known = self._tracked_keys.get(id(changes))
+                if known is not None and known[0] is changes and known[1] == changes.version:
+                    key = known[2]
+                else:
+                    key = _cell_key(cell)
+                tracked_keys[id(changes)] = (changes, changes.version, key)
+            entry = fragments.get(key) or self._fragments.get(key)
+            if entry is None:
+                cell_error = next(iter_validate_cell(cell, index, version, version_minor), None)
+                entry = (encode(cell_for_writing(cell, split), cell_level), cell_error is None)
+                self.encoded += 1
+            else:
+                cell_error = None
+                if not entry[1] and error is None:
+                    # get the error again, with the cell's current index
+                    cell_error = next(iter_validate_cell(cell, index, version, version_minor), None)
+                self.reused += 1
+            if error is None:
+                error = cell_error
+            fragments[key] = entry
+            cells.append(entry[0])
+        self._fragments = fragments
+        self._tracked_keys = tracked_keys
+
+        if error is not None:
+            get_logger().error("Notebook JSON is invalid: %s", error)
+
+        top['cells'] = cells
+        return ''.join(_iter_dict(top, 0, encode, {'cells': lambda fragment, level: [fragment]},
+                                  indent=profile.indent, sort_keys=profile.sort_keys))
+
+    def write(self, nb, fp, compression='infer', compresslevel=None):
+        """Write a notebook to a file, reusing unchanged cells
+
+        `fp` is a file-like object with a write method that accepts unicode,
+        or a path to write a file, compressed as for :func:`nbformat.write`.
+        """
+        s = self.writes(nb)
+        if not s.endswith(u'\n'):
+            s += u'\n'
+        try:
+            fp.write(s)
+        except AttributeError:
+            with open_for_writing(fp, compression, compresslevel) as f:
+                f.write(s)
@@ -0,0 +1,290 @@
+"""An append-only journal of changes to a notebook
+
+Rewriting a whole notebook after every output of a long run costs time
+proportional to the size of the notebook for every output.  A
+:class:`Journal` instead appends each change, such as a new output, as one
+line of JSON to a file next to the notebook (``<notebook path>.journal``),
+which costs time proportional to the change alone.  Now and then, and at
+the end of the run, :meth:`Journal.compact` writes the notebook with the
+changes applied, with :func:`nbformat.write`, and empties the journal.
+
+:func:`replay` reads a notebook with the changes in its journal applied,
+whether or not it has been compacted.
+
+The first line of a journal records the sha256 hash of the notebook file it
+applies to, so a journal left behind by a crash after the notebook was
+rewritten, but before the journal was emptied, is recognized as stale and
+ignored.  A last line that was only partly written is ignored too.
+
+Each line is an object with an ``op`` key:
+
+``{"op": "base", "journal": 1, "sha256": <hex digest or null>}``
+    The first line.  The hash is null if the notebook file did not exist,
+    in which case changes apply to a new empty notebook.
+``{"op": "insert_cell", "index": i, "cell": {...}}``
+    Insert a cell before index `i`; an index past the end appends.
+``{"op": "set_cell", "index": i, "cell": {...}}``
+    Replace a cell.
+``{"op": "update_cell", "index": i, "fields": {...}}``
+    Set some fields of a cell, such as its ``source`` or ``execution_count``.
+``{"op": "delete_cell", "index": i}``
+    Delete a cell.
+``{"op": "add_output", "index": i, "output": {...}}``
+    Append an output to a cell.  Stream output following stream output of
+    the same name is merged into it, as frontends do.
+``{"op": "clear_outputs", "index": i}``
+    Clear the outputs of a cell.
+``{"op": "set_metadata", "metadata": {...}}``
+    Replace the metadata of the notebook.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import io
+import json
+import os
+
+from .cache import default_hash_cache
+from .notebooknode import from_dict
+from .v4.nbjson import BytesEncoder
+from .v4.nodes import cell_from_dict, output_from_dict
+
+JOURNAL_VERSION = 1
+
+SUFFIX = '.journal'
+
+
+def _str_path(path):
+    if isinstance(path, bytes):
+        return os.fsdecode(path)
+    return str(path)
+
+
+def journal_path(nb_path):
+    """The path of the journal of the notebook at `nb_path`"""
+    return _str_path(nb_path) + SUFFIX
+
+
+def _dumps(event):
+    return json.dumps(event, cls=BytesEncoder, ensure_ascii=False, separators=(',', ':'))
+
+
+def _notebook_hash(nb_path):
+    return default_hash_cache.get(nb_path)
+
+
+def read_events(path):
+    """Read the events of a journal file, including its base line
+
+    Returns an empty list if the file does not exist.  A last line without
+    a newline, left by a crash while it was being written, is ignored.
+    """
+    try:
+        with io.open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+    except FileNotFoundError:
+        return []
+    # the part after the last newline is empty, or was cut short
+    return [json.loads(line) for line in lines[:-1] if line]
+
+
+def _cell_at(cells, index):
+    try:
+        return cells[index]
+    except IndexError:
+        raise ValueError("Journal refers to cell %i of a notebook with %i cells" % (index, len(cells)))
+
+
+def _add_output(outputs, output):
+    last = outputs[-1] if outputs else None
+    if (output.get('output_type') == 'stream' and last is not None
+            and last.get('output_type') == 'stream' and last.get('name') == output.get('name')
+            and isinstance(last.get('text'), str) and isinstance(output.get('text'), str)):
+        last['text'] += output['text']
+    else:
+        outputs.append(output)
+
+
+def apply_event(nb, event):
+    """Apply one journal event to a v4 notebook (in-place)
+
+    Cells and outputs are given their node classes, as when a notebook is
+    read.
+    """
+    op = event.get('op')
+    cells = nb.cells
+    if op == 'base':
+        pass
+    elif op == 'insert_cell':
+        cells.insert(event['index'], cell_from_dict(event['cell']))
+    elif op == 'set_cell':
+        _cell_at(cells, event['index'])
+        cells[event['index']] = cell_from_dict(event['cell'])
+    elif op == 'update_cell':
+        cell = _cell_at(cells, event['index'])
+        # converts outputs among the fields too
+        cell.update(cell_from_dict(event['fields']))
+        if 'cell_type' in event['fields']:
+            cells[event['index']] = cell_from_dict(cell)
+    elif op == 'delete_cell':
+        _cell_at(cells, event['index'])
+        del cells[event['index']]
+    elif op == 'add_output':
+        _add_output(_cell_at(cells, event['index']).setdefault('outputs', []), output_from_dict(event['output']))
+    elif op == 'clear_outputs':
+        _cell_at(cells, event['index'])['outputs'] = []
+    elif op == 'set_metadata':
+        nb.metadata = from_dict(event['metadata'])
+    else:
+        raise ValueError("Unknown journal event: %r" % (op,))
+    return nb
+
+
+def replay(nb_path, as_version=4, path=None):
+    """Read a notebook with the changes in its journal applied
+
+    Parameters
+    ----------
+    nb_path : str
+        The path of the notebook.  If it does not exist, changes are applied
+        to a new notebook.
+    as_version : int, optional
+        The version to read the notebook as; only 4 is supported.
+    path : str, optional
+        The path of the journal, ``<nb_path>.journal`` by default.
+
+    Returns
+    -------
+    nb : NotebookNode
+        The notebook, with the changes applied.  A stale journal, whose base
+        is not the current notebook file, is ignored.
+    """
+    from . import read
+    from .v4 import new_notebook
+
+    if as_version != 4:
+        raise ValueError("Journals can only be replayed as v4 notebooks, not v%s" % as_version)
+    nb_path = _str_path(nb_path)
+    events = read_events(path or journal_path(nb_path))
+    base_hash = _notebook_hash(nb_path)
+    nb = new_notebook() if base_hash is None else read(nb_path, as_version)
+    if not events or events[0].get('op') != 'base' or events[0].get('sha256') != base_hash:
+        return nb
+    for event in events[1:]:
+        apply_event(nb, event)
+    return nb
+
+
+class Journal(object):
+    """An append-only journal of changes to the notebook at `nb_path`
+
+    Events are appended to the journal file, and flushed, as they are
+    added.  The journal assumes that it is the only writer of the notebook
+    and its journal while it is open.
+
+    Parameters
+    ----------
+    nb_path : str
+        The path of the notebook.  It need not exist yet.
+    path : str, optional
+        The path of the journal, ``<nb_path>.journal`` by default.
+    sync : bool, optional
+        If True, sync each event to disk, so that it survives the machine
+        crashing rather than only the process.  This is much slower.
+    """
+
+    def __init__(self, nb_path, path=None, sync=False):
+        self.nb_path = nb_path = _str_path(nb_path)
+        self.path = path or journal_path(nb_path)
+        self.sync = sync
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the journal file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        """Open the journal for appending, starting it afresh if it is stale"""
+        base_hash = _notebook_hash(self.nb_path)
+        events = read_events(self.path)
+        if events and events[0].get('op') == 'base' and events[0].get('sha256') == base_hash:
+            f = io.open(self.path, 'r+b')
+            # drop a last line that was cut short
+            data = f.read()
+            f.seek(data.rfind(b'\n') + 1)
+            f.truncate()
+        else:
+            f = io.open(self.path, 'wb')
+            f.write(_dumps({'op': 'base', 'journal': JOURNAL_VERSION, 'sha256': base_hash}).encode('utf-8') + b'\n')
+        self._file = f
+
+    def append(self, event):
+        """Append an event to the journal"""
+        if self._file is None:
+            self._open()
+        self._file.write(_dumps(event).encode('utf-8') + b'\n')
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def insert_cell(self, index, cell):
+        """Insert a cell before index `index`"""
+        self.append({'op': 'insert_cell', 'index': index, 'cell': cell})
+
+    def set_cell(self, index, cell):
+        """Replace the cell at `index`"""
+        self.append({'op': 'set_cell', 'index': index, 'cell': cell})
+
+    def update_cell(self, index, **fields):
+        """Set fields of the cell at `index`, such as ``execution_count``"""
+        self.append({'op': 'update_cell', 'index': index, 'fields': fields})
+
+    def delete_cell(self, index):
+        """Delete the cell at `index`"""
+        self.append({'op': 'delete_cell', 'index': index})
+
+    def add_output(self, index, output):
+        """Append an output to the cell at `index`"""
+        self.append({'op': 'add_output', 'index': index, 'output': output})
+
+    def clear_outputs(self, index):
+        """Clear the outputs of the cell at `index`"""
+        self.append({'op': 'clear_outputs', 'index': index})
+
+    def set_metadata(self, metadata):
+        """Replace the metadata of the notebook"""
+        self.append({'op': 'set_metadata', 'metadata': metadata})
+
+    def replay(self):
+        """Return the notebook with the changes in the journal applied"""
+        if self._file is not None:
+            self._file.flush()
+        return replay(self.nb_path, 4, self.path)
+
+    def compact(self, **kwargs):
+        """Write the notebook with the changes applied, and empty the journal
+
+        The notebook is written atomically, with
+        :func:`nbformat.bulk.atomic_write`, which uses :func:`nbformat.write`;
+        `kwargs` are passed to it.  Returns the notebook written.
+        """
+        from .bulk import atomic_write
+
+        nb = self.replay()
+        atomic_write(nb, self.nb_path, **kwargs)
+        # a crash here leaves a journal whose base no longer matches
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return nb
@@ -0,0 +1,145 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+"""
+Pluggable JSON backends for parsing notebooks.
+
+Every backend exposes ``loads`` with the signature of the standard library
+function.  A backend that cannot honour some arguments defers to the
+standard library for that call.
+
+Notebooks are always serialized with the standard library: the format on
+disk depends on exactly how it indents and escapes text and formats floats,
+and matching that byte for byte in another encoder costs more than it saves.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from json import detect_encoding
+except ImportError:  # Python 3.5
+    import codecs
+
+    def detect_encoding(b):
+        """Detect the encoding of JSON bytes from their first 4 bytes (RFC 4627)"""
+        if b.startswith((codecs.BOM_UTF32_BE, codecs.BOM_UTF32_LE)):
+            return 'utf-32'
+        if b.startswith((codecs.BOM_UTF16_BE, codecs.BOM_UTF16_LE)):
+            return 'utf-16'
+        if b.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        if len(b) >= 4:
+            if not b[0]:
+                return 'utf-16-be' if b[1] else 'utf-32-be'
+            if not b[1]:
+                return 'utf-16-le' if b[2] or b[3] else 'utf-32-le'
+        elif len(b) == 2:
+            if not b[0]:
+                return 'utf-16-be'
+            if not b[1]:
+                return 'utf-16-le'
+        return 'utf-8'
+
+
+def _decode_buffer(buf):
+    """Decode bytes or a buffer such as an mmap to str, like json.loads does
+
+    Buffers are decoded in place, without being copied to a bytes object
+    first.
+    """
+    with memoryview(buf) as view:
+        encoding = detect_encoding(view[:4].tobytes())
+        return str(view, encoding, 'surrogatepass')
+
+
+class JSONBackend:
+    """The standard library ``json`` module
+
+    In addition to str, ``loads`` accepts bytes and other buffers, such as
+    ``mmap`` and ``memoryview`` objects.
+    """
+    name = "json"
+
+    def loads(self, s, **kwargs):
+        if not isinstance(s, str):
+            s = _decode_buffer(s)
+        return json.loads(s, **kwargs)
+
+    def loads_nodes(self, s, **kwargs):
+        """Parse JSON with every object built as a NotebookNode as it is decoded
+
+        This saves converting the parsed dicts with ``from_dict``, which
+        copies them all and recurses twice as deep as the parser.  Backends
+        that cannot build nodes return dicts, which callers convert.
+        """
+        from .notebooknode import NotebookNode
+
+        if not isinstance(s, str):
+            s = _decode_buffer(s)
+        return json.loads(s, object_pairs_hook=NotebookNode, **kwargs)
+
+
+class OrjsonBackend(JSONBackend):
+    """`orjson <https://github.com/ijl/orjson>`_ for parsing
+
+    ``orjson.loads`` is used unless extra decoder arguments are given, and
+    parses UTF-8 buffers such as ``mmap`` objects without decoding them to a
+    str.  Input that orjson rejects but the standard library accepts
+    (``NaN``, ``Infinity``, lone surrogates, UTF-16) is retried with the
+    standard library.
+    Integers outside the 64-bit range are parsed as floats.
+    """
+    name = "orjson"
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return JSONBackend.loads(self, s, **kwargs)
+        try:
+            if isinstance(s, (str, bytes, bytearray)):
+                return orjson.loads(s)
+            # parse mmaps and other buffers in place
+            with memoryview(s) as view:
+                return orjson.loads(view)
+        except ValueError:
+            return JSONBackend.loads(self, s)
+
+    def loads_nodes(self, s, **kwargs):
+        """Parse JSON to dicts, as orjson cannot build NotebookNodes"""
+        return self.loads(s, **kwargs)
+
+
+_BACKEND_MAP = [
+    ("orjson", orjson, OrjsonBackend),
+    ("json", json, JSONBackend),
+]
+BACKENDS = [item[0] for item in _BACKEND_MAP]
+
+
+def _backend_for_name(backend_name):
+    if backend_name not in BACKENDS:
+        raise ValueError("Invalid JSON backend '{0}' value!\nValid values are: {1}".format(
+            backend_name, BACKENDS))
+
+    for (name, module, backend_cls) in _BACKEND_MAP:
+        if module and backend_name == name:
+            return backend_cls()
+    # not installed, fall back on the standard library
+    return JSONBackend()
+
+
+def get_json_backend(backend_name=None):
+    """
+    Return a JSON backend by name.
+
+    If no name is given, the value of the environment variable
+    ``NBFORMAT_JSON_BACKEND`` is used, defaulting to the standard library.
+    Backends that are not installed fall back on the standard library.
+    """
+    if backend_name is None:
+        backend_name = os.environ.get("NBFORMAT_JSON_BACKEND", "json")
+    return _backend_for_name(backend_name)
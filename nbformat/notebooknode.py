@@ -1,5 +1,7 @@
 """NotebookNode - adding attribute access to dicts"""
 
+from operator import itemgetter
+
 from ipython_genutils.ipstruct import Struct
 try:
     from collections.abc import Mapping
@@ -7,13 +9,66 @@ except ImportError:
     from collections import Mapping
 
 
+# The keys of notebooks, cells and outputs in the notebook format.  Reading
+# them as attributes goes through a property on the class, which costs about
+# as much as looking up the item.  Other keys are read through __getattr__,
+# which Python only calls after a failed attribute lookup, and which takes
+# several times as long.
+FIELDS = frozenset([
+    # notebooks
+    'cells', 'metadata', 'nbformat', 'nbformat_minor', 'worksheets',
+    # cells
+    'cell_type', 'id', 'source', 'attachments', 'outputs', 'execution_count',
+    'input', 'prompt_number', 'language', 'level',
+    # outputs
+    'output_type', 'name', 'text', 'data', 'ename', 'evalue', 'traceback',
+])
+
+
+class MissingKey(KeyError, AttributeError):
+    """A key is missing from a NotebookNode
+
+    Both a KeyError, for item access, and an AttributeError, for attribute
+    access to the keys in :data:`FIELDS`.
+    """
+
+
 class NotebookNode(Struct):
     """A dict-like node with attribute-access"""
 
+    # Struct sets _allownew on every instance, which gives each node a
+    # __dict__ bigger than most nodes; the class attribute has the same value
+    # until allow_new_attr is called.  Using dict's own __init__ also makes
+    # creating nodes as cheap as creating dicts, for the JSON parser.
+    __init__ = dict.__init__
+
+    def __missing__(self, key):
+        raise MissingKey(key)
+
+    def __getattr__(self, key):
+        # checked first, as probes such as copy's for __deepcopy__ miss often
+        if key in self:
+            return self[key]
+        raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        # as for Struct, but without looking at (and so creating) __dict__:
+        # the only instance attribute Struct sets is also a class attribute
+        if isinstance(key, str) and key not in FIELDS and hasattr(type(self), key):
+            raise AttributeError('attr %s is a protected member of class Struct.' % key)
+        try:
+            self.__setitem__(key, value)
+        except KeyError as e:
+            raise AttributeError(e)
+
     def __setitem__(self, key, value):
-        if isinstance(value, Mapping) and not isinstance(value, NotebookNode):
+        # only dicts are converted: from_dict leaves other mappings as they are
+        if isinstance(value, dict) and not isinstance(value, NotebookNode):
             value = from_dict(value)
-        super(NotebookNode, self).__setitem__(key, value)
+        if not self._allownew and key not in self:
+            raise KeyError(
+                "can't create new attribute %s when allow_new_attr(False)" % key)
+        dict.__setitem__(self, key, value)
 
     def update(self, *args, **kwargs):
         """
@@ -25,7 +80,15 @@ class NotebookNode(Struct):
                             len(args))
         if args:
             other = args[0]
-            if isinstance(other, Mapping):
+            if (isinstance(other, dict) and type(other).__getitem__ is dict.__getitem__
+                    and type(self).__setitem__ is NotebookNode.__setitem__ and self._allownew):
+                # the same as setting each item, in one go
+                dict.update(self, {
+                    key: from_dict(value) if isinstance(value, dict) and not isinstance(value, NotebookNode)
+                    else value
+                    for key, value in dict.items(other)
+                })
+            elif isinstance(other, Mapping):
                 for key in other:
                     self[key] = other[key]
             elif hasattr(other, "keys"):
@@ -38,6 +101,11 @@ class NotebookNode(Struct):
             self[key] = value
 
 
+for _field in FIELDS:
+    setattr(NotebookNode, _field, property(itemgetter(_field), doc="The %r item" % _field))
+del _field
+
+
 def from_dict(d):
     """Convert dict to dict-like NotebookNode
 
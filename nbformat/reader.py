@@ -3,18 +3,33 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
-import json
+from .json_backend import get_json_backend
 
 class NotJSONError(ValueError):
     pass
 
-def parse_json(s, **kwargs):
-    """Parse a JSON string into a dict."""
+def parse_json(s, json_backend=None, nodes=False, **kwargs):
+    """Parse a JSON string into a dict.
+
+    `s` may be a str, or bytes or any other buffer (such as an ``mmap``)
+    holding encoded JSON.  `json_backend` names the JSON library to use
+    (see :func:`nbformat.json_backend.get_json_backend`).  If `nodes` is
+    True, JSON objects are built as NotebookNodes while parsing, rather
+    than dicts, by the backends that can.
+    """
+    backend = get_json_backend(json_backend)
     try:
-        nb_dict = json.loads(s, **kwargs)
+        if nodes:
+            nb_dict = backend.loads_nodes(s, **kwargs)
+        else:
+            nb_dict = backend.loads(s, **kwargs)
     except ValueError as e:
+        if isinstance(s, (str, bytes, bytearray)):
+            head = s[:80]
+        else:
+            head = bytes(memoryview(s)[:80])
         # Limit the error message to 80 characters.  Display whatever JSON will fit.
-        raise NotJSONError(("Notebook does not appear to be JSON: %r" % s)[:77] + "...") from e
+        raise NotJSONError(("Notebook does not appear to be JSON: %r" % head)[:77] + "...") from e
     return nb_dict
 
 # High level API
@@ -36,7 +51,7 @@ def get_version(nb):
     return (major, minor)
 
 
-def reads(s, **kwargs):
+def reads(s, lazy=False, **kwargs):
     """Read a notebook from a json string and return the 
     NotebookNode object.
 
@@ -45,20 +60,32 @@ def reads(s, **kwargs):
 
     Parameters
     ----------
-    s : unicode | bytes
-        The raw string or bytes object to read the notebook from.
+    s : unicode | bytes | buffer
+        The raw string, or bytes or other buffer such as an ``mmap``
+        object, to read the notebook from.
+    lazy : bool, optional
+        Convert the cells of v4 notebooks only when they are first accessed.
+        Ignored for older versions.
 
     Returns
     -------
     nb : NotebookNode
         The notebook that was read.
     """
-    from . import versions, NBFormatError
-    
     nb_dict = parse_json(s, **kwargs)
+    return to_notebook(nb_dict, lazy=lazy)
+
+
+def to_notebook(nb_dict, lazy=False):
+    """Convert a notebook dict of any version, as parsed from JSON, to a NotebookNode
+
+    No version conversion is performed.
+    """
+    from . import versions, NBFormatError
+
     (major, minor) = get_version(nb_dict)
     if major in versions:
-        return versions[major].to_notebook_json(nb_dict, minor=minor)
+        return versions[major].to_notebook_json(nb_dict, minor=minor, lazy=lazy)
     else:
         raise NBFormatError('Unsupported nbformat version %s' % major)
 
@@ -72,7 +99,7 @@ def read(fp, **kwargs):
     Parameters
     ----------
     fp : file
-        Any file-like object with a read method.
+        Any file-like object with a read method, in text or binary mode.
 
     Returns
     -------
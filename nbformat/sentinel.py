@@ -3,6 +3,9 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+from importlib import import_module
+
+
 class Sentinel(object):
 
     def __init__(self, name, module, docstring=None):
@@ -15,3 +18,12 @@ class Sentinel(object):
     def __repr__(self):
         return str(self.module)+'.'+self.name
 
+    def __reduce__(self):
+        # pickle by reference, so that identity checks survive a round trip
+        # (e.g. to a process pool)
+        return _lookup, (self.module, self.name)
+
+
+def _lookup(module, name):
+    return getattr(import_module(module), name)
+
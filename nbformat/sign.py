@@ -309,6 +309,22 @@ def signature_removed(nb):
             nb['metadata']['signature'] = save_signature
 
 
+def compute_signature(nb, secret, digestmod):
+    """Compute a notebook's signature
+
+    by hashing the entire contents of the notebook via HMAC digest,
+    with the given secret key and digest (a hashlib constructor or its name).
+    """
+    hmac = HMAC(secret, digestmod=digestmod)
+    # don't include the previous hash in the content to hash
+    with signature_removed(nb):
+        # sign the whole thing
+        for b in yield_everything(nb):
+            hmac.update(b)
+
+    return hmac.hexdigest()
+
+
 class NotebookNotary(LoggingConfigurable):
     """A class for computing and verifying notebook signatures."""
 
@@ -410,14 +426,7 @@ class NotebookNotary(LoggingConfigurable):
 
         by hashing the entire contents of the notebook via HMAC digest.
         """
-        hmac = HMAC(self.secret, digestmod=self.digestmod)
-        # don't include the previous hash in the content to hash
-        with signature_removed(nb):
-            # sign the whole thing
-            for b in yield_everything(nb):
-                hmac.update(b)
-
-        return hmac.hexdigest()
+        return compute_signature(nb, self.secret, self.digestmod)
 
     def check_signature(self, nb):
         """Check a notebook's stored signature
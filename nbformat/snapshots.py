@@ -0,0 +1,162 @@
+"""Read-only snapshots of notebooks that share unchanged parts
+
+Undo histories, checkpoints and hooks that run before saving need a copy of
+a notebook that later changes will not affect, and ``copy.deepcopy`` copies
+every node of it each time.  :func:`snapshot` returns a read-only copy made
+of :class:`FrozenNode` and :class:`FrozenList` objects, which is shared
+rather than copied:
+
+- strings and other values are never copied, as they cannot change;
+- a node or list that has not changed since the last snapshot of the same
+  notebook is that snapshot's frozen copy of it, so successive snapshots
+  share every cell and output that did not change in between;
+- frozen nodes put in a notebook, such as a cell restored from an undo
+  history, are shared as they are (and stay read-only).
+
+So only the changed parts of a notebook are copied.  Without a record of
+what changed, the notebook is still walked to find them, but that only
+compares objects by identity, which is much cheaper than copying them.
+
+Snapshots cannot be modified.  Use :func:`thaw` to get a notebook that can.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import weakref
+
+from .notebooknode import NotebookNode
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("%s objects are read-only snapshots" % type(self).__name__)
+
+
+class FrozenNode(NotebookNode):
+    """A read-only NotebookNode, part of a snapshot"""
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = _read_only
+    update = pop = popitem = clear = setdefault = _read_only
+    __ior__ = __iadd__ = __isub__ = _read_only
+
+    def __reduce_ex__(self, protocol):
+        # the default would set items one at a time
+        return (type(self), (dict(self),))
+
+
+class FrozenList(list):
+    """A read-only list, part of a snapshot"""
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __reduce_ex__(self, protocol):
+        return (type(self), (list(self),))
+
+
+_frozen_types = (FrozenNode, FrozenList)
+_containers = (dict, list)
+_missing = object()
+
+# id(notebook) -> (weakref to the notebook, weakref to its last snapshot)
+_last_snapshots = {}
+
+
+def _freeze(value, base):
+    """Freeze `value`, reusing the parts of `base` that it is unchanged from
+
+    `base` is what the last snapshot holds in the place of `value`, or None.
+    """
+    if isinstance(value, _frozen_types):
+        return value
+    if isinstance(value, dict):
+        if type(base) is not FrozenNode:
+            base = None
+        items = {}
+        unchanged = base is not None and len(base) == len(value)
+        for key, item in value.items():
+            old = _missing if base is None else dict.get(base, key, _missing)
+            if isinstance(item, _containers):
+                item = _freeze(item, old)
+            items[key] = item
+            unchanged = unchanged and item is old
+        return base if unchanged else FrozenNode(items)
+    if isinstance(value, list):
+        if type(base) is not FrozenList:
+            base = None
+        items = []
+        unchanged = base is not None and len(base) == len(value)
+        # items are matched by position until one differs, and from the end
+        # after that, so that inserting or deleting items keeps the rest
+        offset = 0
+        for index, item in enumerate(value):
+            old = _missing
+            if base is not None and 0 <= index + offset < len(base):
+                old = base[index + offset]
+            frozen = _freeze(item, old) if isinstance(item, _containers) else item
+            if frozen is not old:
+                unchanged = False
+                if base is not None and not offset and len(base) != len(value):
+                    offset = len(base) - len(value)
+                    if isinstance(item, _containers) and 0 <= index + offset < len(base):
+                        # the first item after those deleted, perhaps
+                        frozen = _freeze(item, base[index + offset])
+            items.append(frozen)
+        return base if unchanged else FrozenList(items)
+    # strings and other values cannot change, so are shared
+    return value
+
+
+def _forget(key):
+    _last_snapshots.pop(key, None)
+
+
+def snapshot(nb, base=None):
+    """Return a read-only snapshot of a notebook, or of any part of one
+
+    The snapshot shares every part that is unchanged since `base`, which is
+    by default the last snapshot of `nb` that is still in use.  Changes
+    made to `nb` after the snapshot is taken do not affect it.  If the
+    changes of `nb` are tracked (see :func:`nbformat.track_changes`), cells
+    that did not change are not looked at.
+
+    Parameters
+    ----------
+    nb : NotebookNode
+        The notebook, or a cell or output of one.
+    base : FrozenNode, optional
+        An earlier snapshot of `nb` to share unchanged parts with.
+
+    Returns
+    -------
+    snapshot : FrozenNode
+        A read-only copy of `nb`, made of :class:`FrozenNode` and
+        :class:`FrozenList` objects.
+    """
+    from .tracking import TrackedNotebook, _freeze_notebook
+
+    if isinstance(nb, TrackedNotebook) and base is None:
+        return _freeze_notebook(nb)
+    key = id(nb)
+    if base is None:
+        nb_ref, snapshot_ref = _last_snapshots.get(key, (None, None))
+        if nb_ref is not None and nb_ref() is nb:
+            base = snapshot_ref()
+    snap = _freeze(nb, base)
+    if isinstance(nb, NotebookNode) and not isinstance(nb, FrozenNode):
+        _last_snapshots[key] = (weakref.ref(nb, lambda ref: _forget(key)), weakref.ref(snap))
+    return snap
+
+
+def thaw(snap):
+    """Return a copy of a snapshot that can be modified
+
+    The cells and outputs of v4 notebooks are given their node classes, as
+    when the notebook is read.
+    """
+    from .v4.nodes import notebook_from_dict
+
+    return notebook_from_dict(snap)
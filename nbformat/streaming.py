@@ -0,0 +1,578 @@
+"""Incremental reading and writing of notebook JSON with file objects
+
+:func:`read` tokenizes a notebook file a chunk at a time and turns each cell
+into a :class:`~nbformat.NotebookNode` as soon as its closing brace has been
+read, so the raw text of the file, the dict built by ``json.loads`` and the
+final notebook never coexist in memory.  Beyond the notebook itself, peak
+memory is about one copy of the largest cell.
+
+:func:`write` is the reverse: it serializes and writes one cell (and one
+output) at a time, so the serialized notebook is never held as one string.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import codecs
+import json
+import re
+from collections import namedtuple
+
+from .compression import MAGIC_SIZE, decompress_buffer, open_for_writing, wrap_reader
+from .json_backend import _decode_buffer, detect_encoding
+from .notebooknode import from_dict, NotebookNode
+from .reader import NotJSONError, get_version
+from .v4.nodes import cell_from_dict
+from .v4.rwbase import rejoin_cell_lines, strip_transient
+
+# number of characters requested from the file object at a time
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+# numbers and literals; loose on purpose, the decoder does the validation
+_SCALAR = re.compile(r'[-+.\w]+')
+
+
+class JSONStream(object):
+    """A pull tokenizer over a file object containing JSON text
+
+    Values are consumed one at a time: :meth:`peek` returns the next
+    significant character, :meth:`read_value` decodes the next complete value
+    and :meth:`skip_value` steps over one without building it.
+    :meth:`iter_object` and :meth:`iter_array` walk containers so that their
+    members can be handled one by one.
+
+    Only the text of the value being decoded is buffered, along with at most
+    one chunk of input that follows it.
+
+    *fp* may be opened in text or binary mode; anything with a ``read(n)``
+    method will do, including ``mmap`` objects.  A str holding the whole
+    text is also accepted.  Binary input is decompressed if it is gzip, xz
+    or bzip2 compressed, and decoded incrementally, detecting UTF-8, UTF-16
+    or UTF-32 the way :func:`json.loads` does.
+
+    Syntax errors are raised as ``ValueError``.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE, **kwargs):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder(**kwargs)
+        self.buf = u''
+        self.pos = 0
+        self.eof = False
+        # the start of the input, for error messages
+        self.head = None
+        # set on the first read from a binary file
+        self._decoder = None
+        if isinstance(fp, str):
+            # the whole text is already in memory
+            self.buf = fp
+            self.head = fp[:80]
+            self.eof = True
+
+    def _read_chunk(self):
+        if self.eof:
+            return u''
+        chunk = self.fp.read(self.chunk_size)
+        if self.head is None:
+            if not isinstance(chunk, str):
+                if 0 < len(chunk) < MAGIC_SIZE:
+                    # enough bytes to detect compression and the encoding
+                    chunk += self.fp.read(MAGIC_SIZE - len(chunk))
+                decompressed = wrap_reader(chunk, self.fp)
+                if decompressed is not None:
+                    self.fp = decompressed
+                    chunk = self.fp.read(self.chunk_size)
+                    if 0 < len(chunk) < 4:
+                        chunk += self.fp.read(4 - len(chunk))
+                encoding = detect_encoding(chunk[:4])
+                self._decoder = codecs.getincrementaldecoder(encoding)('surrogatepass')
+            self.head = chunk[:80]
+        if self._decoder is None:
+            if not chunk:
+                self.eof = True
+            return chunk
+        while True:
+            text = self._decoder.decode(chunk, final=not chunk)
+            # a chunk may end in the middle of a multibyte character
+            if text or not chunk:
+                break
+            chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        return text
+
+    def _fill(self):
+        """Drop consumed text and append a chunk to the buffer
+
+        Returns False at the end of the input.
+        """
+        chunk = self._read_chunk()
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character
+
+        Returns an empty string at the end of the input.
+        """
+        if self.pos < len(self.buf):
+            c = self.buf[self.pos]
+            if c not in u' \t\n\r':
+                return c
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return u''
+
+    def expect(self, char):
+        """Consume *char*, which must be the next significant character"""
+        if self.peek() != char:
+            raise ValueError("Expecting %r delimiter" % char)
+        self.pos += 1
+
+    def _scan(self, keep):
+        """Find the end of the next value, reading more input as needed
+
+        Returns ``(s, start, end)`` where ``s[start:end]`` is the text of the
+        value.  If *keep* is False, text is discarded as soon as it has been
+        scanned and ``s`` is None whenever more input had to be read.
+        """
+        first = self.peek()
+        if not first:
+            raise ValueError("Expecting value")
+
+        if first not in u'"[{':
+            # a number or literal: make sure the whole token is buffered
+            while True:
+                m = _SCALAR.match(self.buf, self.pos)
+                end = m.end() if m else self.pos
+                if end < len(self.buf) or not self._fill():
+                    break
+            if end == self.pos:
+                raise ValueError("Expecting value")
+            start, self.pos = self.pos, end
+            return self.buf, start, end
+
+        s = self.buf
+        start = i = self.pos
+        pieces = []
+        refilled = False
+        depth = 0
+        in_string = escape = False
+        while True:
+            end = -1
+            n = len(s)
+            while i < n:
+                if escape:
+                    # skip the escaped character (hex digits of \uXXXX
+                    # never need special handling)
+                    i += 1
+                    escape = False
+                elif in_string:
+                    # str.find is much faster than a regular expression
+                    # over long strings, such as base64-encoded images
+                    j = s.find(u'"', i)
+                    k = n if j < 0 else j
+                    while k > i and s[k - 1] == u'\\':
+                        k -= 1
+                    # an odd run of backslashes escapes the next character
+                    escaped = ((n if j < 0 else j) - k) % 2 == 1
+                    if j < 0:
+                        escape = escaped
+                        i = n
+                        break
+                    i = j + 1
+                    if not escaped:
+                        in_string = False
+                        if depth == 0:
+                            end = i
+                            break
+                else:
+                    m = _STRUCTURAL.search(s, i)
+                    if m is None:
+                        i = n
+                        break
+                    i = m.end()
+                    c = m.group()
+                    if c == u'"':
+                        in_string = True
+                    elif c in u'[{':
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            end = i
+                            break
+            if end >= 0:
+                break
+            if keep:
+                pieces.append(s[start:])
+            s = self._read_chunk()
+            if not s:
+                raise ValueError("Unterminated value")
+            start = i = 0
+            refilled = True
+
+        if not refilled:
+            self.pos = end
+            return s, start, end
+        self.buf = s
+        self.pos = end
+        if not keep:
+            return None, 0, 0
+        pieces.append(s[:end])
+        text = u''.join(pieces)
+        return text, 0, len(text)
+
+    def read_value(self):
+        """Decode and return the next JSON value"""
+        first = self.peek()
+        if first and first in u'"[{':
+            # common case: the value is already complete in the buffer
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                pass
+            else:
+                self.pos = end
+                return value
+        s, start, end = self._scan(keep=True)
+        value, stop = self.decoder.raw_decode(s, start)
+        if stop != end:
+            raise ValueError("Extra data")
+        return value
+
+    def skip_value(self):
+        """Step over the next JSON value without decoding it"""
+        self._scan(keep=False)
+
+    def iter_object(self):
+        """Iterate over the keys of the next JSON object
+
+        The value of each key must be consumed (with :meth:`read_value`,
+        :meth:`skip_value` or by iterating it) before advancing.
+        """
+        self.expect(u'{')
+        if self.peek() == u'}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != u'"':
+                raise ValueError("Expecting property name enclosed in double quotes")
+            key = self.read_value()
+            self.expect(u':')
+            yield key
+            if self._next_member(u'}') == u'}':
+                return
+
+    def iter_array(self):
+        """Iterate over the indices of the next JSON array
+
+        Each element must be consumed before advancing.
+        """
+        self.expect(u'[')
+        if self.peek() == u']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._next_member(u']') == u']':
+                return
+
+    def _next_member(self, close):
+        """Consume and return the ',' or *close* after a container member"""
+        c = self.peek()
+        if c != u',' and c != close:
+            raise ValueError("Expecting ',' delimiter")
+        self.pos += 1
+        return c
+
+    def finish(self):
+        """Check that nothing but whitespace is left in the input"""
+        if self.peek():
+            raise ValueError("Extra data")
+
+
+def _read_output(stream, mime_types):
+    """Read an output, skipping the data of mime types not in *mime_types*"""
+    output = {}
+    for key in stream.iter_object():
+        if key == 'data' and stream.peek() == u'{':
+            data = output[key] = {}
+            for mime_type in stream.iter_object():
+                if mime_type in mime_types:
+                    data[mime_type] = stream.read_value()
+                else:
+                    stream.skip_value()
+        else:
+            output[key] = stream.read_value()
+    return output
+
+
+def _read_cell(stream, outputs):
+    """Read a cell, skipping the outputs that are not wanted
+
+    *outputs* is as for :func:`read`.
+    """
+    if outputs is True or stream.peek() != u'{':
+        return stream.read_value()
+    cell = {}
+    for key in stream.iter_object():
+        if key != 'outputs' or stream.peek() != u'[':
+            cell[key] = stream.read_value()
+        elif not outputs:
+            stream.skip_value()
+            cell[key] = []
+        else:
+            cell[key] = [
+                _read_output(stream, outputs) if stream.peek() == u'{' else stream.read_value()
+                for _ in stream.iter_array()
+            ]
+    return cell
+
+
+def _read_notebook_dict(stream, outputs=True):
+    """Read the top level of a notebook
+
+    The elements of a top-level ``cells`` array are converted to
+    NotebookNodes and have their lines rejoined as they are read, and
+    outputs are filtered according to *outputs*.
+    Returns the notebook dict and whether its cells were converted.
+    """
+    if stream.peek() != u'{':
+        nb_dict = stream.read_value()
+        stream.finish()
+        return nb_dict, False
+
+    nb_dict = {}
+    converted = False
+    for key in stream.iter_object():
+        if key == 'cells' and stream.peek() == u'[':
+            cells = []
+            for _ in stream.iter_array():
+                cells.append(rejoin_cell_lines(cell_from_dict(_read_cell(stream, outputs))))
+            nb_dict[key] = cells
+            converted = True
+        else:
+            nb_dict[key] = stream.read_value()
+            if key == 'cells':
+                converted = False
+    stream.finish()
+    return nb_dict, converted
+
+
+NotebookHeader = namedtuple('NotebookHeader', ['version', 'metadata', 'cell_count'])
+NotebookHeader.__doc__ = """The format version, metadata and number of cells of a notebook
+
+Returned by :func:`peek`.  ``version`` is the ``(major, minor)`` tuple
+returned by :func:`nbformat.reader.get_version`, and ``metadata`` is the
+top-level notebook metadata as a NotebookNode.
+"""
+
+
+def _count_cells(stream):
+    """Count the elements of a cells array, skipping over their contents"""
+    count = 0
+    for _ in stream.iter_array():
+        stream.skip_value()
+        count += 1
+    return count
+
+
+def peek(fp, chunk_size=CHUNK_SIZE):
+    """Read the version, metadata and cell count of a notebook
+
+    The file is scanned without building the cells or their outputs, so this
+    is much cheaper than reading the notebook.  Cells of v3 and older
+    notebooks are counted across all worksheets.
+
+    Parameters
+    ----------
+    fp : file
+        Any file-like object with a read method, in text or binary mode,
+        or an ``mmap`` object.
+    chunk_size : int, optional
+        The number of characters (or bytes) to read from *fp* at a time.
+
+    Returns
+    -------
+    header : NotebookHeader
+        A ``(version, metadata, cell_count)`` named tuple.
+    """
+    stream = JSONStream(fp, chunk_size=chunk_size)
+    versions = {}
+    metadata = {}
+    cell_count = 0
+    try:
+        for key in stream.iter_object():
+            if key in ('nbformat', 'nbformat_minor'):
+                versions[key] = stream.read_value()
+            elif key == 'metadata':
+                metadata = stream.read_value()
+            elif key == 'cells' and stream.peek() == u'[':
+                cell_count += _count_cells(stream)
+            elif key == 'worksheets' and stream.peek() == u'[':
+                for _ in stream.iter_array():
+                    if stream.peek() != u'{':
+                        stream.skip_value()
+                        continue
+                    for ws_key in stream.iter_object():
+                        if ws_key == 'cells' and stream.peek() == u'[':
+                            cell_count += _count_cells(stream)
+                        else:
+                            stream.skip_value()
+            else:
+                stream.skip_value()
+        stream.finish()
+    except ValueError as e:
+        raise NotJSONError(("Notebook does not appear to be JSON: %r" % stream.head)[:77] + "...") from e
+
+    return NotebookHeader(get_version(versions), from_dict(metadata), cell_count)
+
+
+def read(fp, chunk_size=CHUNK_SIZE, outputs=True, **kwargs):
+    """Read a notebook incrementally from a file and return the NotebookNode object.
+
+    This function properly reads notebooks of any version, and returns the
+    same notebook as :func:`nbformat.reader.read`.  No version conversion
+    is performed.
+
+    Parameters
+    ----------
+    fp : file
+        Any file-like object with a read method, in text or binary mode,
+        or an ``mmap`` object.
+    chunk_size : int, optional
+        The number of characters (or bytes) to read from *fp* at a time.
+    outputs : bool or collection of str, optional
+        If False, the outputs of v4 code cells are skipped over without
+        being decoded, and the cells are given empty outputs.  If a
+        collection of mime types, only those entries of the ``data`` of
+        each output are decoded.  Older notebooks are read in full.
+
+    Other keyword arguments are passed to :class:`json.JSONDecoder`.
+
+    Returns
+    -------
+    nb : NotebookNode
+        The notebook that was read.
+    """
+    stream = JSONStream(fp, chunk_size=chunk_size, **kwargs)
+    return _read_stream(stream, outputs)
+
+
+def reads(s, outputs=True, **kwargs):
+    """Read a notebook from a string with the incremental reader
+
+    This is :func:`read` for a notebook that is already in memory, as a str,
+    bytes or other buffer.  Its use is in skipping outputs; otherwise
+    :func:`nbformat.reader.reads` is faster.
+    """
+    if not isinstance(s, str):
+        s = _decode_buffer(decompress_buffer(s))
+    return _read_stream(JSONStream(s, **kwargs), outputs)
+
+
+def _read_stream(stream, outputs):
+    from . import versions, NBFormatError
+
+    if outputs is not True and outputs:
+        outputs = frozenset(outputs)
+    try:
+        nb_dict, converted = _read_notebook_dict(stream, outputs)
+    except ValueError as e:
+        # Limit the error message to 80 characters, like reader.parse_json
+        raise NotJSONError(("Notebook does not appear to be JSON: %r" % stream.head)[:77] + "...") from e
+
+    (major, minor) = get_version(nb_dict)
+    if major == 4 and converted:
+        nb = NotebookNode()
+        for key, value in nb_dict.items():
+            nb[key] = value if key == 'cells' else from_dict(value)
+        return strip_transient(nb)
+    elif major in versions:
+        return versions[major].to_notebook_json(nb_dict, minor=minor)
+    else:
+        raise NBFormatError('Unsupported nbformat version %s' % major)
+
+
+def write(nb, fp, version=None, compression='infer', compresslevel=None, **kwargs):
+    """Write a notebook to a file incrementally
+
+    Writes the same text as :func:`nbformat.write`, but v4 notebooks are
+    serialized and written a cell at a time, and an output at a time within
+    cells, so that beyond the notebook itself peak memory is about the
+    serialized size of the largest output.  Other versions are written in
+    one go.
+
+    Parameters
+    ----------
+    nb : NotebookNode
+        The notebook to write.
+    fp : file or str
+        Any file-like object with a write method that accepts unicode, or
+        a path to write a file.
+    version : int, optional
+        The nbformat version to write, as for :func:`nbformat.write`.
+    compression : str or None, optional
+        How to compress a file written to a path, as for :func:`nbformat.write`.
+    compresslevel : int, optional
+        The compression level.
+
+    Other keyword arguments are as for :func:`nbformat.writes`.
+    """
+    from . import NO_CONVERT, _convert_for_write
+
+    if version is None:
+        version = NO_CONVERT
+    nb, version = _convert_for_write(nb, version, kwargs)
+    chunks = _iter_text(nb, version, kwargs)
+
+    if not hasattr(fp, 'write'):
+        with open_for_writing(fp, compression, compresslevel) as f:
+            return _write_chunks(chunks, f)
+    return _write_chunks(chunks, fp)
+
+
+def _iter_text(nb, version, kwargs):
+    """Yield the text of a notebook already converted for writing, in pieces
+
+    The text ends with a newline, as written to files.
+    """
+    from . import versions
+
+    if version == 4:
+        chunks = versions[version].iterwrites(nb, **kwargs)
+    else:
+        chunks = [versions[version].writes_json(nb, **kwargs)]
+    last = ''
+    for chunk in chunks:
+        if chunk:
+            last = chunk
+            yield chunk
+    if not last.endswith('\n'):
+        yield '\n'
+
+
+def _write_chunks(chunks, fp):
+    # buffer small pieces, to avoid a write call for every key
+    buf = []
+    size = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= CHUNK_SIZE:
+            fp.write(''.join(buf))
+            buf, size = [], 0
+    if buf:
+        fp.write(''.join(buf))
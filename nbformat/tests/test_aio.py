@@ -0,0 +1,120 @@
+"""Tests for the asyncio API"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import nbformat
+from nbformat import aio, ValidationError
+from nbformat.aio import JobLimiter
+from nbformat.sign import NotebookNotary
+
+here = os.path.dirname(__file__)
+nb_path = os.path.join(here, 'test4.ipynb')
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_read_write_validate(tmpdir):
+    nb = run(aio.read(nb_path, 4))
+    assert nb == nbformat.read(nb_path, 4)
+    path = str(tmpdir.join('out.ipynb'))
+    run(aio.write(nb, path))
+    run(aio.validate(nb))
+    assert nbformat.read(path, 4) == nb
+
+
+def test_process_executor(tmpdir):
+    with ProcessPoolExecutor(1) as executor:
+        nb = run(aio.read(nb_path, 4, executor=executor))
+        path = str(tmpdir.join('out.ipynb'))
+        run(aio.write(nb, path, executor=executor))
+        run(aio.validate(nb, executor=executor))
+    assert nb == nbformat.read(nb_path, 4)
+    assert nbformat.read(path, 4) == nb
+
+
+def test_validate_invalid():
+    nb = nbformat.read(os.path.join(here, 'invalid.ipynb'), 4)
+    with pytest.raises(ValidationError):
+        run(aio.validate(nb))
+
+
+def test_sign():
+    notary = NotebookNotary(db_file=':memory:', secret=b'secret')
+    nb = nbformat.read(nb_path, 4)
+    assert not notary.check_signature(nb)
+    with ProcessPoolExecutor(1) as executor:
+        run(aio.sign(nb, notary, executor=executor))
+    assert notary.check_signature(nb)
+
+
+def test_limiter_bounds_jobs():
+    limiter = JobLimiter(max_jobs=3, max_large_jobs=1)
+    running = {'small': 0, 'large': 0}
+    peak = {'small': 0, 'large': 0, 'total': 0}
+
+    async def job(large):
+        key = 'large' if large else 'small'
+        await limiter.acquire(large)
+        running[key] += 1
+        peak[key] = max(peak[key], running[key])
+        peak['total'] = max(peak['total'], running['small'] + running['large'])
+        await asyncio.sleep(0.01)
+        running[key] -= 1
+        limiter.release(large)
+
+    async def main():
+        await asyncio.gather(*[job(i % 2 == 0) for i in range(12)])
+
+    run(main())
+    assert peak == {'small': 2, 'large': 1, 'total': 3}
+    assert (limiter.jobs, limiter.large_jobs) == (0, 0)
+
+
+def test_limiter_cancel():
+    limiter = JobLimiter(max_jobs=1)
+
+    async def main():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+        # the cancelled waiter did not take the slot
+        await asyncio.wait_for(limiter.acquire(), 1)
+        limiter.release()
+
+    run(main())
+    assert limiter.jobs == 0
+
+
+def test_cancel_releases_slot(monkeypatch):
+    limiter = JobLimiter(max_jobs=1)
+    monkeypatch.setattr(aio, 'limiter', limiter)
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            task = asyncio.ensure_future(aio.validate(nbformat.read(nb_path, 4), executor=executor))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        # let the job's done callback run
+        await asyncio.sleep(0.01)
+
+    run(main())
+    assert limiter.jobs == 0
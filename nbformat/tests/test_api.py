@@ -3,7 +3,9 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import io
 import json
+import mmap
 import os
 import pathlib
 import sys
@@ -12,8 +14,11 @@ import unittest
 from .base import TestsBase
 
 from ipython_genutils.tempdir import TemporaryDirectory
+from traitlets.log import get_logger
+from ..notebooknode import NotebookNode, from_dict
 from ..reader import get_version
-from nbformat import read, current_nbformat, writes, write
+from .. import reader, convert, validate
+from nbformat import read, reads, current_nbformat, writes, write
 
 
 class TestAPI(TestsBase):
@@ -64,3 +69,110 @@ class TestAPI(TestsBase):
             dest = pathlib.Path(td) / 'echidna.ipynb'
             write(nb, dest)
             assert os.path.isfile(dest)
+
+    def test_reads_lazy(self):
+        """reads(lazy=True) validates without converting cells"""
+        with self.fopen(u'test4.ipynb', 'r') as f:
+            s = f.read()
+        nb = reads(s, as_version=4, lazy=True)
+        assert all(type(cell) is dict for cell in nb.cells.as_parsed())
+        self.assertEqual(nb.cells[0], reads(s, as_version=4).cells[0])
+        self.assertEqual(nb, reads(s, as_version=4))
+
+    def test_read_lazy(self):
+        """read(lazy=True) is as reads, and ignored when streaming"""
+        path = os.path.join(self._get_files_path(), u'test4.ipynb')
+        ref = read(path, as_version=4)
+        nb = read(path, as_version=4, lazy=True)
+        assert all(type(cell) is dict for cell in nb.cells.as_parsed())
+        self.assertEqual(nb, ref)
+        self.assertEqual(read(path, as_version=4, stream=True, lazy=True), ref)
+        nb = read(path, as_version=4, outputs=False, lazy=True)
+        assert all(not cell.get('outputs') for cell in nb.cells)
+
+    def test_read_binary(self):
+        """Notebooks can be read from bytes, buffers and binary files"""
+        path = os.path.join(self._get_files_path(), u'test4.ipynb')
+        ref = read(path, as_version=4)
+        with io.open(path, 'rb') as f:
+            b = f.read()
+        self.assertEqual(reads(b, as_version=4), ref)
+        self.assertEqual(reads(bytearray(b), as_version=4), ref)
+        self.assertEqual(reads(memoryview(b), as_version=4), ref)
+        with io.open(path, 'rb') as f:
+            self.assertEqual(read(f, as_version=4), ref)
+        with io.open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertEqual(read(m, as_version=4), ref)
+                self.assertEqual(reads(m, as_version=4), ref)
+
+    def test_reads_fused(self):
+        """reads matches reading, converting and validating in separate steps"""
+        for fname in (u'test4.ipynb', u'test4plus.ipynb', u'test3.ipynb'):
+            with self.fopen(fname, 'r') as f:
+                s = f.read()
+            nb = convert(reader.reads(s), 4)
+            validate(nb)
+            self.assertEqual(reads(s, as_version=4), nb)
+
+    def test_profiles(self):
+        """Notebooks written with a profile read back the same"""
+        with self.fopen(u'test4.ipynb', 'r') as f:
+            nb = reads(f.read(), as_version=4)
+        for profile in ('canonical', 'diff', 'compact'):
+            s = writes(nb, profile=profile)
+            self.assertEqual(reads(s, as_version=4, profile=profile), nb)
+            with TemporaryDirectory() as td:
+                path = os.path.join(td, 'nb.ipynb')
+                write(nb, path, profile=profile, stream=True)
+                with io.open(path, encoding='utf-8') as f:
+                    self.assertEqual(f.read(), s + '\n')
+                self.assertEqual(read(path, as_version=4, profile=profile), nb)
+                self.assertEqual(read(path, as_version=4, profile=profile, stream=True), nb)
+
+    def test_profile_v3(self):
+        with self.fopen(u'test3.ipynb', 'r') as f:
+            nb = reads(f.read(), as_version=3)
+        with self.assertRaises(ValueError):
+            writes(nb, profile='compact')
+
+    def test_reads_nodes(self):
+        """reads builds nodes while parsing, rather than copying dicts"""
+        with self.fopen(u'test4.ipynb', 'r') as f:
+            s = f.read()
+        nb = reads(s, as_version=4)
+        self.assertEqual(nb, from_dict(reader.reads(s)))
+        self.assertIs(type(nb.metadata), NotebookNode)
+        self.assertIs(type(nb.cells[0].metadata), NotebookNode)
+
+    def test_reads_deeply_nested(self):
+        """JSON nested deeper than from_dict can recurse is read"""
+        depth = sys.getrecursionlimit() * 2 // 3
+        value = {}
+        for i in range(depth):
+            value = {'a': value}
+        s = json.dumps({
+            'cells': [{
+                'cell_type': 'code', 'execution_count': 1, 'metadata': {}, 'source': 'x',
+                'outputs': [{
+                    'output_type': 'display_data', 'metadata': {},
+                    'data': {'application/json': value},
+                }],
+            }],
+            'metadata': {}, 'nbformat': 4, 'nbformat_minor': 4,
+        })
+        with self.assertRaises(RecursionError):
+            from_dict(json.loads(s))
+        nb = reads(s, as_version=4)
+        data = nb.cells[0].outputs[0].data['application/json']
+        for i in range(depth):
+            data = data.a
+        self.assertEqual(data, {})
+
+    def test_reads_logs_invalid(self):
+        with self.fopen(u'invalid.ipynb', 'r') as f:
+            s = f.read()
+        with self.assertLogs(get_logger(), 'ERROR') as logs:
+            nb = reads(s, as_version=4)
+        self.assertEqual(nb, reader.reads(s))
+        assert 'Notebook JSON is invalid' in logs.output[0]
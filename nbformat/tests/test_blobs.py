@@ -0,0 +1,138 @@
+"""Tests for externalized output data"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import io
+import json
+import os
+import pickle
+
+import pytest
+
+from nbformat import read, reads, write, writes
+from nbformat.blobs import BLOB_PREFIX, BlobStore, LazyBundle, is_reference
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+big_png = 'iVBORw0KGgo' * 200
+big_html = u'<p>caf\xe9</p>\n' * 200
+
+
+@pytest.fixture
+def store(tmpdir):
+    return BlobStore(str(tmpdir.join('blobs')))
+
+
+@pytest.fixture
+def nb():
+    return new_notebook(cells=[
+        new_code_cell('plot()', outputs=[
+            new_output('display_data', data={
+                'image/png': big_png,
+                'text/plain': 'small',
+                'application/json': {'big': 'x' * 5000},
+            }),
+        ]),
+        new_code_cell('html()', outputs=[
+            new_output('execute_result', execution_count=1, data={'text/html': big_html}),
+            new_output('display_data', data={'image/png': big_png}),
+        ]),
+        new_markdown_cell('![x](attachment:x.png)', attachments={
+            'x.png': {'image/png': big_png},
+        }),
+    ])
+
+
+def test_store(store):
+    key = store.put(b'data')
+    assert key.startswith('sha256:')
+    assert key in store
+    assert store.put(b'data') == key
+    assert store.get(key) == b'data'
+    missing = 'sha256:' + '0' * 64
+    assert missing not in store
+    with pytest.raises(KeyError):
+        store.get(missing)
+    with pytest.raises(ValueError):
+        store.get('sha256:../../etc/passwd')
+    assert 'md5:abc' not in store
+
+
+def test_externalize(nb, store):
+    before = copy.deepcopy(nb)
+    s = writes(nb, externalize_over=1000, blob_store=store)
+    assert nb == before
+    raw = json.loads(s)
+    data = raw['cells'][0]['outputs'][0]['data']
+    assert is_reference(data['image/png'])
+    assert data['text/plain'] == ['small']
+    assert data['application/json'] == {'big': 'x' * 5000}
+    html = raw['cells'][1]['outputs'][0]['data']['text/html']
+    assert len(html) == 1 and is_reference(html[0])
+    attachment = raw['cells'][2]['attachments']['x.png']['image/png']
+    assert attachment == data['image/png']
+    # identical images are stored once
+    assert len([f for _, _, files in os.walk(store.root) for f in files]) == 2
+
+
+def test_read_lazily(nb, store, tmpdir):
+    path = str(tmpdir.join('nb.ipynb'))
+    write(nb, path, externalize_over=1000, blob_store=store.root)
+    nb2 = read(path, 4, blob_store=store.root)
+    data = nb2.cells[0].outputs[0].data
+    assert isinstance(data, LazyBundle)
+    assert is_reference(dict.__getitem__(data, 'image/png'))
+    assert data['image/png'] == big_png
+    assert nb2.cells[1].outputs[0].data.get('text/html') == big_html
+    assert nb2 == nb
+    assert pickle.loads(pickle.dumps(nb2)) == nb
+    assert copy.deepcopy(nb2) == nb
+
+
+def test_rewrite_keeps_references(nb, store, monkeypatch):
+    s = writes(nb, externalize_over=1000, blob_store=store)
+    nb2 = reads(s, 4, blob_store=store)
+
+    def fail(key):
+        raise AssertionError("blob %s was loaded" % key)
+
+    monkeypatch.setattr(store, 'get', fail)
+    assert writes(nb2, externalize_over=1000, blob_store=store) == s
+    buf = io.StringIO()
+    write(nb2, buf, stream=True, externalize_over=1000, blob_store=store)
+    assert buf.getvalue() == s + '\n'
+    monkeypatch.undo()
+    # without externalizing, values are written inline
+    assert writes(nb2) == writes(nb)
+
+
+def test_stream_write(nb, store):
+    buf = io.StringIO()
+    write(nb, buf, stream=True, externalize_over=1000, blob_store=store)
+    assert buf.getvalue() == writes(nb, externalize_over=1000, blob_store=store) + '\n'
+
+
+def test_look_alike_values(store):
+    look_alikes = [BLOB_PREFIX + ' hi', BLOB_PREFIX + 'sha256:abc', BLOB_PREFIX + 'sha256:' + '0' * 64 + '\n']
+    assert not any(map(is_reference, look_alikes))
+    nb = new_notebook(cells=[new_code_cell('print()', outputs=[
+        new_output('display_data', data={'text/plain': value, 'text/html': big_html})
+        for value in look_alikes
+    ])])
+    s = writes(nb, externalize_over=1000, blob_store=store)
+    nb2 = reads(s, 4, blob_store=store)
+    assert [output.data['text/plain'] for output in nb2.cells[0].outputs] == look_alikes
+    assert nb2 == nb
+
+
+def test_errors(nb, store):
+    with pytest.raises(TypeError):
+        writes(nb, externalize_over=1000)
+    with pytest.raises(ValueError):
+        writes(nb, 3, externalize_over=1000, blob_store=store)
+    s = writes(nb, externalize_over=1000, blob_store=store)
+    empty = BlobStore(store.root + '-empty')
+    nb2 = reads(s, 4, blob_store=empty)
+    with pytest.raises(KeyError):
+        nb2.cells[0].outputs[0].data['image/png']
@@ -0,0 +1,100 @@
+"""Tests for output budgets"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import os
+
+import pytest
+
+from nbformat import read, reads, write, writes
+from nbformat.budget import OutputBudget, Truncation
+from nbformat.incremental import IncrementalWriter
+from nbformat.v4 import new_code_cell, new_notebook, new_output
+
+here = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def nb():
+    return new_notebook(cells=[
+        new_code_cell('spam()', outputs=[
+            new_output('stream', text=u'line\n' * 1000),
+            new_output('execute_result', data={
+                'text/plain': u'caf\xe9 ' * 100,
+                'image/png': 'iVBORw0KGgo' * 100,
+            }, execution_count=1),
+        ]),
+        new_code_cell('small()', outputs=[new_output('stream', text=u'ok\n')]),
+    ])
+
+
+def test_per_output(nb):
+    before = copy.deepcopy(nb)
+    budget = OutputBudget(max_output_bytes=100)
+    out = reads(writes(nb, budget=budget), 4)
+    assert nb == before
+
+    text = out.cells[0].outputs[0].text
+    assert text.startswith(u'line\n' * 20)
+    assert text.endswith(u'[... 4900 bytes of output truncated ...]\n')
+    plain = out.cells[0].outputs[1].data['text/plain']
+    assert plain.startswith(u'caf\xe9 ' * 16)
+    assert len(plain.split('\n')[0].encode('utf-8')) <= 100
+    # other data is left alone
+    assert out.cells[0].outputs[1].data['image/png'] == nb.cells[0].outputs[1].data['image/png']
+    assert out.cells[1] == nb.cells[1]
+
+    assert budget.truncated == [
+        Truncation(0, 0, 'text', 5000, 100),
+        Truncation(0, 1, 'text/plain', 600, 99),
+    ]
+    assert budget.dropped == 4900 + 501
+
+
+def test_per_notebook(nb):
+    budget = OutputBudget(max_notebook_bytes=5300)
+    out = reads(writes(nb, budget=budget), 4)
+    assert out.cells[0].outputs[0] == nb.cells[0].outputs[0]
+    assert [t[:3] for t in budget.truncated] == [(0, 1, 'text/plain'), (1, 0, 'text')]
+    # the budget is spent before the last output
+    assert budget.used == 5300
+    assert out.cells[1].outputs[0].text == u'\n[... 3 bytes of output truncated ...]\n'
+
+
+def test_elide(nb):
+    budget = OutputBudget(max_output_bytes=20, elide=True, marker=u'<%(dropped)i>')
+    out = reads(writes(nb, budget=budget), 4)
+    assert out.cells[0].outputs[0].text == u'line\nline\n<4980>line\nline\n'
+
+
+def test_stream_matches(nb, tmpdir):
+    path = str(tmpdir.join('nb.ipynb'))
+    budget = OutputBudget(max_output_bytes=100, max_notebook_bytes=150)
+    expected = writes(nb, budget=budget)
+    truncated = budget.truncated
+    write(nb, path, stream=True, budget=budget)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == expected + '\n'
+    assert budget.truncated == truncated
+
+
+def test_within_budget_unchanged():
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    budget = OutputBudget(max_output_bytes=10 ** 6, max_notebook_bytes=10 ** 6)
+    assert writes(nb, budget=budget) == writes(nb)
+    assert budget.truncated == []
+
+
+def test_logged(nb, caplog):
+    writes(nb, budget=OutputBudget(max_output_bytes=100))
+    assert 'Truncated 2 outputs' in caplog.text
+
+
+def test_unsupported():
+    nb = read(os.path.join(here, 'test3.ipynb'), 3)
+    with pytest.raises(ValueError):
+        writes(nb, budget=OutputBudget(max_output_bytes=100))
+    with pytest.raises(ValueError):
+        IncrementalWriter(budget=OutputBudget(max_output_bytes=100))
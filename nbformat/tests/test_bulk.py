@@ -0,0 +1,145 @@
+"""Tests for reading many notebooks at once"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nbformat import read, read_many, write_many, NBFormatError
+from nbformat import bulk
+
+here = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def paths(tmpdir):
+    paths = []
+    for i, name in enumerate(['test2.ipynb', 'test3.ipynb', 'test4.ipynb'] * 3):
+        path = str(tmpdir.join('%i.ipynb' % i))
+        shutil.copy(os.path.join(here, name), path)
+        paths.append(path)
+    bad = str(tmpdir.join('bad.ipynb'))
+    with open(bad, 'w') as f:
+        f.write('{"nbformat": 99}')
+    paths.insert(4, bad)
+    return paths
+
+
+def check_results(paths, results):
+    assert sorted(path for path, _ in results) == sorted(paths)
+    for path, nb in results:
+        if path.endswith('bad.ipynb'):
+            assert isinstance(nb, NBFormatError)
+        else:
+            assert nb == read(path, 4)
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_read_many(paths, executor):
+    results = list(read_many(paths, 4, workers=2, executor=executor))
+    check_results(paths, results)
+
+
+def test_ordered(paths):
+    results = list(read_many(iter(paths), 4, workers=3, executor='thread', ordered=True, max_in_flight=2))
+    assert [path for path, _ in results] == paths
+    check_results(paths, results)
+
+
+def test_bounded_in_flight(paths):
+    submitted = []
+
+    def gen():
+        for path in paths:
+            submitted.append(path)
+            yield path
+
+    results = read_many(gen(), 4, executor='thread', ordered=True, max_in_flight=3)
+    next(results)
+    assert len(submitted) == 3
+    results.close()
+
+
+def test_executor_not_shut_down(paths):
+    with ThreadPoolExecutor(2) as executor:
+        check_results(paths, list(read_many(paths, 4, executor=executor)))
+        assert executor.submit(int, '1').result() == 1
+
+
+def test_bad_executor(paths):
+    with pytest.raises(ValueError):
+        next(read_many(paths, 4, executor='fork'))
+
+
+def test_warm_validators(monkeypatch):
+    from nbformat.validator import validators
+    monkeypatch.setattr(bulk, '_warmed', False)
+    bulk._warm_validators()
+    assert bulk._warmed
+    assert any(key[-1] == 'code_cell' for key in validators)
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_write_many(tmpdir, executor):
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    items = [(str(tmpdir.join('%i.ipynb' % i)), nb) for i in range(5)]
+    items.append((str(tmpdir.join('missing', 'x.ipynb')), nb))
+    results = write_many(items, workers=2, executor=executor)
+    assert isinstance(results, list)
+    results = dict(results)
+    assert sorted(results) == sorted(path for path, _ in items)
+    for path, _ in items[:-1]:
+        assert results[path] is None
+        assert read(path, 4) == nb
+    assert isinstance(results[items[-1][0]], FileNotFoundError)
+    # no temporary files are left behind
+    assert sorted(os.listdir(str(tmpdir))) == ['%i.ipynb' % i for i in range(5)]
+
+
+def test_write_many_eager(tmpdir):
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    path = str(tmpdir.join('nb.ipynb'))
+    # written even if the results are not looked at
+    write_many([(path, nb)], executor='thread')
+    assert read(path, 4) == nb
+
+
+def test_write_many_ordered_compressed(tmpdir):
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    paths = [str(tmpdir.join('%i.ipynb.gz' % i)) for i in range(4)]
+    results = write_many(((path, nb) for path in paths), executor='thread', ordered=True, max_in_flight=1)
+    assert results == [(path, None) for path in paths]
+    for path in paths:
+        with open(path, 'rb') as f:
+            assert f.read(2) == b'\x1f\x8b'
+        assert read(path, 4) == nb
+
+
+def test_atomic_write_failure(tmpdir):
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    path = str(tmpdir.join('nb.ipynb'))
+    bulk.atomic_write(nb, path)
+    with open(path) as f:
+        before = f.read()
+    nb.metadata['unserializable'] = object()
+    with pytest.raises(TypeError):
+        bulk.atomic_write(nb, path)
+    with open(path) as f:
+        assert f.read() == before
+    assert os.listdir(str(tmpdir)) == ['nb.ipynb']
+
+
+def test_atomic_write_mode(tmpdir):
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    path = str(tmpdir.join('nb.ipynb'))
+    bulk.atomic_write(nb, path)
+    ref = str(tmpdir.join('ref'))
+    open(ref, 'w').close()
+    assert os.stat(path).st_mode == os.stat(ref).st_mode
+    os.chmod(path, 0o600)
+    bulk.atomic_write(nb, path)
+    assert os.stat(path).st_mode & 0o777 == 0o600
@@ -0,0 +1,173 @@
+"""Tests for the notebook cache"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import pathlib
+import shutil
+
+import pytest
+
+from nbformat import read, write, NO_CONVERT
+from nbformat.cache import FileHashCache, NotebookCache, default_hash_cache, hash_text
+from nbformat.notebooknode import NotebookNode
+
+here = os.path.dirname(__file__)
+
+
+def copy_notebook(tmpdir, name, src='test4.ipynb'):
+    path = str(tmpdir.join(name))
+    shutil.copy(os.path.join(here, src), path)
+    return path
+
+
+@pytest.fixture
+def nb_path(tmpdir):
+    return copy_notebook(tmpdir, 'test4.ipynb')
+
+
+def test_hit_and_miss(nb_path):
+    cache = NotebookCache()
+    nb = cache.read(nb_path, 4)
+    assert nb == read(nb_path, 4)
+    assert cache.read(nb_path, 4) == nb
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+    assert info.current_bytes == os.path.getsize(nb_path)
+
+
+def test_copy_on_return(nb_path):
+    cache = NotebookCache()
+    nb = cache.read(nb_path, 4)
+    nb.cells[0].source = 'changed'
+    nb.metadata.clear()
+    again = cache.read(nb_path, 4)
+    assert again == read(nb_path, 4)
+    assert again is not nb
+    assert [type(cell) for cell in again.cells] == [type(cell) for cell in read(nb_path, 4).cells]
+    assert type(again.cells[0]) is not NotebookNode
+
+
+def test_no_copy(nb_path):
+    cache = NotebookCache()
+    nb = cache.read(nb_path, 4, copy=False)
+    assert cache.read(nb_path, 4, copy=False) is nb
+    assert cache.read(nb_path, 4) is not nb
+
+
+def test_file_changed(nb_path):
+    cache = NotebookCache()
+    nb = cache.read(nb_path, 4)
+    nb.cells[0].source = 'changed'
+    write(nb, nb_path)
+    # make sure the modification time differs, whatever its resolution
+    st = os.stat(nb_path)
+    os.utime(nb_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.read(nb_path, 4).cells[0].source == 'changed'
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.entries) == (0, 2, 1)
+
+
+def test_versions_cached_separately(tmpdir):
+    path = copy_notebook(tmpdir, 'test3.ipynb', 'test3.ipynb')
+    cache = NotebookCache()
+    assert cache.read(path, 3).nbformat == 3
+    assert cache.read(path, 4).nbformat == 4
+    assert cache.read(path, NO_CONVERT).nbformat == 3
+    assert cache.read(pathlib.Path(path), 4).nbformat == 4
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.entries) == (1, 3, 3)
+
+
+def test_eviction(tmpdir):
+    paths = [copy_notebook(tmpdir, '%i.ipynb' % i) for i in range(3)]
+    size = os.path.getsize(paths[0])
+    cache = NotebookCache(max_bytes=2 * size)
+    cache.read(paths[0], 4)
+    cache.read(paths[1], 4)
+    # use the first, so that the second is evicted
+    cache.read(paths[0], 4)
+    cache.read(paths[2], 4)
+    info = cache.cache_info()
+    assert (info.evictions, info.entries, info.current_bytes) == (1, 2, 2 * size)
+    cache.read(paths[0], 4)
+    assert cache.cache_info().hits == 2
+    cache.read(paths[1], 4)
+    assert cache.cache_info().misses == 4
+
+
+def test_too_large(nb_path):
+    cache = NotebookCache(max_bytes=10)
+    cache.read(nb_path, 4)
+    cache.read(nb_path, 4)
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.entries, info.current_bytes) == (0, 2, 0, 0)
+
+
+def test_cache_clear(nb_path):
+    cache = NotebookCache()
+    cache.read(nb_path, 4)
+    cache.read(nb_path, 4)
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 0, cache.max_bytes, 0, 0)
+
+
+def test_missing_file(tmpdir):
+    with pytest.raises(FileNotFoundError):
+        NotebookCache().read(str(tmpdir.join('missing.ipynb')), 4)
+
+
+def set_old_mtime(path):
+    os.utime(path, ns=(10 ** 18, 10 ** 18))
+    return os.stat(path).st_mtime_ns
+
+
+@pytest.mark.parametrize('stream', [False, True])
+@pytest.mark.parametrize('name', ['nb.ipynb', 'nb.ipynb.gz'])
+def test_write_if_changed(tmpdir, stream, name):
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    path = str(tmpdir.join(name))
+    assert write(nb, path, if_changed=True, stream=stream) is True
+    mtime = set_old_mtime(path)
+
+    assert write(nb, path, if_changed=True, stream=stream) is False
+    assert os.stat(path).st_mtime_ns == mtime
+
+    nb.cells[0].source = 'changed'
+    assert write(nb, path, if_changed=True, stream=stream) is True
+    assert os.stat(path).st_mtime_ns != mtime
+    assert read(path, 4) == nb
+
+
+def test_write_if_changed_reads_external_file(tmpdir):
+    # a file not written by this process is hashed from disk
+    path = str(tmpdir.join('nb.ipynb'))
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    write(nb, path)
+    mtime = set_old_mtime(path)
+    default_hash_cache.cache_clear()
+    assert write(nb, path, if_changed=True) is False
+    assert os.stat(path).st_mtime_ns == mtime
+
+    # and hashed again when it is changed behind the cache's back
+    with open(path, 'a') as f:
+        f.write(' ')
+    assert write(nb, path, if_changed=True) is True
+    assert read(path, 4) == nb
+
+
+def test_hash_cache(tmpdir):
+    cache = FileHashCache(max_entries=1)
+    path = copy_notebook(tmpdir, 'a.ipynb')
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    assert cache.get(path) == hash_text([text])
+    assert cache.get(str(tmpdir.join('missing.ipynb'))) is None
+
+    # stored hashes are trusted while the file is unchanged
+    cache.store(path, 'stale')
+    assert cache.get(path) == 'stale'
+    # only the most recent entry is kept
+    cache.get(copy_notebook(tmpdir, 'b.ipynb'))
+    assert cache.get(path) == hash_text([text])
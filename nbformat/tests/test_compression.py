@@ -0,0 +1,113 @@
+"""Tests for reading and writing compressed notebooks"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+
+import pytest
+
+from nbformat import peek, read, reads, write, writes
+from nbformat import streaming
+from nbformat.compression import detect_compression, infer_compression
+
+here = os.path.dirname(__file__)
+
+compressions = {
+    'gzip': (gzip, '.gz'),
+    'xz': (lzma, '.xz'),
+    'bz2': (bz2, '.bz2'),
+}
+
+
+@pytest.fixture
+def nb():
+    return read(os.path.join(here, 'test4.ipynb'), 4)
+
+
+class Unpeekable(object):
+    """A binary file object with nothing but a read method"""
+
+    def __init__(self, data):
+        self._f = io.BytesIO(data)
+
+    def read(self, n=-1):
+        return self._f.read(n)
+
+
+def head(path):
+    with open(path, 'rb') as f:
+        return f.read(6)
+
+
+def test_infer_compression():
+    assert infer_compression('a.ipynb.gz') == 'gzip'
+    assert infer_compression(b'a.ipynb.XZ') == 'xz'
+    assert infer_compression('a.ipynb.bz2') == 'bz2'
+    assert infer_compression('a.ipynb') is None
+
+
+@pytest.mark.parametrize('compression', sorted(compressions))
+def test_detect_compression(compression):
+    module = compressions[compression][0]
+    assert detect_compression(module.compress(b'{}')) == compression
+    assert detect_compression(b'{}') is None
+
+
+@pytest.mark.parametrize('compression', sorted(compressions))
+@pytest.mark.parametrize('stream', [False, True])
+def test_roundtrip_suffix(nb, tmpdir, compression, stream):
+    module, suffix = compressions[compression]
+    path = str(tmpdir.join('nb.ipynb' + suffix))
+    write(nb, path, stream=stream)
+    with module.open(path, 'rt', encoding='utf-8') as f:
+        assert f.read() == writes(nb) + '\n'
+    assert read(path, 4) == nb
+    assert read(path, 4, stream=True) == nb
+    assert peek(path).cell_count == len(nb.cells)
+
+
+@pytest.mark.parametrize('compression', sorted(compressions))
+def test_read_by_magic(nb, tmpdir, compression):
+    module = compressions[compression][0]
+    data = module.compress(writes(nb).encode('utf-8'))
+    path = str(tmpdir.join('nb.ipynb'))
+    with open(path, 'wb') as f:
+        f.write(data)
+    assert read(path, 4) == nb
+    assert reads(data, 4) == nb
+    assert read(io.BytesIO(data), 4) == nb
+    assert read(io.BufferedReader(io.BytesIO(data)), 4, stream=True) == nb
+    assert streaming.read(Unpeekable(data), chunk_size=1) == nb
+    assert read(path, 4, outputs=False).cells[-1].outputs == []
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            assert read(m, 4) == nb
+
+
+def test_explicit_compression(nb, tmpdir):
+    path = str(tmpdir.join('nb.ipynb'))
+    write(nb, path, compression='xz')
+    assert detect_compression(head(path)) == 'xz'
+    assert read(path, 4) == nb
+    path = str(tmpdir.join('nb.ipynb.gz'))
+    write(nb, path, compression=None)
+    assert read(path, 4) == nb
+    assert head(path)[:1] == b'{'
+    with pytest.raises(ValueError):
+        write(nb, path, compression='zip')
+
+
+def test_compresslevel(nb, tmpdir):
+    sizes = []
+    for level in (0, 9):
+        path = str(tmpdir.join('nb%i.ipynb.gz' % level))
+        write(nb, path, compresslevel=level)
+        assert read(path, 4) == nb
+        sizes.append(os.path.getsize(path))
+    assert sizes[1] < sizes[0]
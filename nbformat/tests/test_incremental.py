@@ -0,0 +1,93 @@
+"""Tests for incremental writing"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import io
+import os
+from unittest import TestCase
+
+import pytest
+
+from traitlets.log import get_logger
+
+from nbformat import read, write, writes
+from nbformat.incremental import IncrementalWriter
+from nbformat.v4 import new_code_cell, new_output
+
+here = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def nb():
+    return read(os.path.join(here, 'test4.ipynb'), 4)
+
+
+def test_first_write(nb):
+    writer = IncrementalWriter()
+    assert writer.writes(nb) == writes(nb)
+    assert (writer.encoded, writer.reused) == (len(nb.cells), 0)
+
+
+def test_unchanged(nb):
+    writer = IncrementalWriter()
+    writer.writes(nb)
+    assert writer.writes(copy.deepcopy(nb)) == writes(nb)
+    assert (writer.encoded, writer.reused) == (0, len(nb.cells))
+
+
+def test_changed_cells(nb):
+    writer = IncrementalWriter()
+    writer.writes(nb)
+    code = [cell for cell in nb.cells if cell.cell_type == 'code' and cell.outputs][0]
+    code.outputs[0].setdefault('data', {})['text/plain'] = 'changed\nin place'
+    nb.cells.insert(0, new_code_cell('new', outputs=[new_output('stream', text='x\ny')]))
+    nb.cells.pop()
+    assert writer.writes(nb) == writes(nb)
+    assert (writer.encoded, writer.reused) == (2, len(nb.cells) - 2)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'split_lines': False}, {'ensure_ascii': True}, {'profile': 'compact'},
+])
+def test_options(nb, kwargs):
+    writer = IncrementalWriter(**kwargs)
+    writer.writes(nb)
+    nb.cells[0].source = u'caf\xe9\nline'
+    assert writer.writes(nb) == writes(nb, **kwargs)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'externalize_over': 10}, {},
+])
+def test_unsupported(tmpdir, kwargs):
+    kwargs = dict(kwargs, blob_store=str(tmpdir.join('blobs')))
+    with pytest.raises(ValueError):
+        IncrementalWriter(**kwargs)
+
+
+def test_invalid_cell_logged(nb):
+    writer = IncrementalWriter()
+    nb.cells[1]['bad'] = True
+    # when the cell is encoded, and when it is reused
+    for i in range(2):
+        with TestCase().assertLogs(get_logger(), 'ERROR') as logs:
+            writer.writes(nb)
+        assert "'bad' was unexpected" in logs.output[0]
+        assert writer.encoded == (1 - i) * len(nb.cells)
+
+
+def test_other_versions():
+    nb = read(os.path.join(here, 'test3.ipynb'), 3)
+    assert IncrementalWriter().writes(nb) == writes(nb)
+
+
+def test_write(nb, tmpdir):
+    writer = IncrementalWriter()
+    path = str(tmpdir.join('out.ipynb'))
+    writer.write(nb, path)
+    ref = io.StringIO()
+    write(nb, ref)
+    with io.open(path, encoding='utf-8') as f:
+        assert f.read() == ref.getvalue()
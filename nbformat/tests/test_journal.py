@@ -0,0 +1,137 @@
+"""Tests for notebook journals"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import shutil
+
+import pytest
+
+from nbformat import read, write
+from nbformat.journal import Journal, journal_path, read_events, replay
+from nbformat.notebooknode import NotebookNode
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook, new_output
+from nbformat.v4.nodes import RawCell
+
+here = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def nb_path(tmpdir):
+    path = str(tmpdir.join('test4.ipynb'))
+    shutil.copy(os.path.join(here, 'test4.ipynb'), path)
+    return path
+
+
+def test_replay_and_compact(nb_path):
+    expected = read(nb_path, 4)
+    with Journal(nb_path) as journal:
+        journal.insert_cell(0, new_code_cell('run()'))
+        expected.cells.insert(0, new_code_cell('run()'))
+        for i in range(3):
+            journal.add_output(0, new_output('stream', text='step %i\n' % i))
+        journal.add_output(0, new_output('display_data', data={'text/plain': 'done'}))
+        journal.update_cell(0, execution_count=1)
+        journal.set_cell(1, new_markdown_cell('# Title'))
+        journal.delete_cell(2)
+        journal.set_metadata({'kernelspec': {'name': 'python3', 'display_name': 'Python 3'}})
+
+        expected.cells[0].outputs = [
+            new_output('stream', text='step 0\nstep 1\nstep 2\n'),
+            new_output('display_data', data={'text/plain': 'done'}),
+        ]
+        expected.cells[0].execution_count = 1
+        expected.cells[1] = new_markdown_cell('# Title')
+        del expected.cells[2]
+        expected.metadata = {'kernelspec': {'name': 'python3', 'display_name': 'Python 3'}}
+
+        # the notebook file is untouched until compaction
+        assert read(nb_path, 4) != expected
+        assert replay(nb_path) == expected
+        assert journal.replay() == expected
+        replayed = journal.replay()
+        assert [type(cell) for cell in replayed.cells] == [type(cell) for cell in expected.cells]
+        assert [type(output) for output in replayed.cells[0].outputs] == \
+            [type(output) for output in expected.cells[0].outputs]
+        assert type(replayed.cells[0].outputs[0]) is not NotebookNode
+
+        assert journal.compact() == expected
+        assert read(nb_path, 4) == expected
+        assert not os.path.exists(journal_path(nb_path))
+
+        # appending after compaction starts a new journal
+        journal.clear_outputs(0)
+        expected.cells[0].outputs = []
+    assert replay(nb_path) == expected
+
+
+def test_new_notebook(tmpdir):
+    path = str(tmpdir.join('new.ipynb'))
+    with Journal(path) as journal:
+        journal.insert_cell(0, new_code_cell('x'))
+    assert replay(path) == new_notebook(cells=[new_code_cell('x')])
+
+
+def test_update_cell_type(tmpdir):
+    path = str(tmpdir.join('new.ipynb'))
+    with Journal(path) as journal:
+        journal.insert_cell(0, new_code_cell('x'))
+        journal.update_cell(0, cell_type='raw')
+    cell = replay(path).cells[0]
+    assert type(cell) is RawCell
+    assert cell.source == 'x'
+
+
+def test_stale_journal_ignored(nb_path):
+    with Journal(nb_path) as journal:
+        journal.delete_cell(0)
+    # the notebook is rewritten without compacting, as after a crash in compact
+    nb = read(nb_path, 4)
+    nb.cells[0].source = 'changed'
+    write(nb, nb_path)
+    assert replay(nb_path) == nb
+
+    # a new journal replaces the stale one
+    with Journal(nb_path) as journal:
+        journal.delete_cell(1)
+    assert [e['op'] for e in read_events(journal_path(nb_path))] == ['base', 'delete_cell']
+    del nb.cells[1]
+    assert replay(nb_path) == nb
+
+
+def test_torn_last_line(nb_path):
+    expected = read(nb_path, 4)
+    with Journal(nb_path) as journal:
+        journal.delete_cell(0)
+    del expected.cells[0]
+    with open(journal_path(nb_path), 'a') as f:
+        f.write('{"op": "delete_ce')
+    assert replay(nb_path) == expected
+
+    # appending drops the partial line
+    with Journal(nb_path) as journal:
+        journal.delete_cell(0)
+    del expected.cells[0]
+    assert replay(nb_path) == expected
+
+
+def test_bad_events(nb_path):
+    with Journal(nb_path) as journal:
+        journal.append({'op': 'explode'})
+    with pytest.raises(ValueError):
+        replay(nb_path)
+    os.remove(journal_path(nb_path))
+    with Journal(nb_path) as journal:
+        journal.delete_cell(1000)
+    with pytest.raises(ValueError):
+        replay(nb_path)
+
+
+def test_compact_keeps_mode(nb_path):
+    os.chmod(nb_path, 0o600)
+    with Journal(nb_path) as journal:
+        journal.insert_cell(0, new_code_cell('run()'))
+        journal.compact()
+    assert os.stat(nb_path).st_mode & 0o777 == 0o600
+    assert read(nb_path, 4).cells[0].source == 'run()'
@@ -0,0 +1,188 @@
+"""Conformance tests for the JSON backends
+
+Every installed backend must parse exactly like the standard library, apart
+from the differences documented on the backend.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import io
+import json
+import mmap
+import os
+
+import pytest
+
+from nbformat import read, reads, writes
+from nbformat.json_backend import (
+    get_json_backend, JSONBackend, BACKENDS, _BACKEND_MAP,
+)
+from nbformat.notebooknode import NotebookNode
+from nbformat.reader import parse_json, NotJSONError
+
+installed = [name for (name, module, _) in _BACKEND_MAP if module]
+
+here = os.path.dirname(__file__)
+test_files = [
+    'test2.ipynb', 'test3.ipynb', 'test4.ipynb', 'test4plus.ipynb',
+    'test4docinfo.ipynb', 'test4jupyter_metadata_timings.ipynb',
+]
+
+values = [
+    {},
+    [],
+    {'empty': [[], {}], 'nested': {'a': [1, [2, [3, {'b': None}]]]}},
+    {'z': 1, 'a': 2, 'M': 3, u'\xe9': 4},
+    [0.1, -0.0, 1.0, 1e16, 1e-05, 1.5e300, 5e-324, 1.2345678901234568e+17, 1e22],
+    [0, -1, 2 ** 63 - 1, 2 ** 63, 2 ** 64 - 1, -2 ** 63],
+    [True, False, None],
+    u'\x00\x1f\x7f\b\f\n\r\t"\\/   ',
+    u'non-ascii \xe9 中 \U0001f600',
+    [u'1e5', u'line ending in a number 1.5', u'", 1.5'],
+]
+
+
+@pytest.fixture(params=installed)
+def backend(request):
+    return get_json_backend(request.param)
+
+
+@pytest.mark.parametrize('value', values)
+def test_loads(backend, value):
+    s = json.dumps(value)
+    assert backend.loads(s) == json.loads(s)
+    assert backend.loads(s.encode('utf8')) == json.loads(s)
+
+
+def _dicts(value):
+    if isinstance(value, dict):
+        yield value
+        value = list(value.values())
+    if isinstance(value, list):
+        for item in value:
+            for d in _dicts(item):
+                yield d
+
+
+@pytest.mark.parametrize('value', values)
+def test_loads_nodes(backend, value):
+    s = json.dumps(value)
+    for loaded in (backend.loads_nodes(s), parse_json(s.encode('utf-16'), backend.name, nodes=True)):
+        assert loaded == json.loads(s)
+        if type(backend) is JSONBackend:
+            assert all(type(d) is NotebookNode for d in _dicts(loaded))
+
+
+@pytest.mark.parametrize('fname,version', [('test4.ipynb', 4), ('test3.ipynb', 3)])
+def test_read_uses_backend(backend, monkeypatch, fname, version):
+    calls = []
+    loads = type(backend).loads
+    monkeypatch.setattr(type(backend), 'loads', lambda self, s, **kw: calls.append(s) or loads(self, s, **kw))
+    path = os.path.join(here, fname)
+    ref = read(path, as_version=version)
+    del calls[:]
+    assert read(path, as_version=version, json_backend=backend.name) == ref
+    assert len(calls) == (0 if type(backend) is JSONBackend else 1)
+    monkeypatch.setenv('NBFORMAT_JSON_BACKEND', backend.name)
+    with open(path, 'rb') as f:
+        assert read(f, as_version=version) == ref
+    assert len(calls) == (0 if type(backend) is JSONBackend else 2)
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-8-sig', 'utf-16', 'utf-32-le'])
+def test_loads_buffer(backend, encoding):
+    s = json.dumps(values[2:], ensure_ascii=False)
+    b = s.encode(encoding)
+    assert backend.loads(b) == json.loads(s)
+    assert backend.loads(bytearray(b)) == json.loads(s)
+    assert backend.loads(memoryview(b)) == json.loads(s)
+
+
+def test_loads_mmap(backend, tmpdir):
+    s = json.dumps(values[2:], ensure_ascii=False)
+    path = tmpdir.join('values.json')
+    path.write_binary(s.encode('utf-8'))
+    with path.open('rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            assert backend.loads(m) == json.loads(s)
+            assert parse_json(m, json_backend=backend.name) == json.loads(s)
+        # the buffer is released again, so the mapping can be closed
+
+
+def test_parse_json_buffer_error(backend):
+    with pytest.raises(NotJSONError) as e:
+        parse_json(memoryview(b'{"a": ' + b'1' * 1000), json_backend=backend.name)
+    assert len(str(e.value)) == 80
+    assert "b'{\"a\": 111" in str(e.value)
+
+
+@pytest.mark.parametrize('text', [u'NaN', u'[Infinity, -Infinity]', u'{"a": 1, "a": 2}'])
+def test_loads_stdlib_extensions(backend, text):
+    assert json.dumps(backend.loads(text)) == json.dumps(json.loads(text))
+
+
+def test_loads_huge_int(backend):
+    s = json.dumps([2 ** 100, -2 ** 63 - 1])
+    if backend.name == 'orjson':
+        # documented: orjson parses these as floats
+        assert backend.loads(s) == [float(2 ** 100), float(-2 ** 63 - 1)]
+    else:
+        assert backend.loads(s) == json.loads(s)
+
+
+def test_loads_kwargs(backend):
+    s = u'{"b": 1.5, "a": 2}'
+    assert backend.loads(s, parse_float=str) == {'b': '1.5', 'a': 2}
+
+
+@pytest.mark.parametrize('text', [u'', u'{', u'{"a": }', u'[1, 2', u'{"a": 1} x'])
+def test_loads_invalid(backend, text):
+    with pytest.raises(ValueError):
+        backend.loads(text)
+    with pytest.raises(NotJSONError):
+        parse_json(text, json_backend=backend.name)
+
+
+@pytest.mark.parametrize('fname', test_files)
+def test_notebook_roundtrip(backend, fname):
+    with io.open(os.path.join(here, fname), encoding='utf-8') as f:
+        s = f.read()
+    ref = reads(s, as_version=4)
+    nb = reads(s, as_version=4, json_backend=backend.name)
+    assert nb == ref
+    assert writes(nb) == writes(ref)
+
+
+def test_streaming_ignores_backend(backend):
+    path = os.path.join(here, 'test4.ipynb')
+    with io.open(path, encoding='utf-8') as f:
+        s = f.read()
+    ref = read(path, as_version=4)
+    no_outputs = read(path, as_version=4, outputs=False)
+    assert read(path, as_version=4, stream=True, json_backend=backend.name) == ref
+    assert read(path, as_version=4, outputs=False, json_backend=backend.name) == no_outputs
+    assert reads(s, as_version=4, outputs=False, json_backend=backend.name) == no_outputs
+    assert reads(s, as_version=4, outputs=['text/plain'], json_backend=backend.name) == \
+        reads(s, as_version=4, outputs=['text/plain'])
+
+
+def test_env_var(monkeypatch):
+    for name in installed:
+        monkeypatch.setenv('NBFORMAT_JSON_BACKEND', name)
+        assert get_json_backend().name == name
+    monkeypatch.delenv('NBFORMAT_JSON_BACKEND')
+    assert get_json_backend().name == 'json'
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        get_json_backend('not-a-json-library')
+
+
+def test_missing_backend_falls_back(monkeypatch):
+    from nbformat import json_backend
+    monkeypatch.setattr(json_backend, '_BACKEND_MAP',
+        [(name, None, cls) for (name, module, cls) in _BACKEND_MAP])
+    for name in BACKENDS:
+        assert type(get_json_backend(name)) is JSONBackend
@@ -0,0 +1,86 @@
+"""Tests for NotebookNode"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import gc
+import pickle
+
+import pytest
+
+from nbformat.notebooknode import NotebookNode, from_dict
+
+
+def has_instance_dict(node):
+    # looking at node.__dict__ would create it, but the gc sees it if it exists
+    return any(type(ref) is dict for ref in gc.get_referents(node))
+
+
+def test_no_instance_dict():
+    node = from_dict({'a': {'b': 1}})
+    node.c = 2
+    node['d'] = {'e': 3}
+    for n in (node, node.a, node.d, copy.deepcopy(node), pickle.loads(pickle.dumps(node))):
+        assert not has_instance_dict(n)
+    assert node == {'a': {'b': 1}, 'c': 2, 'd': {'e': 3}}
+    assert isinstance(node.d, NotebookNode)
+
+
+def test_struct_behavior():
+    node = NotebookNode(a=1)
+    with pytest.raises(AttributeError):
+        node.keys = 1
+    with pytest.raises(AttributeError):
+        node.missing
+    assert not has_instance_dict(node)
+    node.allow_new_attr(False)
+    node.a = 2
+    with pytest.raises(AttributeError):
+        node.b = 1
+    with pytest.raises(KeyError):
+        node['b'] = 1
+    assert node == {'a': 2}
+
+
+def test_field_attributes():
+    node = from_dict({'source': 'x', 'metadata': {'a': 1}, 'other': 2})
+    assert node.source == 'x'
+    assert node.metadata.a == 1
+    assert node.other == 2
+    node.source = 'y'
+    node.outputs = [{'output_type': 'stream'}]
+    assert node['source'] == 'y'
+    assert node.outputs == [{'output_type': 'stream'}]
+
+    for key in ('text', 'missing'):
+        with pytest.raises(AttributeError):
+            getattr(node, key)
+        with pytest.raises(KeyError):
+            node[key]
+        assert getattr(node, key, None) is None
+        assert not hasattr(node, key)
+    assert not has_instance_dict(node)
+    node.allow_new_attr(False)
+    with pytest.raises(AttributeError):
+        node.text = 'z'
+
+
+def test_update():
+    node = NotebookNode(a=1)
+    node.update({'b': {'c': 2}}, d={'e': 3})
+    node.update(NotebookNode(f={'g': 4}))
+    node.update([('h', {'i': 5})])
+    assert node == {'a': 1, 'b': {'c': 2}, 'd': {'e': 3}, 'f': {'g': 4}, 'h': {'i': 5}}
+    for key in 'bdfh':
+        assert type(node[key]) is NotebookNode
+
+    class Doubling(dict):
+        def __getitem__(self, key):
+            return 2 * dict.__getitem__(self, key)
+
+    node.update(Doubling(a=1))
+    assert node.a == 2
+    node.allow_new_attr(False)
+    with pytest.raises(KeyError):
+        node.update({'new': 1})
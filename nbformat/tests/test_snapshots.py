@@ -0,0 +1,120 @@
+"""Tests for notebook snapshots"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import os
+import pickle
+
+import pytest
+
+import nbformat
+from nbformat import read, snapshot, validate, writes
+from nbformat.snapshots import FrozenList, FrozenNode, thaw
+from nbformat.v4 import new_markdown_cell, new_output
+from nbformat.v4.nodes import CodeCell
+
+here = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def nb():
+    return read(os.path.join(here, 'test4.ipynb'), 4)
+
+
+def test_snapshot(nb):
+    snap = snapshot(nb)
+    assert snap == nb
+    assert type(snap) is FrozenNode
+    assert type(snap.cells) is FrozenList
+    assert type(snap.cells[0].metadata) is FrozenNode
+    # values are shared, not copied
+    assert snap.cells[0].source is nb.cells[0].source
+    validate(snap)
+    assert writes(snap) == writes(nb)
+
+    expected = copy.deepcopy(nb)
+    nb.cells[0].source = 'changed'
+    nb.cells[0].metadata['key'] = 'value'
+    nb.cells.append(new_markdown_cell('new'))
+    assert snap == expected
+
+
+def test_read_only(nb):
+    snap = snapshot(nb)
+    cell = snap.cells[0]
+    for change in [
+        lambda: cell.__setitem__('source', 'x'),
+        lambda: setattr(cell, 'source', 'x'),
+        lambda: cell.update(source='x'),
+        lambda: cell.pop('source'),
+        lambda: cell.metadata.clear(),
+        lambda: snap.cells.append(cell),
+        lambda: snap.cells.__setitem__(0, cell),
+        lambda: snap.cells.pop(),
+    ]:
+        with pytest.raises(TypeError):
+            change()
+    assert snap == nb
+
+
+def test_shares_unchanged(nb):
+    first = snapshot(nb)
+    assert snapshot(nb) is first
+    code_index = [cell.cell_type for cell in nb.cells].index('code')
+    nb.cells[code_index].outputs.append(new_output('stream', text='more'))
+    second = snapshot(nb)
+    assert second == nb
+    assert first != nb
+    for index, (old, new) in enumerate(zip(first.cells, second.cells)):
+        if index == code_index:
+            assert new is not old
+            assert new.metadata is old.metadata
+            assert all(a is b for a, b in zip(old.outputs, new.outputs))
+        else:
+            assert new is old
+
+    # inserting or deleting cells keeps the others shared
+    nb.cells.insert(1, new_markdown_cell('inserted'))
+    third = snapshot(nb)
+    assert third.cells[0] is second.cells[0]
+    assert all(new is old for new, old in zip(third.cells[2:], second.cells[1:]))
+    del nb.cells[1:3]
+    fourth = snapshot(nb)
+    assert fourth == nb
+    assert all(new is old for new, old in zip(fourth.cells[1:], second.cells[2:]))
+
+    # restoring a cell from a snapshot shares it
+    nb.cells[code_index] = first.cells[code_index]
+    assert snapshot(nb).cells[code_index] is first.cells[code_index]
+
+
+def test_base(nb):
+    first = snapshot(nb)
+    other = copy.deepcopy(nb)
+    other.cells[0].source = 'changed'
+    snap = snapshot(other, base=first)
+    assert snap.cells[0] is not first.cells[0]
+    assert all(new is old for new, old in zip(snap.cells[1:], first.cells[1:]))
+    # a base with other keys is not reused for missing ones
+    assert snapshot({'a': 1, 'c': None}, base=FrozenNode(a=1, b=None)) == {'a': 1, 'c': None}
+
+
+def test_thaw(nb):
+    restored = thaw(snapshot(nb))
+    assert restored == nb
+    assert type(restored) is nbformat.NotebookNode
+    code = [cell for cell in restored.cells if cell.cell_type == 'code'][0]
+    assert type(code) is CodeCell
+    code.source = 'changed'
+    assert type(restored.cells) is list
+
+
+def test_copy_and_pickle(nb):
+    snap = snapshot(nb)
+    for clone in (copy.deepcopy(snap), pickle.loads(pickle.dumps(snap))):
+        assert clone == nb
+        assert type(clone) is FrozenNode
+        assert type(clone.cells) is FrozenList
+        assert type(clone.cells[0]) is FrozenNode
@@ -0,0 +1,249 @@
+"""Tests for the incremental notebook reader"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import io
+import json
+import mmap
+import os
+
+import pytest
+
+from .base import TestsBase
+
+from nbformat import read, peek, validate, write, writes
+from nbformat import reads as nbformat_reads
+from ..v4.rwbase import filter_outputs
+from ..reader import NotJSONError, get_version, reads
+from .. import streaming
+from ..streaming import JSONStream
+
+test_files = [
+    u'test2.ipynb',
+    u'test3.ipynb',
+    u'test4.ipynb',
+    u'test4plus.ipynb',
+    u'test4docinfo.ipynb',
+    u'test4jupyter_metadata_timings.ipynb',
+    u'invalid.ipynb',
+]
+
+
+class TestStreamingRead(TestsBase):
+
+    def bopen(self, fname):
+        return io.open(os.path.join(self._get_files_path(), fname), 'rb')
+
+    def test_matches_reader(self):
+        """streaming.read returns the same notebooks as reader.reads"""
+        for fname in test_files:
+            with self.fopen(fname) as f:
+                ref = reads(f.read())
+            # small chunks exercise values split across reads
+            for chunk_size in (1, 7, 64, streaming.CHUNK_SIZE):
+                with self.fopen(fname) as f:
+                    nb = streaming.read(f, chunk_size=chunk_size)
+                self.assertEqual(nb, ref, "%s with chunk_size=%i" % (fname, chunk_size))
+
+    def test_cells_are_rejoined(self):
+        with self.fopen(u'test4.ipynb') as f:
+            nb = streaming.read(f, chunk_size=16)
+        for cell in nb.cells:
+            assert isinstance(cell.source, str)
+
+    def test_read_stream_path(self):
+        path = os.path.join(self._get_files_path(), u'test4.ipynb')
+        self.assertEqual(read(path, as_version=4, stream=True), read(path, as_version=4))
+
+    def test_matches_reader_binary(self):
+        for fname in test_files:
+            with self.bopen(fname) as f:
+                ref = reads(f.read())
+            for chunk_size in (1, 7, streaming.CHUNK_SIZE):
+                with self.bopen(fname) as f:
+                    nb = streaming.read(f, chunk_size=chunk_size)
+                self.assertEqual(nb, ref, "%s with chunk_size=%i" % (fname, chunk_size))
+
+    def test_read_mmap(self):
+        with self.bopen(u'test4.ipynb') as f:
+            ref = reads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertEqual(streaming.read(m, chunk_size=5), ref)
+
+    def test_peek(self):
+        for fname in test_files:
+            with self.fopen(fname) as f:
+                nb = reads(f.read())
+            if nb.nbformat >= 3:
+                metadata = nb.metadata
+            else:
+                metadata = nb.get('metadata', {})
+            if 'worksheets' in nb:
+                cell_count = sum(len(ws.cells) for ws in nb.worksheets)
+            else:
+                cell_count = len(nb.cells)
+            for chunk_size in (1, 7, streaming.CHUNK_SIZE):
+                with self.bopen(fname) as f:
+                    header = streaming.peek(f, chunk_size=chunk_size)
+                self.assertEqual(header.version, get_version(nb))
+                self.assertEqual(header.cell_count, cell_count)
+                self.assertEqual(header.metadata, metadata)
+
+    def test_peek_path(self):
+        path = os.path.join(self._get_files_path(), u'test4.ipynb')
+        nb = read(path, as_version=4)
+        version, metadata, cell_count = peek(path)
+        self.assertEqual(version, (4, nb.nbformat_minor))
+        self.assertEqual(metadata, nb.metadata)
+        self.assertEqual(cell_count, len(nb.cells))
+
+    def test_skip_outputs(self):
+        for fname in test_files:
+            with self.fopen(fname) as f:
+                s = f.read()
+            for outputs in (False, ['text/plain'], ('image/png', 'text/html'), []):
+                ref = nbformat_reads(s, as_version=4)
+                filter_outputs(ref, outputs)
+                for chunk_size in (7, streaming.CHUNK_SIZE):
+                    with self.bopen(fname) as f:
+                        nb = read(f, as_version=4, outputs=outputs, chunk_size=chunk_size)
+                    self.assertEqual(nb, ref, "%s with outputs=%r" % (fname, outputs))
+                self.assertEqual(nbformat_reads(s, as_version=4, outputs=outputs), ref)
+                self.assertEqual(nbformat_reads(s.encode('utf8'), as_version=4, outputs=outputs), ref)
+
+    def test_skip_outputs_valid(self):
+        with self.fopen(u'test4.ipynb') as f:
+            nb = read(f, as_version=4, outputs=False)
+        code_cells = [cell for cell in nb.cells if cell.cell_type == 'code']
+        assert code_cells
+        for cell in code_cells:
+            self.assertEqual(cell.outputs, [])
+        validate(nb)
+
+    def test_mime_allow_list(self):
+        path = os.path.join(self._get_files_path(), u'test4.ipynb')
+        full = read(path, as_version=4)
+        nb = read(path, as_version=4, outputs={'text/plain'})
+        for cell, ref in zip(nb.cells, full.cells):
+            for output, ref_output in zip(cell.get('outputs', []), ref.get('outputs', [])):
+                if 'data' in ref_output:
+                    self.assertEqual(set(output.data), set(ref_output.data) & {'text/plain'})
+                else:
+                    self.assertEqual(output, ref_output)
+        validate(nb)
+
+    def test_read_stream_upgrade(self):
+        with self.fopen(u'test2.ipynb') as f:
+            nb = read(f, as_version=4, stream=True)
+        self.assertEqual(nb.nbformat, 4)
+
+
+class TestStreamingWrite(TestsBase):
+
+    def test_matches_writes(self):
+        """streaming.write writes the same text as nbformat.write"""
+        for fname in test_files:
+            with self.fopen(fname, u'r') as f:
+                nb = read(f, 4)
+            for version in (None, 3, 4):
+                f = io.StringIO()
+                streaming.write(nb, f, version)
+                ref = io.StringIO()
+                write(nb, ref, 4 if version is None else version)
+                self.assertEqual(f.getvalue(), ref.getvalue())
+
+    def test_write_stream_path(self):
+        with self.fopen(u'test4.ipynb', u'r') as f:
+            nb = read(f, 4)
+        path = os.path.join(self._get_files_path(), u'streamed.ipynb')
+        try:
+            write(nb, path, stream=True)
+            with io.open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), writes(nb) + u'\n')
+        finally:
+            os.remove(path)
+
+
+def test_stream_tokens():
+    stream = JSONStream(io.StringIO(u' {"a": [1, -2.5e3, "x\\"]"], "b": {"c": null}} '), chunk_size=3)
+    keys = []
+    for key in stream.iter_object():
+        keys.append(key)
+        if key == 'a':
+            assert [stream.read_value() for _ in stream.iter_array()] == [1, -2500.0, u'x"]']
+        else:
+            stream.skip_value()
+    stream.finish()
+    assert keys == ['a', 'b']
+
+
+@pytest.mark.parametrize('text', [
+    u'',
+    u'{',
+    u'{"cells": [}',
+    u'{"nbformat": 4,}',
+    u'{"nbformat": 4} trailing',
+    u'{"cells": ["unterminated]}',
+])
+def test_not_json(text):
+    with pytest.raises(NotJSONError):
+        streaming.read(io.StringIO(text), chunk_size=4)
+    with pytest.raises(NotJSONError):
+        streaming.peek(io.StringIO(text), chunk_size=4)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+def test_skip_escapes(chunk_size):
+    """Escaped quotes and backslashes are skipped across chunk boundaries"""
+    s = json.dumps({
+        'cells': [{'source': u'\\'}, {'source': u'\\"'}, {'source': u'"\\\\"'}, {}],
+        'metadata': {'a': u'"]}\\'},
+        'nbformat': 4,
+        'nbformat_minor': 2,
+    })
+    header = streaming.peek(io.StringIO(s), chunk_size=chunk_size)
+    assert header == ((4, 2), {'a': u'"]}\\'}, 4)
+
+
+def test_large_cell_across_chunks():
+    nb = {
+        'cells': [{
+            'cell_type': 'code',
+            'execution_count': 1,
+            'metadata': {'trusted': True},
+            'outputs': [{
+                'name': 'stdout',
+                'output_type': 'stream',
+                'text': ['line %i\n' % i for i in range(2000)],
+            }],
+            'source': ['print("\\\\ \\"quoted\\"")'],
+        }],
+        'metadata': {'signature': 'sha256:0'},
+        'nbformat': 4,
+        'nbformat_minor': 4,
+    }
+    s = json.dumps(nb, indent=1)
+    ref = reads(s)
+    assert streaming.read(io.StringIO(s), chunk_size=100) == ref
+    assert 'trusted' not in ref.cells[0].metadata
+    assert 'signature' not in ref.metadata
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-32-be'])
+@pytest.mark.parametrize('chunk_size', [1, 3, 5])
+def test_binary_multibyte(encoding, chunk_size):
+    """Characters split across binary chunks are decoded correctly"""
+    nb = {
+        'cells': [{
+            'cell_type': 'markdown',
+            'metadata': {},
+            'source': [u'caf\xe9 \u4e2d \U0001f600\n', u'\u00e9'],
+        }],
+        'metadata': {u'\xe9': u'\U0001f600'},
+        'nbformat': 4,
+        'nbformat_minor': 4,
+    }
+    s = json.dumps(nb, ensure_ascii=False)
+    ref = reads(s)
+    assert streaming.read(io.BytesIO(s.encode(encoding)), chunk_size=chunk_size) == ref
@@ -0,0 +1,239 @@
+"""Tests for tracking the changes of notebooks"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import os
+import pickle
+
+import pytest
+
+from nbformat import incremental, read, snapshot, track_changes, writes
+from nbformat.incremental import IncrementalWriter
+from nbformat.notebooknode import NotebookNode
+from nbformat.tracking import TrackedList, TrackedNode, TrackedNotebook
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_output
+from nbformat.v4.nodes import CodeCell
+
+here = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def nb():
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    nb.cells.extend([new_code_cell('a'), new_code_cell('b'), new_markdown_cell('c')])
+    return track_changes(nb)
+
+
+def test_track(nb):
+    expected = writes(nb)
+    assert isinstance(nb, TrackedNotebook)
+    assert all(isinstance(cell, TrackedNode) for cell in nb.cells)
+    assert isinstance(nb.cells[-2], CodeCell)
+    assert type(nb.cells) is TrackedList
+    assert type(nb.cells[-2].outputs) is TrackedList
+    assert track_changes(nb) is nb
+    assert writes(nb) == expected
+
+    token = nb.change_token()
+    assert not nb.changed(token)
+    assert nb.changed_cells(token) == []
+    assert nb.changed_cells() == list(range(len(nb.cells)))
+
+
+@pytest.mark.parametrize('change', [
+    lambda cell: setattr(cell, 'source', 'changed'),
+    lambda cell: cell.__setitem__('source', 'changed'),
+    lambda cell: cell.__delitem__('source'),
+    lambda cell: cell.pop('source'),
+    lambda cell: cell.update(source='changed'),
+    lambda cell: cell.setdefault('new', 1),
+    lambda cell: cell.metadata.__setitem__('key', 'value'),
+    lambda cell: cell.metadata.clear(),
+    lambda cell: cell.outputs.append(new_output('stream', text='x')),
+    lambda cell: cell.outputs.extend([new_output('stream', text='x')]),
+    lambda cell: cell.outputs.__iadd__([new_output('stream', text='x')]),
+])
+def test_cell_changes(nb, change):
+    index = len(nb.cells) - 2
+    token = nb.change_token()
+    change(nb.cells[index])
+    assert nb.changed(token)
+    assert nb.changed_cells(token) == [index]
+
+
+def test_new_values_tracked(nb):
+    cell = nb.cells[-2]
+    cell.metadata = {'nested': {'list': [1]}}
+    output = new_output('stream', text='x')
+    cell.outputs.append(output)
+    token = nb.change_token()
+    cell.metadata.nested.list.append(2)
+    assert nb.changed_cells(token) == [len(nb.cells) - 2]
+    token = nb.change_token()
+    output.text = 'y'
+    assert nb.changed_cells(token) == [len(nb.cells) - 2]
+
+
+def test_plain_dicts_tracked(nb):
+    writer = IncrementalWriter()
+    index = len(nb.cells) - 2
+    nb.cells[index].outputs.append({'output_type': 'stream', 'name': 'stdout', 'text': 'x'})
+    nb.cells.append({'cell_type': 'markdown', 'metadata': {}, 'source': 'dict'})
+    assert isinstance(nb.cells[index].outputs[-1], TrackedNode)
+    assert isinstance(nb.cells[-1], TrackedNode)
+    writer.writes(nb)
+    first = snapshot(nb)
+    token = nb.change_token()
+    nb.cells[index].outputs[-1]['text'] = 'changed'
+    nb.cells[-1].metadata['key'] = 'value'
+    assert nb.changed_cells(token) == [index, len(nb.cells) - 1]
+    assert writer.writes(nb) == writes(nb)
+    second = snapshot(nb)
+    assert second == nb
+    assert second != first
+
+
+def test_shared_nodes_copied(nb):
+    writer = IncrementalWriter()
+    nb.cells[-1].metadata = nb.cells[-2].metadata
+    nb.cells[-1].outputs = nb.cells[-2].outputs
+    assert nb.cells[-1].metadata is not nb.cells[-2].metadata
+    writer.writes(nb)
+    token = nb.change_token()
+    nb.cells[-2].metadata['tags'] = ['shared']
+    nb.cells[-2].outputs.append(new_output('stream', text='x'))
+    assert nb.changed_cells(token) == [len(nb.cells) - 2]
+    assert writer.writes(nb) == writes(nb)
+    assert snapshot(nb) == nb
+
+    # nodes shared before tracking is turned on are copied too
+    nb = read(os.path.join(here, 'test4.ipynb'), 4)
+    nb.cells.append(new_markdown_cell('shared', metadata=nb.cells[0].metadata))
+    nb = track_changes(nb)
+    writer = IncrementalWriter()
+    writer.writes(nb)
+    token = nb.change_token()
+    nb.cells[0].metadata['tags'] = ['shared']
+    assert nb.changed_cells(token) == [0]
+    assert writer.writes(nb) == writes(nb)
+
+    # cells moved within the notebook stay the same cells
+    cell = nb.cells.pop(0)
+    nb.cells.append(cell)
+    assert nb.cells[-1] is cell
+    token = nb.change_token()
+    cell.source = 'moved'
+    assert nb.changed_cells(token) == [len(nb.cells) - 1]
+    assert writer.writes(nb) == writes(nb)
+
+
+def test_notebook_changes(nb):
+    token = nb.change_token()
+    nb.metadata['key'] = 'value'
+    assert nb.changed(token)
+    assert nb.changed_cells(token) == []
+
+    # cells put in the notebook count as changed
+    token = nb.change_token()
+    nb.cells.append(new_markdown_cell('new'))
+    nb.cells[1] = new_markdown_cell('replaced')
+    assert nb.changed_cells(token) == [1, len(nb.cells) - 1]
+    token = nb.change_token()
+    nb.cells = nb.cells[:2]
+    assert nb.changed_cells(token) == [0, 1]
+    token = nb.change_token()
+    nb.cells[1].source = 'changed'
+    assert nb.changed_cells(token) == [1]
+
+
+@pytest.mark.parametrize('change, moved', [
+    (lambda cells: cells.__delitem__(1), slice(1, None)),
+    (lambda cells: cells.__delitem__(-3), slice(-2, None)),
+    (lambda cells: cells.__delitem__(slice(0, 2)), slice(0, None)),
+    (lambda cells: cells.pop(1), slice(1, None)),
+    (lambda cells: cells.pop(), slice(0, 0)),
+    (lambda cells: cells.remove(cells[1]), slice(1, None)),
+    (lambda cells: cells.insert(1, new_markdown_cell('new')), slice(1, None)),
+    (lambda cells: cells.insert(-1, cells.pop(0)), slice(0, None)),
+    (lambda cells: cells.reverse(), slice(0, None)),
+    (lambda cells: cells.sort(key=lambda cell: cell.cell_type), None),
+    (lambda cells: cells.__setitem__(slice(1, 2), []), slice(1, None)),
+])
+def test_moved_cells(nb, change, moved):
+    writer = IncrementalWriter()
+    writer.writes(nb)
+    before = list(nb.cells)
+    token = nb.change_token()
+    change(nb.cells)
+    assert nb.changed(token)
+    if moved is None:
+        # cells that changed places
+        expected = [index for index, cell in enumerate(nb.cells)
+                    if index >= len(before) or before[index] is not cell]
+    else:
+        expected = list(range(len(nb.cells)))[moved]
+    assert nb.changed_cells(token) == expected
+    assert writer.writes(nb) == writes(nb)
+    assert snapshot(nb) == nb
+
+
+def test_moved_cells_errors(nb):
+    count = len(nb.cells)
+    token = nb.change_token()
+    with pytest.raises(IndexError):
+        del nb.cells[-count - 1]
+    with pytest.raises(IndexError):
+        nb.cells.pop(count)
+    with pytest.raises(ValueError):
+        nb.cells.remove(new_markdown_cell('missing'))
+    assert len(nb.cells) == count
+    assert nb.changed_cells(token) == []
+
+
+def test_frozen_cells(nb):
+    nb.cells.append(snapshot(new_markdown_cell('frozen')))
+    token = nb.change_token()
+    nb.cells[0].source = 'changed'
+    assert nb.changed_cells(token) == [0, len(nb.cells) - 1]
+
+
+def test_copies_untracked(nb):
+    for clone in (copy.deepcopy(nb), pickle.loads(pickle.dumps(nb))):
+        assert clone == nb
+        assert type(clone) is NotebookNode
+        assert type(clone.cells) is list
+        assert type(clone.cells[-2]) is CodeCell
+        assert not isinstance(clone.cells[-2].metadata, TrackedNode)
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        track_changes(read(os.path.join(here, 'test3.ipynb'), 3))
+    with pytest.raises(TypeError):
+        track_changes(snapshot(read(os.path.join(here, 'test4.ipynb'), 4)))
+
+
+def test_incremental_writer(nb, monkeypatch):
+    writer = IncrementalWriter()
+    writer.writes(nb)
+    hashed = []
+    cell_key = incremental._cell_key
+    monkeypatch.setattr(incremental, '_cell_key', lambda cell: hashed.append(cell) or cell_key(cell))
+    nb.cells[-2].source = 'changed'
+    assert writer.writes(nb) == writes(nb)
+    assert hashed == [nb.cells[-2]]
+    assert writer.encoded == 1
+
+
+def test_snapshot(nb):
+    first = snapshot(nb)
+    assert snapshot(nb) is first
+    nb.cells[-2].source = 'changed'
+    second = snapshot(nb)
+    assert second == nb
+    assert first != nb
+    assert second.metadata is first.metadata
+    for index, (old, new) in enumerate(zip(first.cells, second.cells)):
+        assert (new is old) == (index != len(nb.cells) - 2)
@@ -9,7 +9,7 @@ import re
 from .base import TestsBase
 from jsonschema import ValidationError
 from nbformat import read
-from ..validator import isvalid, validate, iter_validate
+from ..validator import isvalid, validate, iter_validate, iter_validate_cell
 from ..json_compat import VALIDATORS
 
 import pytest
@@ -197,3 +197,42 @@ def test_invalid_validator_raises_value_error_after_read():
     set_validator("foobar")
     with pytest.raises(ValueError):
         validate(nb)
+
+
+@pytest.mark.parametrize("validator_name", VALIDATORS)
+def test_validate_ref(validator_name):
+    """Test validating a single definition of the schema"""
+    set_validator(validator_name)
+    cell = {'cell_type': 'markdown', 'metadata': {}, 'source': ''}
+    validate(cell, 'markdown_cell', version=4)
+    del cell['source']
+    with pytest.raises(ValidationError):
+        validate(cell, 'markdown_cell', version=4)
+
+
+@pytest.mark.parametrize("validator_name", VALIDATORS)
+@pytest.mark.parametrize("fname", [u'test4.ipynb', u'test4plus.ipynb', u'invalid.ipynb'])
+def test_iter_validate_cell(validator_name, fname):
+    """Test that checking cells one by one agrees with validating the notebook"""
+    set_validator(validator_name)
+    with TestsBase.fopen(fname, u'r') as f:
+        nb = read(f, as_version=4)
+    for index, cell in enumerate(nb.cells):
+        errors = list(iter_validate_cell(cell, index, 4, nb.nbformat_minor))
+        assert bool(errors) == (not isvalid(dict(nb, cells=[cell])))
+
+
+# This is only a valid test for the default validator, jsonschema
+@pytest.mark.parametrize("validator_name", ["jsonschema"])
+def test_iter_validate_cell_error(validator_name):
+    set_validator(validator_name)
+    with TestsBase.fopen(u'invalid.ipynb', u'r') as f:
+        nb = read(f, as_version=4)
+
+    s = str(next(iter_validate_cell(nb.cells[0], 0)))
+    assert re.compile(r"validating .required. in markdown_cell").search(s)
+    assert re.compile(r"On instance\[u?['\"].*cells['\"]\]\[0\]").search(s)
+
+    errors = [error for index, cell in enumerate(nb.cells)
+              for error in iter_validate_cell(cell, index)]
+    assert {e.ref for e in errors} == {'markdown_cell', 'heading_cell', 'bad stream'}
@@ -0,0 +1,444 @@
+"""Recording which cells of a notebook change
+
+Validating, serializing or snapshotting a notebook goes over all of it, as
+nothing says which parts changed since the last time.  :func:`track_changes`
+makes a v4 notebook record that, in place::
+
+    nb = nbformat.track_changes(nb)
+    token = nb.change_token()
+    ...  # change the notebook
+    nb.changed_cells(since=token)  # the indices of the cells changed since
+
+Each cell has a :class:`Changes` record of when it last changed, shared by
+every node and list in it, and the notebook has one for everything else,
+including its list of cells.  Changing any node or list of the notebook, by
+item, attribute or method, updates the record it belongs to.  Cells put in
+the list of cells count as changed, and so do cells that change places, such
+as those after a cell inserted or deleted, or reordered by ``sort`` or
+``reverse``, so that the indices of the changed cells cover every position
+whose cell is not the same as before.  Cells that cannot be tracked, such as
+snapshots, always count as changed.
+
+Tracking is off by default, and costs nothing then.  To track changes, the
+nodes of the notebook are given tracking subclasses of their classes, so
+``isinstance`` checks keep working, and its lists are replaced by
+:class:`TrackedList` objects: take references to lists only after turning
+tracking on.  Tracked nodes take more memory, as each holds a reference to
+its record.  Dicts put in the notebook are converted to nodes, as
+``NotebookNode`` does when setting items.  A node or list put in a second
+place, such as a cell's metadata set on another cell, is copied, so that
+changes to either place are recorded; a cell moved within the notebook keeps
+its record.  Copies and pickles of tracked nodes are not tracked.
+
+:class:`~nbformat.incremental.IncrementalWriter` and
+:func:`~nbformat.snapshot` use the records of a tracked notebook to skip the
+cells that did not change without looking at them.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import itertools
+import operator
+import weakref
+
+from .notebooknode import NotebookNode, from_dict
+from .snapshots import FrozenList, FrozenNode, _freeze
+
+# versions and tokens are taken from one clock, so a token from one notebook
+# can be compared with the versions of another
+_clock = itertools.count(1)
+
+
+class Changes(object):
+    """A record of when the part of a notebook it belongs to last changed
+
+    `version` is the time of the last change to the part itself, and
+    `latest` the time of the last change to it or to any part under it, on
+    the clock that tokens are taken from.
+    """
+    __slots__ = ('version', 'latest', 'parent', 'frozen')
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        # the last snapshot of the part and the version it was taken at
+        self.frozen = None
+        self.touch()
+
+    def touch(self):
+        """Record a change made now"""
+        self.version = self.latest = version = next(_clock)
+        if self.parent is not None:
+            self.parent.latest = version
+
+
+_tracked_classes = {}
+
+
+def _tracked_class(cls, notebook=False):
+    """The tracking subclass of a node class"""
+    cls = getattr(cls, '_untracked_class', cls)
+    tracked = _tracked_classes.get((cls, notebook))
+    if tracked is None:
+        name = 'TrackedNotebook' if notebook else 'Tracked' + cls.__name__
+        tracked = _tracked_classes[cls, notebook] = type(name, (TrackedNotebook if notebook else TrackedNode, cls), {
+            '__slots__': (),
+            '__module__': __name__,
+            '_untracked_class': cls,
+        })
+    return tracked
+
+
+def _attach(value, changes):
+    """Make a value put in a tracked notebook record its changes in `changes`
+
+    Returns the value to store, which is a new list for lists, a node for
+    dicts, and a copy for nodes and lists already in another part.
+    """
+    if isinstance(value, (FrozenNode, FrozenList)):
+        # snapshots cannot change
+        return value
+    if isinstance(value, dict):
+        if not isinstance(value, NotebookNode):
+            value = from_dict(value)
+        elif isinstance(value, TrackedNode) and value._changes is not changes:
+            # one node cannot record its changes in two places; the copy is
+            # not tracked, nor is anything in it
+            value = copy.deepcopy(value)
+        if not isinstance(value, TrackedNode):
+            object.__setattr__(value, '__class__', _tracked_class(type(value)))
+        object.__setattr__(value, '_changes', changes)
+        for key, item in dict.items(value):
+            if isinstance(item, (dict, list)):
+                new = _attach(item, changes)
+                if new is not item:
+                    dict.__setitem__(value, key, new)
+        return value
+    if isinstance(value, list):
+        if type(value) is not TrackedList or value._changes is not changes:
+            # the nodes in a list from another part are copied as they are
+            # attached
+            value = TrackedList(value)
+        value._changes = changes
+        for index, item in enumerate(value):
+            if isinstance(item, (dict, list)):
+                new = _attach(item, changes)
+                if new is not item:
+                    list.__setitem__(value, index, new)
+        return value
+    return value
+
+
+def _attach_cell(cell, changes):
+    """Track a cell put in the list of cells of a tracked notebook"""
+    if isinstance(cell, TrackedNode) and cell._changes.parent is changes:
+        # moved within the notebook, or put in it twice: the cell keeps its
+        # record, and counts as changed
+        cell._changes.touch()
+        return cell
+    if isinstance(cell, dict):
+        return _attach(cell, Changes(parent=changes))
+    return cell
+
+
+def _track_cells(cells, changes):
+    cells = TrackedList(cells)
+    cells._changes = changes
+    cells._cells = True
+    for index, cell in enumerate(cells):
+        list.__setitem__(cells, index, _attach_cell(cell, changes))
+    return cells
+
+
+def cell_changes(cell):
+    """The :class:`Changes` record of a cell of a tracked notebook, or None"""
+    if isinstance(cell, TrackedNode):
+        return cell._changes
+    return None
+
+
+class TrackedNode(object):
+    """Mixin of the tracking subclasses of node classes
+
+    Every change made to a node updates the :class:`Changes` record in its
+    ``_changes`` attribute.
+    """
+    __slots__ = ()
+
+    def _attach_value(self, key, value):
+        return _attach(value, self._changes)
+
+    def __setitem__(self, key, value):
+        super(TrackedNode, self).__setitem__(key, value)
+        value = dict.__getitem__(self, key)
+        new = self._attach_value(key, value)
+        if new is not value:
+            dict.__setitem__(self, key, new)
+        self._changes.touch()
+
+    def __delitem__(self, key):
+        super(TrackedNode, self).__delitem__(key)
+        self._changes.touch()
+
+    def pop(self, key, *default):
+        changed = key in self
+        value = super(TrackedNode, self).pop(key, *default)
+        if changed:
+            self._changes.touch()
+        return value
+
+    def popitem(self):
+        item = super(TrackedNode, self).popitem()
+        self._changes.touch()
+        return item
+
+    def clear(self):
+        super(TrackedNode, self).clear()
+        self._changes.touch()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce_ex__(self, protocol):
+        # copies and pickles are not tracked
+        cls = self._untracked_class
+        if cls.__init__ is not dict.__init__:
+            cls = NotebookNode
+        return (cls, (dict(self.items()),))
+
+
+class TrackedNotebook(TrackedNode):
+    """Mixin of the tracking subclass of a notebook's class"""
+    __slots__ = ()
+
+    def _attach_value(self, key, value):
+        if key == 'cells' and isinstance(value, list):
+            return _track_cells(value, self._changes)
+        return _attach(value, self._changes)
+
+    def change_token(self):
+        """A token for the current state of the notebook, to pass as `since`"""
+        return next(_clock)
+
+    def changed(self, since=None):
+        """Whether anything in the notebook changed since the token `since`
+
+        If `since` is None, returns True.
+        """
+        return since is None or self._changes.latest > since
+
+    def changed_cells(self, since=None):
+        """The indices of the cells changed, put in the notebook, or moved since `since`
+
+        Cells moved include those after a cell inserted or deleted.  `since`
+        is a token from :meth:`change_token`.  If it is None, the indices of
+        all the cells are returned.
+        """
+        cells = self.get('cells', [])
+        if since is None:
+            return list(range(len(cells)))
+        if self._changes.latest <= since:
+            return []
+        return [
+            index for index, cell in enumerate(cells)
+            if not isinstance(cell, TrackedNode) or cell._changes.version > since
+        ]
+
+
+class TrackedList(list):
+    """A list in a tracked notebook
+
+    Every change made to it updates the :class:`Changes` record in its
+    ``_changes`` attribute, and values put in it are tracked too.  In the
+    list of cells, cells that change places, such as those after a cell
+    inserted or deleted, count as changed.
+    """
+    __slots__ = ('_changes', '_cells')
+
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        # whether this is the list of cells of a notebook
+        self._cells = False
+
+    def _attach_item(self, item):
+        if self._cells:
+            return _attach_cell(item, self._changes)
+        return _attach(item, self._changes)
+
+    def _moved(self, start=0, before=None):
+        """Record that the cells from `start`, or those not where they were in `before`, moved"""
+        for index in range(start, len(self)):
+            cell = list.__getitem__(self, index)
+            if before is not None and index < len(before) and before[index] is cell:
+                continue
+            if isinstance(cell, TrackedNode):
+                cell._changes.touch()
+
+    def _position(self, index, size):
+        """The position of an index into a list of `size` items, as list.insert takes it"""
+        index = operator.index(index)
+        if index < 0:
+            return max(index + size, 0)
+        return min(index, size)
+
+    def __setitem__(self, index, value):
+        before = list(self) if self._cells and isinstance(index, slice) else None
+        if isinstance(index, slice):
+            value = [self._attach_item(item) for item in value]
+        else:
+            value = self._attach_item(value)
+        list.__setitem__(self, index, value)
+        if before is not None:
+            self._moved(before=before)
+        self._changes.touch()
+
+    def __delitem__(self, index):
+        before = list(self) if self._cells and isinstance(index, slice) else None
+        size = len(self)
+        list.__delitem__(self, index)
+        if before is not None:
+            self._moved(before=before)
+        elif self._cells:
+            self._moved(self._position(index, size))
+        self._changes.touch()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        if self._cells:
+            # the cells repeated are put in again
+            self._moved()
+        self._changes.touch()
+        return self
+
+    def append(self, item):
+        list.append(self, self._attach_item(item))
+        self._changes.touch()
+
+    def extend(self, items):
+        list.extend(self, [self._attach_item(item) for item in items])
+        self._changes.touch()
+
+    def insert(self, index, item):
+        item = self._attach_item(item)
+        position = self._position(index, len(self))
+        list.insert(self, position, item)
+        if self._cells:
+            self._moved(position + 1)
+        self._changes.touch()
+
+    def pop(self, index=-1):
+        size = len(self)
+        item = list.pop(self, index)
+        if self._cells:
+            self._moved(self._position(index, size))
+        self._changes.touch()
+        return item
+
+    def remove(self, item):
+        if self._cells:
+            del self[self.index(item)]
+            return
+        list.remove(self, item)
+        self._changes.touch()
+
+    def clear(self):
+        list.clear(self)
+        self._changes.touch()
+
+    def sort(self, *args, **kwargs):
+        before = list(self) if self._cells else None
+        list.sort(self, *args, **kwargs)
+        if before is not None:
+            self._moved(before=before)
+        self._changes.touch()
+
+    def reverse(self):
+        before = list(self) if self._cells else None
+        list.reverse(self)
+        if before is not None:
+            self._moved(before=before)
+        self._changes.touch()
+
+    def __reduce_ex__(self, protocol):
+        # copies and pickles are not tracked
+        return (list, (list(self),))
+
+
+def track_changes(nb):
+    """Record which cells of a v4 notebook change, in place
+
+    Returns the notebook, which is now an instance of a subclass of its
+    class and of :class:`TrackedNotebook`, with the methods
+    :meth:`~TrackedNotebook.change_token`, :meth:`~TrackedNotebook.changed`
+    and :meth:`~TrackedNotebook.changed_cells`.  Does nothing if the
+    notebook is already tracked.
+    """
+    if isinstance(nb, TrackedNotebook):
+        return nb
+    if isinstance(nb, FrozenNode):
+        raise TypeError("Snapshots cannot change, so their changes cannot be tracked")
+    if not isinstance(nb, NotebookNode) or not isinstance(nb.get('cells'), list):
+        raise ValueError("Only the changes of v4 notebooks can be tracked")
+    object.__setattr__(nb, '__class__', _tracked_class(type(nb), notebook=True))
+    object.__setattr__(nb, '_changes', Changes())
+    for key, value in list(dict.items(nb)):
+        if isinstance(value, (dict, list)):
+            new = nb._attach_value(key, value)
+            if new is not value:
+                dict.__setitem__(nb, key, new)
+    return nb
+
+
+def _last_frozen(changes, version):
+    """The last snapshot taken of a part, if it is still in use and current"""
+    if changes.frozen is not None:
+        frozen_ref, frozen_version = changes.frozen
+        if frozen_version == version:
+            return frozen_ref()
+    return None
+
+
+def _freeze_notebook(nb):
+    """Snapshot a tracked notebook, freezing only the cells changed since last time"""
+    changes = nb._changes
+    last = _last_frozen(changes, changes.latest)
+    if last is not None:
+        return last
+    last = changes.frozen[0]() if changes.frozen is not None else None
+
+    cells = []
+    for cell in dict.get(nb, 'cells', []):
+        if isinstance(cell, TrackedNode):
+            cell_changes = cell._changes
+            frozen = _last_frozen(cell_changes, cell_changes.version)
+            if frozen is None:
+                frozen = _freeze(cell, cell_changes.frozen[0]() if cell_changes.frozen is not None else None)
+                cell_changes.frozen = (weakref.ref(frozen), cell_changes.version)
+        else:
+            frozen = _freeze(cell, None)
+        cells.append(frozen)
+
+    items = {}
+    for key, value in dict.items(nb):
+        if key == 'cells':
+            old = dict.get(last, key) if last is not None else None
+            if old is not None and len(old) == len(cells) and all(map(operator.is_, old, cells)):
+                items[key] = old
+            else:
+                items[key] = FrozenList(cells)
+        else:
+            items[key] = _freeze(value, dict.get(last, key) if last is not None else None)
+    snap = FrozenNode(items)
+    changes.frozen = (weakref.ref(snap), changes.latest)
+    return snap
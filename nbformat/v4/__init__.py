@@ -5,7 +5,8 @@
 
 __all__ = ['nbformat', 'nbformat_minor', 'nbformat_schema', 'new_code_cell',
            'new_markdown_cell', 'new_notebook', 'new_output', 'output_from_msg',
-           'reads', 'writes', 'to_notebook', 'downgrade', 'upgrade']
+           'reads', 'writes', 'iterwrites', 'to_notebook', 'to_validated_notebook',
+           'downgrade', 'upgrade']
 
 from .nbbase import (
     nbformat, nbformat_minor, nbformat_schema,
@@ -13,7 +14,7 @@ from .nbbase import (
     new_output, output_from_msg,
 )
 
-from .nbjson import reads, writes, to_notebook
+from .nbjson import reads, writes, iterwrites, to_notebook, to_validated_notebook
 reads_json = reads
 writes_json = writes
 to_notebook_json = to_notebook
@@ -10,6 +10,7 @@ helpers to build the structs in the right form.
 # Distributed under the terms of the Modified BSD License.
 
 from ..notebooknode import NotebookNode
+from .nodes import CodeCell, MarkdownCell, RawCell, output_types
 
 # Change the nbformat_minor and nbformat_schema variables when incrementing the
 # nbformat version
@@ -40,7 +41,7 @@ def validate(node, ref=None):
 
 def new_output(output_type, data=None, **kwargs):
     """Create a new output, to go in the ``cell.outputs`` list of a code cell."""
-    output = NotebookNode(output_type=output_type)
+    output = output_types.get(output_type, NotebookNode)(output_type=output_type)
 
     # populate defaults:
     if output_type == 'stream':
@@ -112,7 +113,7 @@ def output_from_msg(msg):
 
 def new_code_cell(source='', **kwargs):
     """Create a new code cell"""
-    cell = NotebookNode(
+    cell = CodeCell(
         cell_type='code',
         metadata=NotebookNode(),
         execution_count=None,
@@ -126,7 +127,7 @@ def new_code_cell(source='', **kwargs):
 
 def new_markdown_cell(source='', **kwargs):
     """Create a new markdown cell"""
-    cell = NotebookNode(
+    cell = MarkdownCell(
         cell_type='markdown',
         source=source,
         metadata=NotebookNode(),
@@ -138,7 +139,7 @@ def new_markdown_cell(source='', **kwargs):
 
 def new_raw_cell(source='', **kwargs):
     """Create a new raw cell"""
-    cell = NotebookNode(
+    cell = RawCell(
         cell_type='raw',
         source=source,
         metadata=NotebookNode(),
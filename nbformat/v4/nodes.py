@@ -0,0 +1,141 @@
+"""Typed node classes for v4 cells and outputs
+
+Cells and outputs read from v4 notebooks, and made by the ``new_*``
+functions, are instances of a :class:`~nbformat.NotebookNode` subclass for
+their type, such as :class:`CodeCell` or :class:`StreamOutput`, so they can
+be told apart with ``isinstance``.
+
+They are still dicts, which is what ``json.dumps``, schema validation and
+signing rely on, so their fields are stored as dict items.  The classes
+declare empty ``__slots__``, and like all nodes they get no per-instance
+``__dict__``, so a node takes no more memory than the dict of its fields.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from ..notebooknode import NotebookNode, from_dict
+
+
+class Cell(NotebookNode):
+    """Base class for cells"""
+    __slots__ = ()
+
+
+class CodeCell(Cell):
+    """A code cell"""
+    __slots__ = ()
+
+
+class MarkdownCell(Cell):
+    """A markdown cell"""
+    __slots__ = ()
+
+
+class RawCell(Cell):
+    """A raw cell"""
+    __slots__ = ()
+
+
+class Output(NotebookNode):
+    """Base class for the outputs of code cells"""
+    __slots__ = ()
+
+
+class StreamOutput(Output):
+    """Text written to stdout or stderr"""
+    __slots__ = ()
+
+
+class DisplayDataOutput(Output):
+    """Data displayed by a kernel"""
+    __slots__ = ()
+
+
+class ExecuteResultOutput(Output):
+    """The result of executing a cell"""
+    __slots__ = ()
+
+
+class ErrorOutput(Output):
+    """An error raised while executing a cell"""
+    __slots__ = ()
+
+
+cell_types = {
+    'code': CodeCell,
+    'markdown': MarkdownCell,
+    'raw': RawCell,
+}
+
+output_types = {
+    'stream': StreamOutput,
+    'display_data': DisplayDataOutput,
+    'execute_result': ExecuteResultOutput,
+    'error': ErrorOutput,
+}
+
+
+def output_from_dict(d):
+    """Convert an output dict to the node class for its type, recursively
+
+    Outputs of unknown types, and anything that is not a dict, are converted
+    as by :func:`~nbformat.notebooknode.from_dict`.
+    """
+    if not isinstance(d, dict):
+        return from_dict(d)
+    cls = output_types.get(d.get('output_type'), NotebookNode)
+    return cls({k: from_dict(v) for k, v in d.items()})
+
+
+def cell_from_dict(d):
+    """Convert a cell dict, and its outputs, to node classes for their types
+
+    Cells of unknown types, and anything that is not a dict, are converted
+    as by :func:`~nbformat.notebooknode.from_dict`.
+    """
+    if not isinstance(d, dict):
+        return from_dict(d)
+    cls = cell_types.get(d.get('cell_type'), NotebookNode)
+    node = {}
+    for key, value in d.items():
+        if key == 'outputs' and isinstance(value, list):
+            node[key] = [output_from_dict(output) for output in value]
+        else:
+            node[key] = from_dict(value)
+    return cls(node)
+
+
+def _retype(node, cls):
+    if type(node) is NotebookNode and cls is not NotebookNode:
+        object.__setattr__(node, '__class__', cls)
+    return node
+
+
+def type_cell(cell):
+    """Give a cell parsed as NotebookNodes, and its outputs, their node classes
+
+    Unlike :func:`cell_from_dict`, nothing is copied: nodes that are plain
+    :class:`~nbformat.NotebookNode` instances have their class changed in
+    place.  Anything else is converted with :func:`cell_from_dict`.
+    """
+    if type(cell) is not NotebookNode:
+        return cell_from_dict(cell)
+    _retype(cell, cell_types.get(cell.get('cell_type'), NotebookNode))
+    outputs = cell.get('outputs')
+    if isinstance(outputs, list):
+        for index, output in enumerate(outputs):
+            if type(output) is NotebookNode:
+                _retype(output, output_types.get(output.get('output_type'), NotebookNode))
+            else:
+                outputs[index] = output_from_dict(output)
+    return cell
+
+
+def notebook_from_dict(d):
+    """Convert a v4 notebook dict to nodes, with typed cells and outputs"""
+    if not isinstance(d, dict) or not isinstance(d.get('cells'), list):
+        return from_dict(d)
+    nb = from_dict(dict(d, cells=[]))
+    nb['cells'] = [cell_from_dict(cell) for cell in d['cells']]
+    return nb
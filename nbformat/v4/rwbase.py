@@ -3,6 +3,8 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+from .nodes import cell_from_dict
+
 def _is_json_mime(mime):
     """Is a key a JSON mime-type that should be left alone?"""
     return mime == 'application/json' or \
@@ -28,23 +30,32 @@ def rejoin_lines(nb):
     Used when reading JSON files that may have been passed through split_lines.
     """
     for cell in nb.cells:
-        if 'source' in cell and isinstance(cell.source, list):
-            cell.source = ''.join(cell.source)
-
-        attachments = cell.get('attachments', {})
-        for key, attachment in attachments.items():
-            _rejoin_mimebundle(attachment)
-
-        if cell.get('cell_type', None) == 'code':
-            for output in cell.get('outputs', []):
-                output_type = output.get('output_type', '')
-                if output_type in {'execute_result', 'display_data'}:
-                    _rejoin_mimebundle(output.get('data', {}))
-                elif output_type:
-                    if isinstance(output.get('text', ''), list):
-                        output.text = ''.join(output.text)
+        rejoin_cell_lines(cell)
     return nb
 
+def rejoin_cell_lines(cell):
+    """rejoin multiline text of a single cell (in-place)
+
+    The per-cell step of ``rejoin_lines(nb)``, for readers that build
+    a notebook one cell at a time.
+    """
+    if 'source' in cell and isinstance(cell.source, list):
+        cell.source = ''.join(cell.source)
+
+    attachments = cell.get('attachments', {})
+    for key, attachment in attachments.items():
+        _rejoin_mimebundle(attachment)
+
+    if cell.get('cell_type', None) == 'code':
+        for output in cell.get('outputs', []):
+            output_type = output.get('output_type', '')
+            if output_type in {'execute_result', 'display_data'}:
+                _rejoin_mimebundle(output.get('data', {}))
+            elif output_type:
+                if isinstance(output.get('text', ''), list):
+                    output.text = ''.join(output.text)
+    return cell
+
 _non_text_split_mimes = {
     'application/javascript',
     'image/svg+xml',
@@ -68,37 +79,250 @@ def split_lines(nb):
     Used when writing JSON files.
     """
     for cell in nb.cells:
-        source = cell.get('source', None)
-        if isinstance(source, str):
-            cell['source'] = source.splitlines(True)
-
-        attachments = cell.get('attachments', {})
-        for key, attachment in attachments.items():
-            _split_mimebundle(attachment)
-
-        if cell.cell_type == 'code':
-            for output in cell.outputs:
-                if output.output_type in {'execute_result', 'display_data'}:
-                    _split_mimebundle(output.get('data', {}))
-                elif output.output_type == 'stream':
-                    if isinstance(output.text, str):
-                        output.text = output.text.splitlines(True)
+        split_cell_lines(cell)
     return nb
 
+def split_cell_lines(cell):
+    """split likely multiline text of a single cell (in-place)
+
+    The per-cell step of ``split_lines(nb)``, for writers that serialize
+    a notebook one cell at a time.
+    """
+    source = cell.get('source', None)
+    if isinstance(source, str):
+        cell['source'] = source.splitlines(True)
+
+    attachments = cell.get('attachments', {})
+    for key, attachment in attachments.items():
+        _split_mimebundle(attachment)
+
+    if cell.cell_type == 'code':
+        for output in cell.outputs:
+            split_output_lines(output)
+    return cell
+
+def split_output_lines(output):
+    """split likely multiline text of a single output (in-place)"""
+    if output.output_type in {'execute_result', 'display_data'}:
+        _split_mimebundle(output.get('data', {}))
+    elif output.output_type == 'stream':
+        if isinstance(output.text, str):
+            output.text = output.text.splitlines(True)
+    return output
+
+
+_transient_metadata = ('orig_nbformat', 'orig_nbformat_minor', 'signature')
 
 def strip_transient(nb):
     """Strip transient values that shouldn't be stored in files.
 
     This should be called in *both* read and write.
     """
-    nb.metadata.pop('orig_nbformat', None)
-    nb.metadata.pop('orig_nbformat_minor', None)
-    nb.metadata.pop('signature', None)
+    for key in _transient_metadata:
+        nb.metadata.pop(key, None)
     for cell in nb.cells:
         cell.metadata.pop('trusted', None)
     return nb
 
 
+def _split_mimebundle_copy(data):
+    """Split multi-line string fields in a copy of a mimebundle"""
+    return {
+        key: value.splitlines(True) if isinstance(value, str) and (
+            key.startswith('text/') or key in _non_text_split_mimes
+        ) else value
+        for key, value in data.items()
+    }
+
+def output_for_writing(output, split=True):
+    """Return an output as it is written to files, without modifying it
+
+    With `split`, multiline text is split as by ``split_output_lines``.
+    Only the containers that change are copied, shallowly; everything else
+    is shared with `output`.
+    """
+    if not split:
+        return output
+    output_type = output.get('output_type')
+    if output_type in {'execute_result', 'display_data'}:
+        data = output.get('data')
+        if isinstance(data, dict):
+            return dict(output, data=_split_mimebundle_copy(data))
+    elif output_type == 'stream' and isinstance(output.get('text'), str):
+        return dict(output, text=output['text'].splitlines(True))
+    return output
+
+def cell_for_writing(cell, split=True, outputs=True):
+    """Return a cell as it is written to files, without modifying it
+
+    Transient values are left out, and with `split` multiline text is split
+    as by ``split_cell_lines``.  If `outputs` is False, the outputs are
+    left as they are, for writers that handle them one at a time.
+    Only the containers that change are copied, shallowly.
+    """
+    cell = dict(cell)
+    metadata = cell.get('metadata')
+    if isinstance(metadata, dict) and 'trusted' in metadata:
+        cell['metadata'] = {key: value for key, value in metadata.items() if key != 'trusted'}
+    if not split:
+        return cell
+
+    source = cell.get('source')
+    if isinstance(source, str):
+        cell['source'] = source.splitlines(True)
+    attachments = cell.get('attachments')
+    if attachments:
+        cell['attachments'] = {
+            key: _split_mimebundle_copy(attachment) for key, attachment in attachments.items()
+        }
+    if outputs and cell.get('cell_type') == 'code' and isinstance(cell.get('outputs'), list):
+        cell['outputs'] = [output_for_writing(output) for output in cell['outputs']]
+    return cell
+
+def notebook_for_writing(nb, split=True, cells=True):
+    """Return a notebook as it is written to files, without modifying it
+
+    The copy-free counterpart of ``strip_transient(split_lines(deepcopy(nb)))``:
+    only the containers that change are copied, shallowly, and everything
+    else is shared with `nb`.  If `cells` is False, the cells are left as
+    they are, for writers that handle them one at a time.
+    """
+    nb = dict(nb)
+    metadata = nb.get('metadata')
+    if isinstance(metadata, dict) and any(key in metadata for key in _transient_metadata):
+        nb['metadata'] = {
+            key: value for key, value in metadata.items() if key not in _transient_metadata
+        }
+    if cells and isinstance(nb.get('cells'), list):
+        nb['cells'] = [cell_for_writing(cell, split) for cell in nb['cells']]
+    return nb
+
+
+def filter_outputs(nb, outputs):
+    """Drop outputs, or the mime types of outputs, that were not asked for (in-place)
+
+    If `outputs` is False, the outputs of every code cell are removed.
+    Otherwise it is a collection of mime types, and the data of
+    ``display_data`` and ``execute_result`` outputs is restricted to those
+    types; other outputs are kept.  If `outputs` is True, nothing is removed.
+    """
+    if outputs is True:
+        return nb
+    for cell in nb.cells:
+        if 'outputs' not in cell:
+            continue
+        if not outputs:
+            cell.outputs = []
+            continue
+        for output in cell.outputs:
+            data = output.get('data')
+            if isinstance(data, dict):
+                for mime_type in [key for key in data if key not in outputs]:
+                    del data[mime_type]
+    return nb
+
+
+class LazyCellList(list):
+    """A list of cells that are converted to NotebookNodes on first access
+
+    Cells are stored as the plain dicts produced by the JSON parser, and
+    each one gets ``cell_from_dict``, ``rejoin_cell_lines`` and transient-value
+    stripping only when it is first retrieved. Cells that are never
+    accessed never pay for conversion.
+
+    Anything that needs every cell (comparison, sorting, repr, ...)
+    materializes the whole list first.
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def _materialize(cell):
+        cell = rejoin_cell_lines(cell_from_dict(cell))
+        cell.metadata.pop('trusted', None)
+        return cell
+
+    def _get(self, index):
+        cell = list.__getitem__(self, index)
+        if type(cell) is dict:
+            cell = self._materialize(cell)
+            list.__setitem__(self, index, cell)
+        return cell
+
+    def _materialize_all(self):
+        for index in range(len(self)):
+            self._get(index)
+        return self
+
+    def as_parsed(self):
+        """Return the cells as a plain list, without materializing any
+
+        Cells that have not been accessed yet are the dicts from the parser.
+        """
+        return list.copy(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        return self._get(index)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self):
+            yield self._get(index)
+            index += 1
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self._get(index)
+
+    def pop(self, index=-1):
+        cell = self._get(index)
+        list.pop(self, index)
+        return cell
+
+    def copy(self):
+        return list.copy(self._materialize_all())
+
+    def __repr__(self):
+        return list.__repr__(self._materialize_all())
+
+    def __contains__(self, value):
+        return list.__contains__(self._materialize_all(), value)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyCellList):
+            other._materialize_all()
+        return list.__eq__(self._materialize_all(), other)
+
+    def __ne__(self, other):
+        if isinstance(other, LazyCellList):
+            other._materialize_all()
+        return list.__ne__(self._materialize_all(), other)
+
+    def __add__(self, other):
+        return list.__add__(self._materialize_all(), other)
+
+    def __radd__(self, other):
+        return list(other) + self.copy()
+
+    def __mul__(self, n):
+        return list.__mul__(self._materialize_all(), n)
+
+    __rmul__ = __mul__
+
+    def index(self, *args):
+        return list.index(self._materialize_all(), *args)
+
+    def count(self, value):
+        return list.count(self._materialize_all(), value)
+
+    def remove(self, value):
+        return list.remove(self._materialize_all(), value)
+
+    def sort(self, *args, **kwargs):
+        return list.sort(self._materialize_all(), *args, **kwargs)
+
+
 class NotebookReader(object):
     """A class for reading notebooks."""
 
@@ -1,10 +1,12 @@
+import copy
 import os
 import json
 from unittest import TestCase
 
 from ..._compat import decodebytes
 from ..nbjson import reads, writes
-from .. import nbjson, nbformat, nbformat_minor
+from .. import nbjson, nbformat, nbformat_minor, rwbase
+from ..nbbase import new_notebook
 from .nbexamples import nb0
 
 from . import formattest
@@ -59,6 +61,120 @@ class TestJSON(formattest.NBFormatTest, TestCase):
                 # JSON outputs should be left alone
                 assert json_value == output_ref[key]
 
+    def test_writes_matches_copy(self):
+        """writes leaves the notebook alone, and matches serializing a modified copy"""
+        nb = copy.deepcopy(nb0)
+        nb.metadata.signature = 'sha256:0'
+        nb.metadata.orig_nbformat = 3
+        nb.cells[0].metadata.trusted = True
+        before = copy.deepcopy(nb)
+        for split_lines in (True, False):
+            ref = copy.deepcopy(nb)
+            if split_lines:
+                rwbase.split_lines(ref)
+            rwbase.strip_transient(ref)
+            expected = json.dumps(ref, cls=nbjson.BytesEncoder, indent=1,
+                sort_keys=True, separators=(',', ': '), ensure_ascii=False)
+            self.assertEqual(writes(nb, split_lines=split_lines), expected)
+        self.assertEqual(nb, before)
+
+    def test_iterwrites(self):
+        """iterwrites produces the same text as writes"""
+        nb = copy.deepcopy(nb0)
+        nb.metadata.signature = 'sha256:0'
+        nb.cells[0].metadata.trusted = True
+        for split_lines in (True, False):
+            s = writes(nb, split_lines=split_lines)
+            self.assertEqual(''.join(nbjson.iterwrites(nb, split_lines=split_lines)), s)
+        # the notebook is not modified
+        self.assertEqual(nb.metadata.signature, 'sha256:0')
+        self.assertTrue(nb.cells[0].metadata.trusted)
+        empty = new_notebook()
+        self.assertEqual(''.join(nbjson.iterwrites(empty)), writes(empty))
+
+    def test_profiles(self):
+        """Each profile round-trips, and iterwrites matches writes for it"""
+        nb = copy.deepcopy(nb0)
+        for name in nbjson.PROFILES:
+            s = writes(nb, profile=name)
+            self.assertEqual(''.join(nbjson.iterwrites(nb, profile=name)), s)
+            self.assertEqual(nbjson.reads(s, profile=name), nb0)
+        self.assertEqual(writes(nb, profile='canonical'), writes(nb))
+        self.assertEqual(writes(nb, profile='diff'), writes(nb))
+        self.assertEqual(nb, nb0)
+
+    def test_compact_profile(self):
+        nb = copy.deepcopy(nb0)
+        nb.cells[0].metadata.trusted = True
+        s = writes(nb, profile='compact')
+        self.assertNotIn('\n', s)
+        ref = copy.deepcopy(nb)
+        rwbase.strip_transient(ref)
+        self.assertEqual(s, json.dumps(ref, cls=nbjson.BytesEncoder,
+            separators=(',', ':'), ensure_ascii=False))
+        # split_lines overrides the profile
+        split = writes(nb, profile='compact', split_lines=True)
+        self.assertIsInstance(json.loads(split)['cells'][0]['source'], list)
+        self.assertEqual(nbjson.reads(split), nb0)
+        # lines are not rejoined for compact input
+        d = json.loads(split)
+        nb, error = nbjson.to_validated_notebook(copy.deepcopy(d), profile='compact')
+        self.assertIsNone(error)
+        self.assertEqual(nb.cells[0].source, d['cells'][0]['source'])
+
+    def test_invalid_profile(self):
+        with self.assertRaises(ValueError):
+            writes(nb0, profile='pretty')
+
+    def test_lazy_cells(self):
+        """Lazy cells are converted on first access"""
+        s = writes(nb0)
+        nb = nbjson.reads(s, lazy=True)
+        self.assertIsInstance(nb.cells, nbjson.LazyCellList)
+        self.assertEqual(len(nb.cells), len(nb0.cells))
+        # nothing is converted until accessed
+        assert all(type(cell) is dict for cell in nb.cells.as_parsed())
+        cell = nb.cells[3]
+        self.assertEqual(cell.source, nb0.cells[3].source)
+        parsed = nb.cells.as_parsed()
+        assert parsed[3] is cell
+        assert type(parsed[2]) is dict
+        # whole-list operations see materialized cells
+        self.assertEqual(nb, nb0)
+        self.assertEqual(nbjson.reads(writes(nb)), nb0)
+
+    def test_lazy_strips_transient(self):
+        nb = copy.deepcopy(nb0)
+        nb.metadata.signature = 'sha256:nope'
+        nb.cells[1].metadata.trusted = True
+        lazy = nbjson.reads(writes(nb, split_lines=True), lazy=True)
+        assert 'signature' not in lazy.metadata
+        assert 'trusted' not in lazy.cells[1].metadata
+
+    def test_to_validated_notebook(self):
+        nb = copy.deepcopy(nb0)
+        nb.metadata.signature = 'sha256:nope'
+        nb.cells[1].metadata.trusted = True
+        d = json.loads(writes(nb))
+        validated, error = nbjson.to_validated_notebook(copy.deepcopy(d))
+        self.assertIsNone(error)
+        self.assertEqual(validated, nbjson.to_notebook(d))
+        assert 'signature' not in validated.metadata
+        assert 'trusted' not in validated.cells[1].metadata
+
+    def test_to_validated_notebook_error(self):
+        d = json.loads(writes(nb0))
+        del d['cells'][2]['source']
+        d['cells'][9]['outputs'][2]['output_type'] = 'bad'
+        nb, error = nbjson.to_validated_notebook(d)
+        # the whole notebook is still converted
+        self.assertEqual(len(nb.cells), len(nb0.cells))
+        self.assertEqual(list(error.relative_path)[:2], ['cells', 2])
+        d = json.loads(writes(nb0))
+        d['cells'][9]['outputs'][2]['output_type'] = 'bad'
+        nb, error = nbjson.to_validated_notebook(d)
+        self.assertEqual(list(error.relative_path)[:4], ['cells', 9, 'outputs', 2])
+
     def test_read_png(self):
         """PNG output data is b64 unicode"""
         s = writes(nb0)
@@ -0,0 +1,77 @@
+"""Tests for the typed node classes"""
+
+import io
+import json
+import pickle
+
+from nbformat import read, reads, writes
+from nbformat.notebooknode import NotebookNode
+from nbformat.sign import NotebookNotary
+from nbformat.validator import validate
+from .. import nodes
+from ..nbbase import new_code_cell, new_markdown_cell, new_notebook, new_output, new_raw_cell
+from ..nodes import (
+    CodeCell, DisplayDataOutput, ErrorOutput, ExecuteResultOutput, MarkdownCell,
+    RawCell, StreamOutput,
+)
+from .nbexamples import nb0
+
+
+def test_new_nodes_are_typed():
+    assert type(new_code_cell()) is CodeCell
+    assert type(new_markdown_cell()) is MarkdownCell
+    assert type(new_raw_cell()) is RawCell
+    assert type(new_output('stream')) is StreamOutput
+    assert type(new_output('display_data')) is DisplayDataOutput
+    assert type(new_output('execute_result')) is ExecuteResultOutput
+    assert type(new_output('error')) is ErrorOutput
+    assert type(new_code_cell().metadata) is NotebookNode
+
+
+def test_read_nodes_are_typed():
+    s = writes(nb0)
+    for nb in (reads(s, 4), reads(s, 4, lazy=True), read(io.StringIO(s), 4, stream=True)):
+        for cell in nb.cells:
+            assert type(cell) is nodes.cell_types[cell.cell_type]
+            for output in cell.get('outputs', []):
+                assert type(output) is nodes.output_types[output.output_type]
+                assert isinstance(output, NotebookNode)
+    nb = nodes.notebook_from_dict(json.loads(writes(nb0)))
+    assert type(nb) is NotebookNode
+    assert type(nb.cells[0].metadata) is NotebookNode
+
+
+def test_unknown_types():
+    cell = nodes.cell_from_dict({'cell_type': 'other', 'outputs': [{'output_type': 'other'}]})
+    assert type(cell) is NotebookNode
+    assert type(cell.outputs[0]) is NotebookNode
+
+
+def test_type_cell():
+    parsed = json.loads(writes(nb0), object_pairs_hook=NotebookNode)
+    cell = parsed.cells[9]
+    outputs = list(cell.outputs)
+    assert nodes.type_cell(cell) is cell
+    assert type(cell) is CodeCell
+    assert [type(output) for output in cell.outputs] == [nodes.output_types[o.output_type] for o in outputs]
+    assert all(new is old for new, old in zip(cell.outputs, outputs))
+    # other dicts are copied
+    cell = {'cell_type': 'raw', 'source': '', 'metadata': {}}
+    assert type(nodes.type_cell(cell)) is RawCell
+    assert type(cell) is dict
+
+
+def test_mapping_api():
+    nb = new_notebook(cells=[
+        new_code_cell('x', outputs=[new_output('stream', text='y')]),
+        new_markdown_cell('z'),
+    ])
+    validate(nb)
+    json.dumps(nb)
+    notary = NotebookNotary(db_file=':memory:', secret=b'secret')
+    notary.sign(nb)
+    assert notary.check_signature(nb)
+    cell = pickle.loads(pickle.dumps(nb.cells[0]))
+    assert type(cell) is CodeCell
+    assert type(cell.outputs[0]) is StreamOutput
+    assert cell == nb.cells[0]
@@ -53,16 +53,10 @@ def get_validator(version=None, version_minor=None, relax_add_props=False):
 
     if version_tuple not in validators:
         try:
-            schema_json = _get_schema_json(v, version=version, version_minor=version_minor)
+            schema_json = _get_versioned_schema_json(v, version, version_minor)
         except AttributeError:
             return None
 
-        if current_minor < version_minor:
-            # notebook from the future, relax all `additionalProperties: False` requirements
-            schema_json = _relax_additional_properties(schema_json)
-            # and allow undefined cell types and outputs
-            schema_json = _allow_undefined(schema_json)
-
         validators[version_tuple] = current_validator(schema_json)
 
     if relax_add_props:
@@ -79,6 +73,49 @@ def get_validator(version=None, version_minor=None, relax_add_props=False):
     return validators[version_tuple]
 
 
+def get_ref_validator(ref, version=None, version_minor=None):
+    """Load a Validator for one definition in the JSON schema
+
+    The validator checks instances against ``#/definitions/<ref>``, such as
+    a single cell or output.
+    """
+    if version is None:
+        from . import current_nbformat
+        version = current_nbformat
+
+    v = import_item("nbformat.v%s" % version)
+    if version_minor is None:
+        version_minor = getattr(v, 'nbformat_minor', 0)
+
+    current_validator = get_current_validator()
+    ref_tuple = (current_validator.name, version, version_minor, ref)
+
+    if ref_tuple not in validators:
+        try:
+            schema_json = _get_versioned_schema_json(v, version, version_minor)
+        except AttributeError:
+            return None
+
+        # siblings of $ref are ignored in draft 4, so the rest of the schema
+        # is only there to resolve references
+        schema_json['$ref'] = '#/definitions/%s' % ref
+        validators[ref_tuple] = current_validator(schema_json)
+
+    return validators[ref_tuple]
+
+
+def _get_versioned_schema_json(v, version, version_minor):
+    """Get the json schema for validating notebooks of a given nbformat version"""
+    schema_json = _get_schema_json(v, version=version, version_minor=version_minor)
+
+    if getattr(v, 'nbformat_minor', 0) < version_minor:
+        # notebook from the future, relax all `additionalProperties: False` requirements
+        schema_json = _relax_additional_properties(schema_json)
+        # and allow undefined cell types and outputs
+        schema_json = _allow_undefined(schema_json)
+    return schema_json
+
+
 def _get_schema_json(v, version=None, version_minor=None):
     """
     Gets the json schema from a given imported library and nbformat version.
@@ -263,6 +300,69 @@ def validate(nbdict=None, ref=None, version=None, version_minor=None,
         raise error
 
 
+_cell_refs = {
+    'raw': 'raw_cell',
+    'markdown': 'markdown_cell',
+    'code': 'code_cell',
+}
+
+_output_refs = {
+    'execute_result': 'execute_result',
+    'display_data': 'display_data',
+    'stream': 'stream',
+    'error': 'error',
+}
+
+
+def _iter_ref_errors(instance, ref, path, version, version_minor):
+    """Validate `instance` against one schema definition
+
+    Errors are given their path from the top of the notebook.
+    """
+    validator = get_ref_validator(ref, version, version_minor)
+    if validator is None:
+        yield ValidationError("No schema for validating v%s notebooks" % version)
+        return
+
+    for error in validator.iter_errors(instance):
+        error = better_validation_error(error, version, version_minor)
+        if error.ref is None:
+            error.ref = ref
+        error.relative_path.extendleft(reversed(path))
+        yield error
+
+
+def iter_validate_cell(cell, index=None, version=4, version_minor=None):
+    """Checks whether a single v4 cell conforms to the notebook format schema.
+
+    Cells and their outputs are checked against the definition for their
+    type, instead of against every type in turn, so checking each cell of a
+    notebook this way is faster than validating the notebook as a whole.
+    `index` is the position of the cell in the notebook, for error messages.
+
+    Returns a generator of all ValidationErrors if not valid.
+    """
+    path = [] if index is None else ['cells', index]
+    cell_type = cell.get('cell_type') if isinstance(cell, dict) else None
+    outputs = cell.get('outputs') if cell_type == 'code' else None
+
+    if not isinstance(outputs, list):
+        ref = _cell_refs.get(cell_type, 'cell') if isinstance(cell_type, str) else 'cell'
+        for error in _iter_ref_errors(cell, ref, path, version, version_minor):
+            yield error
+        return
+
+    # outputs are only constrained by the output definition, check them one by one
+    for error in _iter_ref_errors(dict(cell, outputs=[]), 'code_cell', path, version, version_minor):
+        yield error
+    for i, output in enumerate(outputs):
+        output_type = output.get('output_type') if isinstance(output, dict) else None
+        ref = _output_refs.get(output_type, 'output') if isinstance(output_type, str) else 'output'
+        output_path = path + ['outputs', i]
+        for error in _iter_ref_errors(output, ref, output_path, version, version_minor):
+            yield error
+
+
 def iter_validate(nbdict=None, ref=None, version=None, version_minor=None,
                   relax_add_props=False, nbjson=None):
     """Checks whether the given notebook dict-like object conforms to the
@@ -281,14 +381,17 @@ def iter_validate(nbdict=None, ref=None, version=None, version_minor=None,
     if version is None:
         version, version_minor = get_version(nbdict)
 
-    validator = get_validator(version, version_minor, relax_add_props=relax_add_props)
+    if ref and not relax_add_props:
+        validator = get_ref_validator(ref, version, version_minor)
+    else:
+        validator = get_validator(version, version_minor, relax_add_props=relax_add_props)
 
     if validator is None:
         # no validator
         yield ValidationError("No schema for validating v%s notebooks" % version)
         return
 
-    if ref:
+    if ref and relax_add_props:
         errors = validator.iter_errors(nbdict, {'$ref' : '#/definitions/%s' % ref})
     else:
         errors = validator.iter_errors(nbdict)